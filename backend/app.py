@@ -5,43 +5,107 @@ Complete API with duplicate prevention and accurate attendance
 
 from flask import Flask, jsonify, send_file, request
 from flask_cors import CORS
-import csv
 import os
+import re
 import json
 import sys
 import subprocess
-import shutil
-from datetime import datetime
+from datetime import datetime, timezone
 from config import Config
 from validators import StudentValidator, AttendanceValidator, ValidationError
+from student_registry import get_registry
+from registry_cache import RegistryCache
+from attendance_store import get_attendance_store, export_csv
+from attendance_tail import TodayAttendance, unique_records
+from attendance_events import AttendanceBroadcaster, AttendanceStreamError
+from attendance_ipc import MarkListener
+from attendance_columnar import get_columnar_store
+from presence_matrix import PresenceMatrixCache, absentee_report, semester_report, below_threshold
+from recognizer_backends import model_paths
+from training_jobs import TrainingJobManager, TrainingJobError
 
 app = Flask(__name__)
-CORS(app)
+# ETag / Last-Modified must be readable by the dashboard's fetch(); the
+# preflight for its If-None-Match header is cached by the browser
+CORS(app, expose_headers=["ETag", "Last-Modified"], max_age=Config.CORS_PREFLIGHT_MAX_AGE)
 
 # Global variable to track attendance status
 attendance_running = False
 
+# Background training jobs (worker processes)
+training_jobs = TrainingJobManager()
 
-def load_student_database():
-    """Load student database from JSON"""
-    if os.path.exists(Config.STUDENT_DB):
-        try:
-            with open(Config.STUDENT_DB, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading database: {e}")
-            return {}
-    return {}
+# Students, per-class rosters and counts (reloaded when the registry changes)
+registry_cache = RegistryCache()
+
+# Today's attendance per class (reads only newly appended rows)
+today_attendance = TodayAttendance()
+
+# Live marks per class for /api/attendance/stream
+attendance_events = AttendanceBroadcaster(today_attendance, registry_cache)
+
+
+def on_recognizer_marks(rows, sent):
+    """Marks pushed by the recognizer: show them before its batch write lands"""
+    today_attendance.add_rows(rows)
+    attendance_events.wake()
+
+
+def on_recognizer_session(branch, section, counters):
+    attendance_events.update_session(branch, section, counters)
+
+
+# Live channel from the recognizer (started with the server)
+recognizer_channel = MarkListener(on_recognizer_marks, on_recognizer_session)
+
+# Per-class presence bitsets (updated from the columnar attendance store)
+presence_cache = PresenceMatrixCache()
 
 
-def count_students_in_class(branch, section):
-    """Count actual registered students in a specific class"""
-    db = load_student_database()
-    count = 0
-    for student_id, info in db.items():
-        if info.get('branch') == branch and info.get('section') == section:
-            count += 1
-    return count
+# Part of every ETag, so validators from before a restart never match
+ETAG_TOKEN = os.urandom(4).hex()
+
+
+def http_time(timestamp):
+    """Unix time -> whole-second UTC datetime for Last-Modified"""
+    return datetime.fromtimestamp(int(timestamp), timezone.utc)
+
+
+def not_modified(etag, last_modified=None):
+    """
+    304 response if the client's copy is current, else None
+    
+    If-None-Match wins over If-Modified-Since when both are sent.
+    """
+    if not Config.CONDITIONAL_GET_ENABLED:
+        return None
+    if request.if_none_match:
+        current = request.if_none_match.contains_weak(etag)
+    else:
+        current = (last_modified is not None and request.if_modified_since is not None
+                   and last_modified <= request.if_modified_since)
+    if not current:
+        return None
+    return with_validators(app.response_class(status=304), etag, last_modified)
+
+
+def with_validators(response, etag=None, last_modified=None):
+    """
+    Add ETag / Last-Modified to a response
+    
+    Without a version-based etag, the ETag is a hash of the body (saves
+    bandwidth on unchanged data, not the work of building it).
+    """
+    if not Config.CONDITIONAL_GET_ENABLED:
+        return response
+    response.headers['Cache-Control'] = 'no-cache'
+    if etag is None:
+        response.add_etag(weak=True)
+        return response.make_conditional(request)
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response
 
 
 def backup_database():
@@ -52,22 +116,19 @@ def backup_database():
     try:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        # Backup student database
-        if os.path.exists(Config.STUDENT_DB):
-            backup_file = os.path.join(
-                Config.BACKUP_PATH,
-                f"student_database_{timestamp}.json"
-            )
-            shutil.copy2(Config.STUDENT_DB, backup_file)
-            print(f"✅ Database backed up: {backup_file}")
-        
-        # Backup attendance CSV
-        if os.path.exists(Config.ATTENDANCE_CSV):
-            backup_file = os.path.join(
-                Config.BACKUP_PATH,
-                f"attendance_{timestamp}.csv"
-            )
-            shutil.copy2(Config.ATTENDANCE_CSV, backup_file)
+        # Backup student registry (SQLite backup is safe while others write)
+        backup_file = os.path.join(
+            Config.BACKUP_PATH,
+            f"student_registry_{timestamp}.db"
+        )
+        get_registry().backup(backup_file)
+        print(f"✅ Database backed up: {backup_file}")
+        
+        # Backup attendance (CSV file or zipped partitions)
+        get_attendance_store().backup(os.path.join(
+            Config.BACKUP_PATH,
+            f"attendance_{timestamp}"
+        ))
         
         # Clean old backups (keep last 10)
         cleanup_old_backups()
@@ -76,18 +137,27 @@ def backup_database():
         print(f"Backup error: {e}")
 
 
+# Files written by backup_data(): <kind>_YYYYMMDD_HHMMSS.<ext>
+# (class exports and other files in BACKUP_PATH are never cleaned up)
+BACKUP_FILE_PATTERN = re.compile(
+    r"^(?:student_database|student_registry|attendance)_(\d{8}_\d{6})\.(?:json|db|csv|zip)$"
+)
+
+
 def cleanup_old_backups():
     """Remove old backup files, keep last N"""
     try:
-        backups = [
-            f for f in os.listdir(Config.BACKUP_PATH)
-            if f.startswith("student_database_") or f.startswith("attendance_")
-        ]
+        backups = []
+        for f in os.listdir(Config.BACKUP_PATH):
+            match = BACKUP_FILE_PATTERN.match(f)
+            if match:
+                backups.append((match.group(1), f))
         
+        # Newest first (by timestamp, whatever the prefix)
         backups.sort(reverse=True)
         
         # Remove backups beyond limit
-        for backup in backups[Config.MAX_BACKUP_FILES:]:
+        for timestamp, backup in backups[Config.MAX_BACKUP_FILES:]:
             os.remove(os.path.join(Config.BACKUP_PATH, backup))
     except Exception as e:
         print(f"Cleanup error: {e}")
@@ -96,13 +166,11 @@ def cleanup_old_backups():
 @app.route("/")
 def home():
     """API health check"""
-    db = load_student_database()
-    
     return jsonify({
         "message": "Smart Attendance Backend Running",
         "status": "active",
         "version": "2.0",
-        "totalStudents": len(db),
+        "totalStudents": registry_cache.snapshot().total,
         "config": {
             "branches": Config.ALLOWED_BRANCHES,
             "sections": Config.ALLOWED_SECTIONS
@@ -132,11 +200,10 @@ def get_today_attendance():
         print(f"📊 Loading attendance for: {branch}-{section}")
         
         today = str(datetime.now().date())
-        records = []
-        present_count = 0
         
         # Get actual student count from database
-        total_students = count_students_in_class(branch, section)
+        snapshot = registry_cache.snapshot()
+        total_students = snapshot.count_in_class(branch, section)
         
         if total_students == 0:
             return jsonify({
@@ -144,43 +211,26 @@ def get_today_attendance():
                 "error": f"No students registered in {branch}-{section}"
             }), 404
         
-        # Read attendance records
-        if os.path.exists(Config.ATTENDANCE_CSV):
-            with open(Config.ATTENDANCE_CSV, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                
-                # Track unique students (prevent duplicate counting)
-                present_students = set()
-                
-                for row in reader:
-                    row_date = str(row.get('Date', '')).strip()
-                    row_branch = str(row.get('Branch', '')).strip()
-                    row_section = str(row.get('Section', '')).strip()
-                    roll_no = str(row.get('RollNo', '')).strip()
-                    
-                    if (row_date == today and 
-                        row_branch == branch and 
-                        row_section == section):
-                        
-                        # Only count unique students (in case of duplicate entries)
-                        if roll_no not in present_students:
-                            present_students.add(roll_no)
-                            
-                            records.append({
-                                'name': row.get('Name', 'Unknown'),
-                                'rollNo': roll_no,
-                                'date': row.get('Date', ''),
-                                'time': row.get('Time', '')
-                            })
-                
-                present_count = len(present_students)
+        # One record per student (in case of duplicate entries)
+        etag = last_modified = None
+        if Config.ATTENDANCE_TAIL_ENABLED:
+            records, version, modified = today_attendance.view(branch, section, today)
+            etag = f"today-{ETAG_TOKEN}-{branch}-{section}-{today}-{version}-r{snapshot.version}"
+            last_modified = http_time(max(modified or 0, snapshot.loaded_at))
+            response = not_modified(etag, last_modified)
+            if response is not None:
+                return response
+        else:
+            records = unique_records(get_attendance_store().read_day(today, branch, section))
+        
+        present_count = len(records)
         
         absent_count = total_students - present_count
         percentage = (present_count / total_students * 100) if total_students > 0 else 0
         
         print(f"✅ Found {present_count}/{total_students} present for {branch}-{section} ({percentage:.1f}%)")
         
-        return jsonify({
+        return with_validators(jsonify({
             "success": True,
             "data": {
                 "class": f"{branch}-{section}",
@@ -191,7 +241,7 @@ def get_today_attendance():
                 "percentage": round(percentage, 2),
                 "records": records
             }
-        })
+        }), etag, last_modified)
         
     except Exception as e:
         print(f"❌ Error: {str(e)}")
@@ -203,6 +253,328 @@ def get_today_attendance():
         }), 500
 
 
+@app.route("/api/attendance/stream", methods=['GET'])
+def stream_attendance():
+    """
+    Live attendance for a class as Server-Sent Events
+    Query params: branch, section (resume with the Last-Event-ID header)
+    """
+    try:
+        branch = request.args.get('branch', '').upper()
+        section = request.args.get('section', '').upper()
+        
+        try:
+            AttendanceValidator.validate_class_selection(branch, section)
+        except ValidationError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
+        
+        try:
+            subscription = attendance_events.subscribe(branch, section)
+        except AttendanceStreamError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 503
+        
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+        response = app.response_class(
+            attendance_events.events(subscription, last_event_id),
+            mimetype='text/event-stream'
+        )
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        # Also runs if the client leaves before the stream starts
+        response.call_on_close(subscription.close)
+        return response
+    
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@app.route("/api/attendance/session", methods=['GET'])
+def get_attendance_session():
+    """
+    Live counters of the recognizer running for a class (null if none reported)
+    Query params: branch, section
+    """
+    try:
+        branch = request.args.get('branch', '').upper()
+        section = request.args.get('section', '').upper()
+        
+        try:
+            AttendanceValidator.validate_class_selection(branch, section)
+        except ValidationError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
+        
+        return jsonify({
+            "success": True,
+            "data": attendance_events.session(branch, section)
+        })
+    
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@app.route("/api/attendance/analytics", methods=['GET'])
+def get_attendance_analytics():
+    """
+    Daily counts, per-student attendance and arrival times for a class
+    Query params: branch, section, from, to (YYYY-MM-DD, optional), bin (minutes)
+    """
+    try:
+        branch = request.args.get('branch', '').upper()
+        section = request.args.get('section', '').upper()
+        first_date = request.args.get('from') or None
+        last_date = request.args.get('to') or None
+        
+        try:
+            AttendanceValidator.validate_class_selection(branch, section)
+            for value in (first_date, last_date):
+                if value:
+                    datetime.strptime(value, "%Y-%m-%d")
+            bin_minutes = int(request.args.get('bin', 5))
+            if not 1 <= bin_minutes <= 60:
+                raise ValueError("bin must be between 1 and 60 minutes")
+        except (ValidationError, ValueError) as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
+        
+        unavailable = analytics_unavailable()
+        if unavailable is not None:
+            return unavailable
+        
+        report = get_columnar_store().class_report(branch, section, first_date, last_date, bin_minutes)
+        days_held = report['days_held']
+        
+        # Every registered student, plus anyone marked who has since been removed
+        attended = dict(report['students'])
+        students = []
+        for info in registry_cache.snapshot().roster(branch, section):
+            present = attended.pop(info['rollNo'], (None, 0))[1]
+            students.append({'name': info['name'], 'rollNo': info['rollNo'], 'present': present})
+        for roll_no, (name, present) in sorted(attended.items()):
+            students.append({'name': name, 'rollNo': roll_no, 'present': present})
+        for student in students:
+            student['percentage'] = round(student['present'] / days_held * 100, 2) if days_held else 0
+        
+        daily = [{'date': date, 'present': present} for date, present in report['days']]
+        average = sum(day['present'] for day in daily) / days_held if days_held else 0
+        
+        return jsonify({
+            "success": True,
+            "data": {
+                "class": f"{branch}-{section}",
+                "from": first_date,
+                "to": last_date,
+                "daysHeld": days_held,
+                "averagePresent": round(average, 2),
+                "daily": daily,
+                "students": students,
+                "arrivals": [{'time': time, 'count': count} for time, count in report['arrivals']]
+            }
+        })
+    
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+def analytics_unavailable():
+    """503 response if the columnar store cannot be trusted, else None"""
+    if not Config.ATTENDANCE_COLUMNAR_ENABLED:
+        return jsonify({
+            "success": False,
+            "error": "Attendance analytics are disabled (ATTENDANCE_COLUMNAR_ENABLED)"
+        }), 503
+    
+    reason = get_columnar_store().stale_reason()
+    if reason:
+        return jsonify({
+            "success": False,
+            "error": f"Attendance analytics are out of date ({reason}) - run: python attendance_columnar.py rebuild"
+        }), 503
+    return None
+
+
+def presence_args():
+    """
+    branch, section, from and to of a presence request
+    
+    Raises:
+        ValidationError / ValueError: Bad class or date
+    """
+    branch = request.args.get('branch', '').upper()
+    section = request.args.get('section', '').upper()
+    first_date = request.args.get('from') or Config.SEMESTER_START_DATE
+    last_date = request.args.get('to') or None
+    
+    AttendanceValidator.validate_class_selection(branch, section)
+    for value in (first_date, last_date):
+        if value:
+            datetime.strptime(value, "%Y-%m-%d")
+    return branch, section, first_date, last_date
+
+
+def class_presence(branch, section):
+    """Up-to-date PresenceMatrix for the class's current roster"""
+    roster = registry_cache.snapshot().roster(branch, section)
+    
+    # Today's marks straight from the attendance store, in case the columnar copy lags
+    today = str(datetime.now().date())
+    if Config.ATTENDANCE_TAIL_ENABLED:
+        records = today_attendance.view(branch, section, today)[0]
+    else:
+        records = unique_records(get_attendance_store().read_day(today, branch, section))
+    return presence_cache.matrix(branch, section, roster, (today, [record['rollNo'] for record in records]))
+
+
+@app.route("/api/attendance/absentees", methods=['GET'])
+def get_absentees():
+    """
+    Absent students of a class on one day
+    Query params: branch, section, date (YYYY-MM-DD, default today)
+    """
+    try:
+        try:
+            branch, section, first_date, last_date = presence_args()
+            date = request.args.get('date') or str(datetime.now().date())
+            datetime.strptime(date, "%Y-%m-%d")
+        except (ValidationError, ValueError) as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
+        
+        unavailable = analytics_unavailable()
+        if unavailable is not None:
+            return unavailable
+        
+        matrix = class_presence(branch, section)
+        report = absentee_report(matrix, date)
+        
+        return jsonify({
+            "success": True,
+            "data": {
+                "class": f"{branch}-{section}",
+                "date": date,
+                "held": report['held'],
+                "total": len(matrix.rolls),
+                "presentCount": len(report['present']),
+                "absentCount": len(report['absent']),
+                "absent": report['absent']
+            }
+        })
+    
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@app.route("/api/attendance/semester", methods=['GET'])
+def get_semester_report():
+    """
+    Attendance %, days present and absence streaks per student
+    Query params: branch, section, from, to (default: SEMESTER_START_DATE onwards)
+    """
+    try:
+        try:
+            branch, section, first_date, last_date = presence_args()
+        except (ValidationError, ValueError) as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
+        
+        unavailable = analytics_unavailable()
+        if unavailable is not None:
+            return unavailable
+        
+        report = semester_report(class_presence(branch, section), first_date, last_date)
+        report.update({
+            "class": f"{branch}-{section}",
+            "from": first_date,
+            "to": last_date
+        })
+        
+        return jsonify({
+            "success": True,
+            "data": report
+        })
+    
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@app.route("/api/attendance/below-threshold", methods=['GET'])
+def get_below_threshold():
+    """
+    Students under the minimum attendance percentage, lowest first
+    Query params: branch, section, from, to, threshold (default ATTENDANCE_MIN_PERCENTAGE)
+    """
+    try:
+        try:
+            branch, section, first_date, last_date = presence_args()
+            threshold = float(request.args.get('threshold', Config.ATTENDANCE_MIN_PERCENTAGE))
+        except (ValidationError, ValueError) as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
+        
+        unavailable = analytics_unavailable()
+        if unavailable is not None:
+            return unavailable
+        
+        report = semester_report(class_presence(branch, section), first_date, last_date)
+        students = below_threshold(report, threshold)
+        
+        return jsonify({
+            "success": True,
+            "data": {
+                "class": f"{branch}-{section}",
+                "from": first_date,
+                "to": last_date,
+                "threshold": threshold,
+                "daysHeld": report['daysHeld'],
+                "count": len(students),
+                "students": students
+            }
+        })
+    
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
 @app.route("/api/class/stats", methods=['GET'])
 def get_class_stats():
     """Get statistics for a specific class"""
@@ -210,26 +582,24 @@ def get_class_stats():
         branch = request.args.get('branch', '').upper()
         section = request.args.get('section', '').upper()
         
-        db = load_student_database()
+        snapshot = registry_cache.snapshot()
+        etag = f"class-{ETAG_TOKEN}-{branch}-{section}-r{snapshot.version}"
+        last_modified = http_time(snapshot.loaded_at)
+        response = not_modified(etag, last_modified)
+        if response is not None:
+            return response
         
-        students = []
-        for student_id, info in db.items():
-            if info.get('branch') == branch and info.get('section') == section:
-                students.append({
-                    'name': info['name'],
-                    'rollNo': info['rollNo'],
-                    'images': info.get('imagesCount', 0),
-                    'registered': info.get('registeredDate', 'N/A')
-                })
+        # Already ordered by roll number
+        students = snapshot.roster(branch, section)
         
-        return jsonify({
+        return with_validators(jsonify({
             "success": True,
             "data": {
                 "class": f"{branch}-{section}",
                 "totalStudents": len(students),
-                "students": sorted(students, key=lambda x: x['rollNo'])
+                "students": students
             }
-        })
+        }), etag, last_modified)
     
     except Exception as e:
         print(f"❌ Error: {str(e)}")
@@ -243,36 +613,23 @@ def get_class_stats():
 def get_classes_summary():
     """Get summary of all classes with student counts"""
     try:
-        db = load_student_database()
-        
-        # Count students by class
-        class_counts = {}
-        for student_id, info in db.items():
-            branch = info.get('branch', 'UNKNOWN')
-            section = info.get('section', 'UNKNOWN')
-            class_key = f"{branch}-{section}"
-            class_counts[class_key] = class_counts.get(class_key, 0) + 1
-        
-        # Format response
-        classes = []
-        for class_key, count in sorted(class_counts.items()):
-            if '-' in class_key:
-                branch, section = class_key.split('-')
-                classes.append({
-                    'branch': branch,
-                    'section': section,
-                    'class': class_key,
-                    'students': count
-                })
-        
-        return jsonify({
+        # Precomputed per class
+        snapshot = registry_cache.snapshot()
+        etag = f"classes-{ETAG_TOKEN}-r{snapshot.version}"
+        last_modified = http_time(snapshot.loaded_at)
+        response = not_modified(etag, last_modified)
+        if response is not None:
+            return response
+        classes = snapshot.classes
+        
+        return with_validators(jsonify({
             "success": True,
             "data": {
                 "totalClasses": len(classes),
-                "totalStudents": len(db),
+                "totalStudents": snapshot.total,
                 "classes": classes
             }
-        })
+        }), etag, last_modified)
     
     except Exception as e:
         print(f"❌ Error: {str(e)}")
@@ -282,6 +639,62 @@ def get_classes_summary():
         }), 500
 
 
+@app.route("/api/students/search", methods=['GET'])
+def search_students():
+    """Search students by name or roll number prefix, with typo tolerance"""
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({
+                "success": False,
+                "error": "Query parameter 'q' is required"
+            }), 400
+
+        try:
+            offset = max(0, int(request.args.get('offset', 0)))
+            limit = int(request.args.get('limit', Config.SEARCH_PAGE_SIZE))
+        except ValueError:
+            return jsonify({
+                "success": False,
+                "error": "offset and limit must be integers"
+            }), 400
+        limit = min(max(1, limit), Config.SEARCH_MAX_PAGE_SIZE)
+
+        snapshot, results, has_more = registry_cache.search(query, offset, limit)
+
+        matches = []
+        for student_id, match, score in results:
+            info = snapshot.students[student_id]
+            matches.append({
+                "studentId": student_id,
+                "name": info['name'],
+                "rollNo": info['rollNo'],
+                "branch": info.get('branch', 'UNKNOWN'),
+                "section": info.get('section', 'UNKNOWN'),
+                "images": info.get('imagesCount', 0),
+                "match": match,
+                "score": score
+            })
+
+        return jsonify({
+            "success": True,
+            "data": {
+                "query": query,
+                "offset": offset,
+                "limit": limit,
+                "hasMore": has_more,
+                "results": matches
+            }
+        })
+
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
 @app.route("/api/attendance/start", methods=['POST'])
 def start_attendance():
     """Start attendance recognition system"""
@@ -320,7 +733,8 @@ def start_attendance():
             }), 400
         
         # Check if trainer model exists
-        if not os.path.exists(Config.TRAINER_MODEL):
+        model_file, _ = model_paths(Config.RECOGNIZER_BACKEND)
+        if not os.path.exists(model_file):
             return jsonify({
                 "success": False,
                 "message": "Model not trained! Please run: python train_model.py"
@@ -397,30 +811,28 @@ def export_attendance():
         branch = request.args.get('branch', '').upper()
         section = request.args.get('section', '').upper()
         
-        if not os.path.exists(Config.ATTENDANCE_CSV):
+        # One class only (without a class export_csv would write every record)
+        try:
+            AttendanceValidator.validate_class_selection(branch, section)
+        except ValidationError as e:
             return jsonify({
                 "success": False,
-                "error": "Attendance file not found"
-            }), 404
+                "error": str(e)
+            }), 400
         
-        # Create filtered CSV
+        # Create filtered CSV (same columns as the old attendance.csv)
         timestamp = datetime.now().strftime('%Y%m%d')
         filtered_file = os.path.join(
             Config.BACKUP_PATH,
             f"attendance_{branch}_{section}_{timestamp}.csv"
         )
         
-        with open(Config.ATTENDANCE_CSV, 'r', encoding='utf-8') as infile:
-            reader = csv.DictReader(infile)
-            
-            with open(filtered_file, 'w', newline='', encoding='utf-8') as outfile:
-                fieldnames = reader.fieldnames
-                writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-                writer.writeheader()
-                
-                for row in reader:
-                    if row.get('Branch', '') == branch and row.get('Section', '') == section:
-                        writer.writerow(row)
+        exported = export_csv(filtered_file, get_attendance_store(), branch, section)
+        if exported == 0:
+            return jsonify({
+                "success": False,
+                "error": f"No attendance records for {branch}-{section}"
+            }), 404
         
         return send_file(
             filtered_file,
@@ -453,6 +865,88 @@ def create_backup():
         }), 500
 
 
+@app.route("/api/training/jobs", methods=['POST'])
+def start_training_job():
+    """
+    Start a background training job
+    Body: {"backend": "lbph|eigen|fisher", "mode": "full|incremental", "streaming": true|false}
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        job = training_jobs.start_job(data.get('backend'), data.get('mode', 'full'), data.get('streaming'))
+        
+        print(f"🧠 Training job {job['id']} started ({job['backend']}, {job['mode']})")
+        
+        return jsonify({
+            "success": True,
+            "data": job
+        }), 202
+    
+    except TrainingJobError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), e.status_code
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@app.route("/api/training/jobs", methods=['GET'])
+def list_training_jobs():
+    """Training job history (newest first)"""
+    try:
+        jobs = training_jobs.list_jobs()
+        return jsonify({
+            "success": True,
+            "data": {
+                "total": len(jobs),
+                "jobs": jobs
+            }
+        })
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@app.route("/api/training/jobs/<job_id>", methods=['GET'])
+def get_training_job(job_id):
+    """Progress of one training job"""
+    try:
+        return jsonify({
+            "success": True,
+            "data": training_jobs.get_job(job_id)
+        })
+    except TrainingJobError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), e.status_code
+
+
+@app.route("/api/training/jobs/<job_id>/cancel", methods=['POST'])
+def cancel_training_job(job_id):
+    """Cancel a running training job"""
+    try:
+        job = training_jobs.cancel_job(job_id)
+        print(f"⏹️ Cancelling training job {job_id}")
+        return jsonify({
+            "success": True,
+            "data": job
+        })
+    except TrainingJobError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), e.status_code
+
+
 if __name__ == "__main__":
     print("=" * 70)
     print("🚀 SMART ATTENDANCE SYSTEM - BACKEND API")
@@ -465,32 +959,32 @@ if __name__ == "__main__":
     Config.create_directories()
     
     # Check student database
-    db = load_student_database()
-    print(f"👥 Total students registered: {len(db)}")
+    registry = get_registry()
+    print(f"👥 Total students registered: {registry.count()}")
+    print(f"🗄️  Student registry: {registry.db_path}")
     
     # Show class summary
-    class_counts = {}
-    for info in db.values():
-        branch = info.get('branch', 'UNKNOWN')
-        section = info.get('section', 'UNKNOWN')
-        class_key = f"{branch}-{section}"
-        class_counts[class_key] = class_counts.get(class_key, 0) + 1
+    class_counts = registry.class_counts()
     
     if class_counts:
         print("📊 Students by class:")
-        for class_key, count in sorted(class_counts.items()):
-            print(f"   {class_key}: {count} students")
+        for (branch, section), count in sorted(class_counts.items()):
+            print(f"   {branch}-{section}: {count} students")
     else:
         print("⚠️  No students registered yet")
         print("   Run: python face_capture.py OR python bulk_capture.py")
     
     # Check if model is trained
-    if os.path.exists(Config.TRAINER_MODEL):
-        print("✅ Model trained and ready")
+    model_file, _ = model_paths(Config.RECOGNIZER_BACKEND)
+    if os.path.exists(model_file):
+        print(f"✅ Model trained and ready ({Config.RECOGNIZER_BACKEND})")
     else:
         print("⚠️  Model not trained yet")
         print("   Run: python train_model.py")
     
+    # Marks reach the dashboard over the live channel when the recognizer can connect
+    recognizer_channel.start()
+    
     print("=" * 70)
     print(f"🌐 Starting API server on {Config.API_HOST}:{Config.API_PORT}")
     print("=" * 70)
@@ -0,0 +1,105 @@
+"""
+Smart Attendance System - Asynchronous Image Writer
+Encodes and writes captured face crops off the camera loop
+"""
+
+import queue
+import threading
+import time
+import cv2
+from config import Config
+
+
+class AsyncImageWriter(threading.Thread):
+    """
+    Background thread that saves images from a bounded queue
+
+    write() only copies the crop and queues it. When the disk falls behind
+    and the queue is full, write() blocks until there is room
+    (backpressure), so images are never dropped. flush() waits until
+    everything queued is on disk; close() flushes and stops the thread.
+    With enabled=False, write() saves inline like before.
+    """
+
+    def __init__(self, max_queue=None, enabled=None, write_func=None):
+        super().__init__(name="image-writer", daemon=True)
+        self.enabled = Config.ASYNC_WRITER_ENABLED if enabled is None else enabled
+        self.write_func = write_func or cv2.imwrite
+        self._queue = queue.Queue(maxsize=max_queue or Config.ASYNC_WRITER_QUEUE_SIZE)
+        self._closed = False
+
+        self.written = 0
+        self.failed = []
+        self.max_depth = 0
+        self.blocked_seconds = 0.0
+
+        if self.enabled:
+            self.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _save(self, path, image):
+        try:
+            ok = self.write_func(path, image)
+        except Exception:
+            ok = False
+        if ok is False:
+            self.failed.append(path)
+        else:
+            self.written += 1
+
+    def run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._save(*item)
+            finally:
+                self._queue.task_done()
+
+    def write(self, path, image):
+        """Queue an image for saving (blocks while the queue is full)"""
+        if self._closed:
+            raise RuntimeError("Image writer is closed")
+
+        if not self.enabled:
+            self._save(path, image)
+            return
+
+        item = (path, image.copy())
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            start = time.perf_counter()
+            self._queue.put(item)
+            self.blocked_seconds += time.perf_counter() - start
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    def flush(self):
+        """Wait until every queued image has been written"""
+        if self.enabled:
+            self._queue.join()
+
+    def close(self):
+        """Flush and stop the writer thread (safe to call more than once)"""
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        if self.enabled:
+            self._queue.put(None)
+            self.join()
+
+    def summary(self):
+        """One-line stats"""
+        text = f"{self.written} written"
+        if self.failed:
+            text += f", {len(self.failed)} FAILED"
+        if self.enabled:
+            text += f", max queue {self.max_depth}, waited {self.blocked_seconds:.2f}s for disk"
+        return text
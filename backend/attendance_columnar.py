@@ -0,0 +1,627 @@
+"""
+Smart Attendance System - Columnar Attendance Store
+Attendance events as NumPy arrays for fast class analytics
+
+Every mark is four integers:
+    student - code into the student dictionary (roll numbers)
+    cls     - code into the class dictionary ("BRANCH-SECTION")
+    day     - days since 1970-01-01
+    seconds - seconds since midnight
+
+The dictionaries live in dictionary.json (codes are never reused) and
+the arrays in .npz files, numbered by batch (seq):
+    seg_<seq>.npz                  - one appended batch (tier 0)
+    run_<tier>_<first>_<last>.npz  - batches first..last, merged
+    base_<seq>.npz                 - every batch up to seq (rebuild / compact)
+Merging is tiered: once there are more than COLUMNAR_COMPACT_SEGMENTS
+files of one tier they become one file of the next tier, so a merge only
+reads small files and never the whole history; tier COLUMNAR_MAX_TIER
+files are not merged further. A merged file hides the files it was made
+from until they are deleted, so readers in another process never count
+a batch twice.
+
+The store is built from the attendance store the first time it is
+opened; after that the recognizer appends each batch to both. Writes
+take <root>.lock. A rebuild stages into its own directory under
+<root>.rebuild.lock, carries over the batches the recognizer appended
+meanwhile and swaps the directory in; a build_<id> marker tells readers
+to load the new store from scratch.
+
+If marks reach the attendance store but not this one (a failed append,
+or the recognizer run with ATTENDANCE_COLUMNAR_ENABLED off), a "stale"
+file records why; the API refuses to serve analytics until a rebuild.
+
+Usage:
+    python attendance_columnar.py rebuild   # from the attendance store
+    python attendance_columnar.py compact   # merge everything into one base file
+"""
+
+import glob
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import numpy as np
+from config import Config
+from file_lock import FileLock
+
+COLUMNS = ("student", "cls", "day", "seconds")
+DTYPES = {"student": np.int32, "cls": np.int16, "day": np.int32, "seconds": np.int32}
+
+DICTIONARY_FILE = "dictionary.json"
+BUILD_MARKER_PREFIX = "build_"  # build_<id>: new for every rebuild
+STALE_FILE = "stale"  # Why marks are missing; gone after a rebuild
+
+_SEGMENT_PATTERN = re.compile(r"seg_(\d+)\.npz|run_(\d+)_(\d+)_(\d+)\.npz|base_(\d+)\.npz")
+BASE_TIER = -1  # Bases are only made by rebuild() and compact()
+_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+_TIME_PATTERN = re.compile(r"(\d{1,2}):(\d{2})(?::(\d{2}))?")
+
+
+def day_number(date):
+    """'YYYY-MM-DD' -> days since 1970-01-01"""
+    return int(np.datetime64(date, 'D').astype(np.int64))
+
+
+def day_string(number):
+    return str(np.datetime64(int(number), 'D'))
+
+
+def time_string(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}"
+
+
+def _parse_segment(name):
+    """(first seq, last seq, tier, name) of a store file, or None"""
+    match = _SEGMENT_PATTERN.fullmatch(name)
+    if not match:
+        return None
+    seg, tier, first, last, base = match.groups()
+    if seg:
+        return (int(seg), int(seg), 0, name)
+    if base:
+        return (0, int(base), BASE_TIER, name)
+    return (int(first), int(last), int(tier), name)
+
+
+def _empty_columns():
+    return {column: np.zeros(0, dtype=DTYPES[column]) for column in COLUMNS}
+
+
+class ColumnarAttendanceStore:
+    """Dictionary-encoded attendance events in .npz segments"""
+
+    def __init__(self, root=None, source=None, build=True):
+        self.root = root or Config.ATTENDANCE_COLUMNAR_DIR
+        self._lock = threading.Lock()
+
+        self.students = []       # code -> roll number
+        self.student_names = []  # code -> latest name seen
+        self.classes = []        # code -> "BRANCH-SECTION"
+        self._student_codes = {}
+        self._class_codes = {}
+
+        # Loaded arrays, the segment files they came from and their build marker
+        self._columns = _empty_columns()
+        self._loaded = []
+        self._loaded_build = None
+
+        # class code -> (events covered, positions of that class's events)
+        self._class_rows = {}
+        # Bumped whenever event positions may have changed (full reload)
+        self.generation = 0
+
+        if build and not os.path.isdir(self.root):
+            self.rebuild(source, if_missing=True)
+        self._load_dictionary()
+
+    # ---------- files ----------
+
+    def _list(self):
+        """
+        (build marker, files that make up the store oldest first as
+        [(first, last, tier, name)]); (None, None) if the root is missing
+        """
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return None, None
+        build = next((name for name in names if name.startswith(BUILD_MARKER_PREFIX)), None)
+        found = sorted(
+            (segment for segment in map(_parse_segment, names) if segment),
+            key=lambda segment: (segment[0], -segment[1])
+        )
+
+        # A merged file covers the files it was made from (until they are deleted)
+        segments = []
+        end = -1
+        for segment in found:
+            if segment[0] > end:
+                segments.append(segment)
+                end = segment[1]
+        return build, segments
+
+    def _segments(self):
+        return self._list()[1] or []
+
+    def _next_seq(self):
+        return max((segment[1] for segment in self._segments()), default=0) + 1
+
+    def _load_dictionary(self):
+        path = os.path.join(self.root, DICTIONARY_FILE)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {}
+        self.students = data.get('students', [])
+        self.student_names = data.get('names', [])
+        self.classes = data.get('classes', [])
+        self._student_codes = {roll: code for code, roll in enumerate(self.students)}
+        self._class_codes = {name: code for code, name in enumerate(self.classes)}
+
+    def _save_dictionary(self):
+        path = os.path.join(self.root, DICTIONARY_FILE)
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({
+                'students': self.students,
+                'names': self.student_names,
+                'classes': self.classes
+            }, f)
+        os.replace(path + ".tmp", path)
+
+    def _write_segment(self, name, columns):
+        path = os.path.join(self.root, name)
+        # np.savez adds .npz unless the name already ends with it
+        temp_path = path[:-len(".npz")] + ".tmp.npz"
+        np.savez(temp_path, **columns)
+        os.replace(temp_path, path)
+
+    # ---------- writes ----------
+
+    def _code_student(self, roll_no, name):
+        """Dictionary code of a roll number (added if new); keeps the latest name"""
+        code = self._student_codes.get(roll_no)
+        if code is None:
+            code = self._student_codes[roll_no] = len(self.students)
+            self.students.append(roll_no)
+            self.student_names.append(name)
+        else:
+            self.student_names[code] = name
+        return code
+
+    def _code_class(self, class_name):
+        code = self._class_codes.get(class_name)
+        if code is None:
+            code = self._class_codes[class_name] = len(self.classes)
+            self.classes.append(class_name)
+        return code
+
+    def _encode(self, rows):
+        """Attendance rows (lists or dicts) -> column arrays; invalid rows are skipped"""
+        student, cls, day, seconds = [], [], [], []
+        day_cache = {}
+        for row in rows:
+            if isinstance(row, dict):
+                row = [row.get(field, '') for field in ("Name", "RollNo", "Branch", "Section", "Date", "Time")]
+            name, roll_no, branch, section, date, time_str = (str(value).strip() for value in row[:6])
+            time_match = _TIME_PATTERN.fullmatch(time_str)
+            if not roll_no or not _DATE_PATTERN.fullmatch(date) or not time_match:
+                continue
+
+            code = self._code_student(roll_no, name)
+            class_code = self._code_class(f"{branch}-{section}")
+
+            number = day_cache.get(date)
+            if number is None:
+                number = day_cache[date] = day_number(date)
+
+            hours, minutes, secs = time_match.groups()
+            student.append(code)
+            cls.append(class_code)
+            day.append(number)
+            seconds.append(int(hours) * 3600 + int(minutes) * 60 + int(secs or 0))
+
+        return {
+            "student": np.array(student, dtype=DTYPES["student"]),
+            "cls": np.array(cls, dtype=DTYPES["cls"]),
+            "day": np.array(day, dtype=DTYPES["day"]),
+            "seconds": np.array(seconds, dtype=DTYPES["seconds"])
+        }
+
+    def append(self, rows):
+        """
+        Store one batch of attendance rows as a new segment
+
+        Returns:
+            int: Number of events stored
+        """
+        with self._lock, FileLock(self.root + ".lock"):
+            os.makedirs(self.root, exist_ok=True)
+            # Another process may have added students or classes
+            self._load_dictionary()
+            columns = self._encode(rows)
+            count = len(columns["student"])
+            if count == 0:
+                return 0
+
+            # Dictionary first, so every code in a segment can be resolved
+            self._save_dictionary()
+            self._write_segment(f"seg_{self._next_seq():08d}.npz", columns)
+            self._merge_tiers()
+        return count
+
+    def _merge(self, segments, name):
+        """Write segments (consecutive) as one file and remove them"""
+        self._write_segment(name, self._read_segments(segments))
+        for segment in segments:
+            try:
+                os.remove(os.path.join(self.root, segment[3]))
+            except FileNotFoundError:
+                pass
+
+    def _merge_tiers(self):
+        """
+        Merge a tier into one file of the next tier once it has more than
+        COLUMNAR_COMPACT_SEGMENTS files
+
+        Runs after every append in the recognizer, so it never touches
+        tier COLUMNAR_MAX_TIER (the bulk of the history).
+        """
+        for tier in range(Config.COLUMNAR_MAX_TIER):
+            segments = self._segments()
+            group = [segment for segment in segments if segment[2] == tier]
+            if len(group) <= Config.COLUMNAR_COMPACT_SEGMENTS:
+                return
+            start = segments.index(group[0])
+            if segments[start:start + len(group)] != group:
+                return  # Not consecutive (left by an older version); compact() handles it
+            self._merge(group, f"run_{tier + 1}_{group[0][0]:08d}_{group[-1][1]:08d}.npz")
+
+    def mark_stale(self, reason):
+        """Record that marks were stored without this store (no-op if it was never built)"""
+        if not os.path.isdir(self.root):
+            return
+        with FileLock(self.root + ".lock"):
+            with open(os.path.join(self.root, STALE_FILE), 'w', encoding='utf-8') as f:
+                f.write(reason)
+
+    def stale_reason(self):
+        """Why the store is missing marks, or None if it is in step with the attendance store"""
+        try:
+            with open(os.path.join(self.root, STALE_FILE), 'r', encoding='utf-8') as f:
+                return f.read().strip() or "marks missing"
+        except FileNotFoundError:
+            return None
+
+    def compact(self):
+        """Merge every file into one base file (reads the whole history)"""
+        with self._lock, FileLock(self.root + ".lock"):
+            segments = self._segments()
+            if len(segments) > 1:
+                self._merge(segments, f"base_{segments[-1][1]:08d}.npz")
+
+    def rebuild(self, source=None, batch_size=100000, if_missing=False):
+        """
+        Build the store from every row of an attendance store
+
+        Safe while the recognizer is appending: the new store is written to
+        its own staging directory, batches appended meanwhile are carried
+        over and the directory is swapped in under the write lock. One
+        rebuild runs at a time (<root>.rebuild.lock).
+
+        Args:
+            if_missing: Skip if the store exists by the time the lock is
+                taken (built by another process on first open)
+
+        Returns:
+            int: Number of events stored
+        """
+        if source is None:
+            from attendance_store import get_attendance_store
+            source = get_attendance_store()
+
+        root = self.root
+        parent = os.path.dirname(os.path.abspath(root))
+        with FileLock(root + ".rebuild.lock"):
+            if if_missing and os.path.isdir(root):
+                return 0
+
+            # Left by rebuilds that were interrupted
+            for leftover in glob.glob(glob.escape(root) + ".building-*"):
+                shutil.rmtree(leftover, ignore_errors=True)
+
+            # Batches appended from here on may be missing from what source returns
+            current = ColumnarAttendanceStore(root, build=False)
+            position = len(current)
+            started = time.time()
+
+            staging = tempfile.mkdtemp(prefix=os.path.basename(root) + ".building-", dir=parent)
+            retired = staging + "-old"
+            try:
+                staged = ColumnarAttendanceStore(staging, build=False)
+                parts = []
+                batch = []
+                for row in source.iter_all():
+                    batch.append(row)
+                    if len(batch) >= batch_size:
+                        parts.append(staged._encode(batch))
+                        batch = []
+                if batch:
+                    parts.append(staged._encode(batch))
+
+                columns = {
+                    column: np.concatenate([part[column] for part in parts]) if parts else _empty_columns()[column]
+                    for column in COLUMNS
+                }
+                staged._write_segment(f"base_{1:08d}.npz", columns)
+                open(os.path.join(staging, BUILD_MARKER_PREFIX + uuid.uuid4().hex), 'w').close()
+
+                with FileLock(root + ".lock"):
+                    carried = staged._carry_over(current, position, columns)
+                    if len(carried["student"]):
+                        staged._write_segment(f"seg_{2:08d}.npz", carried)
+                    staged._save_dictionary()
+
+                    # Marks lost after source was read are not in the new store either
+                    stale = os.path.join(root, STALE_FILE)
+                    if os.path.exists(stale) and os.path.getmtime(stale) >= started:
+                        shutil.copyfile(stale, os.path.join(staging, STALE_FILE))
+
+                    # A directory cannot be renamed over one that has files in it
+                    if os.path.isdir(root):
+                        os.replace(root, retired)
+                    try:
+                        os.replace(staging, root)
+                    except OSError:
+                        if os.path.isdir(retired):
+                            os.replace(retired, root)
+                        raise
+            except BaseException:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+            shutil.rmtree(retired, ignore_errors=True)
+
+        with self._lock:
+            self._columns = _empty_columns()
+            self._loaded = []
+            self._class_rows = {}
+        self._load_dictionary()
+
+        count = len(columns["student"]) + len(carried["student"])
+        print(f"✅ Columnar attendance store built: {count} events, "
+              f"{len(staged.students)} students, {len(staged.classes)} classes ({root})")
+        return count
+
+    def _carry_over(self, current, position, columns):
+        """
+        Events current stored at positions >= position, in this store's codes
+
+        Merges keep the order of events, so these are the batches appended
+        since position was taken. The recognizer writes the attendance store
+        first, so some of them may already be in columns (read from there);
+        those are left out.
+        """
+        events = current.columns()
+        recent = {column: events[column][position:] for column in COLUMNS}
+        if len(recent["student"]) == 0:
+            return _empty_columns()
+
+        student_map = np.zeros(len(current.students), dtype=DTYPES["student"])
+        for code in np.unique(recent["student"]).tolist():
+            student_map[code] = self._code_student(current.students[code], current.student_names[code])
+        class_map = np.zeros(len(current.classes), dtype=DTYPES["cls"])
+        for code in np.unique(recent["cls"]).tolist():
+            class_map[code] = self._code_class(current.classes[code])
+        recent["student"] = student_map[recent["student"]]
+        recent["cls"] = class_map[recent["cls"]]
+
+        same_days = columns["day"] >= recent["day"].min()
+        stored = set(zip(*(columns[column][same_days].tolist() for column in COLUMNS)))
+        keep = np.array([
+            event not in stored for event in zip(*(recent[column].tolist() for column in COLUMNS))
+        ], dtype=bool)
+        return {column: recent[column][keep] for column in COLUMNS}
+
+    # ---------- reads ----------
+
+    def _read_segments(self, segments):
+        parts = []
+        for first, last, tier, name in segments:
+            with np.load(os.path.join(self.root, name)) as data:
+                parts.append({column: data[column] for column in COLUMNS})
+        if not parts:
+            return _empty_columns()
+        return {column: np.concatenate([part[column] for part in parts]) for column in COLUMNS}
+
+    def columns(self):
+        """Every event as {column: array}, reading only segments added since last time"""
+        with self._lock:
+            for attempt in range(3):
+                build, segments = self._list()
+                if segments is None:
+                    break  # Being swapped in by a rebuild; keep what is loaded
+                if build == self._loaded_build and segments == self._loaded:
+                    break
+                try:
+                    if build == self._loaded_build and self._only_appended(segments):
+                        new = self._read_segments([segment for segment in segments
+                                                   if segment[0] > self._loaded[-1][1]])
+                        self._columns = {
+                            column: np.concatenate([self._columns[column], new[column]]) for column in COLUMNS
+                        }
+                    else:
+                        # First load, or the store was compacted / rebuilt
+                        self._columns = self._read_segments(segments)
+                        self._class_rows = {}
+                        self.generation += 1
+                except FileNotFoundError:
+                    # Merged or rebuilt by the writer while we listed; list again
+                    self._loaded = []
+                    continue
+                self._load_dictionary()
+                if self._list()[0] != build:
+                    # Rebuilt while we read: the files may be from either store
+                    self._loaded = []
+                    continue
+                self._loaded, self._loaded_build = segments, build
+                break
+            return self._columns
+
+    def _only_appended(self, segments):
+        """
+        segments hold the loaded batches (merged or not) plus newer ones
+
+        Merging keeps the order of events, so the loaded arrays stay valid
+        and only the newer files need reading.
+        """
+        if not self._loaded:
+            return False
+        first, end = self._loaded[0][0], self._loaded[-1][1]
+        return segments[0][0] == first and any(segment[1] == end for segment in segments) and all(
+            segment[1] <= end or segment[0] > end for segment in segments
+        )
+
+    def __len__(self):
+        return len(self.columns()["student"])
+
+    def class_events(self, branch, section, first_date=None, last_date=None):
+        """(student, day, seconds) arrays for one class, optionally within a date range"""
+        columns = self.columns()
+        class_code = self._class_codes.get(f"{branch}-{section}")
+        if class_code is None:
+            return (np.zeros(0, dtype=np.int32),) * 3
+
+        # Positions of the class's events, extended as events are appended
+        with self._lock:
+            covered, rows = self._class_rows.get(class_code, (0, np.zeros(0, dtype=np.int64)))
+            total = len(columns["cls"])
+            if covered < total:
+                new_rows = np.flatnonzero(columns["cls"][covered:] == class_code) + covered
+                rows = np.concatenate([rows, new_rows])
+                self._class_rows[class_code] = (total, rows)
+
+        student, day, seconds = columns["student"][rows], columns["day"][rows], columns["seconds"][rows]
+        if first_date or last_date:
+            mask = np.ones(len(day), dtype=bool)
+            if first_date:
+                mask &= day >= day_number(first_date)
+            if last_date:
+                mask &= day <= day_number(last_date)
+            student, day, seconds = student[mask], day[mask], seconds[mask]
+        return student, day, seconds
+
+    def student_code(self, roll_no):
+        """Dictionary code of a roll number, or None if it was never marked"""
+        return self._student_codes.get(roll_no)
+
+    def events_since(self, branch, section, position=0):
+        """
+        The class's events stored at positions >= position
+
+        Returns:
+            (student, day, seconds, end) - pass end as position next time,
+            as long as generation has not changed.
+        """
+        columns = self.columns()
+        end = len(columns["cls"])
+        class_code = self._class_codes.get(f"{branch}-{section}")
+        if class_code is None or position >= end:
+            empty = np.zeros(0, dtype=np.int32)
+            return empty, empty, empty, end
+
+        rows = np.flatnonzero(columns["cls"][position:] == class_code) + position
+        return columns["student"][rows], columns["day"][rows], columns["seconds"][rows], end
+
+    def first_marks(self, branch, section, first_date=None, last_date=None):
+        """
+        One event per student per day (the earliest): (student, day, seconds)
+
+        Sorts one int64 key per event: (day, student) then seconds.
+        """
+        student, day, seconds = self.class_events(branch, section, first_date, last_date)
+        if len(student) == 0:
+            return student, day, seconds
+
+        students = np.int64(max(len(self.students), 1))
+        key = (day.astype(np.int64) * students + student) * 86400 + seconds
+        key.sort()
+        pair = key // 86400
+        first = np.empty(len(pair), dtype=bool)
+        first[0] = True
+        np.not_equal(pair[1:], pair[:-1], out=first[1:])
+        pair = pair[first]
+        return (pair % students).astype(np.int32), (pair // students).astype(np.int32), \
+            (key[first] % 86400).astype(np.int32)
+
+    def class_report(self, branch, section, first_date=None, last_date=None, bin_minutes=5):
+        """
+        Daily counts, per-student attendance and arrival times for one class
+
+        Days held = days with at least one mark for the class.
+
+        Returns:
+            dict with 'days' [(date, present)], 'students' {roll: (name, days present)},
+            'days_held' and 'arrivals' [(HH:MM, first marks in that bin)]
+        """
+        student, day, seconds = self.first_marks(branch, section, first_date, last_date)
+
+        days, present = np.unique(day, return_counts=True)
+        per_student = np.bincount(student, minlength=len(self.students))
+        attended = np.nonzero(per_student)[0]
+
+        arrivals = []
+        if len(seconds):
+            bin_seconds = bin_minutes * 60
+            bins = seconds // bin_seconds
+            counts = np.bincount(bins - bins.min())
+            arrivals = [
+                (time_string((bins.min() + offset) * bin_seconds), int(count))
+                for offset, count in enumerate(counts) if count
+            ]
+
+        return {
+            'days_held': len(days),
+            'days': [(day_string(number), int(count)) for number, count in zip(days, present)],
+            'students': {
+                self.students[code]: (self.student_names[code], int(per_student[code])) for code in attended
+            },
+            'arrivals': arrivals
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_columnar_store():
+    """The shared store for Config.ATTENDANCE_COLUMNAR_DIR"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ColumnarAttendanceStore()
+        return _store
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("rebuild", "compact"):
+        print("Usage: python attendance_columnar.py rebuild")
+        print("       python attendance_columnar.py compact")
+        sys.exit(1)
+
+    if sys.argv[1] == "compact":
+        store = ColumnarAttendanceStore()
+        store.compact()
+        print(f"✅ Columnar attendance store compacted: {len(store)} events ({store.root})")
+        return
+    ColumnarAttendanceStore(build=False).rebuild()
+
+
+if __name__ == "__main__":
+    main()
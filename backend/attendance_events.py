@@ -0,0 +1,262 @@
+"""
+Smart Attendance System - Attendance Events
+Live attendance marks per class as Server-Sent Events
+
+One watcher thread per API process checks the classes that have
+subscribers (through TodayAttendance, so a check with nothing new is one
+stat() per class) and publishes changes to a per-class feed. Subscribers
+only wait on their class's feed, so the file work does not grow with
+the number of open dashboards.
+
+Events (ids are "date.epoch.count", see TodayAttendance.cursor_view):
+    snapshot - everything marked so far today (on connect, or when the
+               day's records start over)
+    mark     - one new student record plus the class counters
+    counts   - counters only (the class roster changed)
+    session  - live counters of the recognizer running for the class
+               (pushed over attendance_ipc.py)
+Comment lines are sent as heartbeats so idle connections stay open and
+closed ones are noticed.
+"""
+
+import json
+import threading
+import time
+from config import Config
+
+
+class AttendanceStreamError(Exception):
+    """Raised when no more subscribers can be accepted"""
+    pass
+
+
+def counters(present, total):
+    """The dashboard's counters for a class"""
+    return {
+        'total': total,
+        'present': present,
+        'absent': total - present,
+        'percentage': round(present / total * 100, 2) if total > 0 else 0
+    }
+
+
+def format_event(event, data, event_id=None):
+    """One SSE message"""
+    lines = [f"id: {event_id}"] if event_id else []
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def parse_event_id(value):
+    """(date, epoch, count) from a Last-Event-ID, or None"""
+    try:
+        date, epoch, count = str(value).split(".")
+        return date, int(epoch), int(count)
+    except (TypeError, ValueError):
+        return None
+
+
+class FeedState:
+    """What a class feed looks like at one moment (never modified)"""
+
+    def __init__(self, date, epoch, records, total, session=None):
+        self.date = date
+        self.epoch = epoch
+        self.records = records
+        self.total = total
+        self.session = session
+
+    def event_id(self, count=None):
+        return f"{self.date}.{self.epoch}.{len(self.records) if count is None else count}"
+
+
+class ClassFeed:
+    """Latest FeedState of one class and the subscribers waiting on it"""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.state = None
+        self.sequence = 0
+        self.subscribers = 0
+
+
+class Subscription:
+    """One open stream; close() may be called more than once"""
+
+    def __init__(self, broadcaster, key, feed):
+        self.broadcaster = broadcaster
+        self.key = key
+        self.feed = feed
+        self.closed = False
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.broadcaster._unsubscribe(self.key, self.feed)
+
+
+class AttendanceBroadcaster:
+    """
+    Publishes today's marks per class to SSE subscribers
+
+    Args:
+        today: TodayAttendance the marks are read from
+        registry_cache: RegistryCache for class sizes
+    """
+
+    def __init__(self, today, registry_cache, interval=None, heartbeat=None, max_subscribers=None):
+        self.today = today
+        self.registry_cache = registry_cache
+        self.interval = Config.SSE_CHECK_INTERVAL if interval is None else interval
+        self.heartbeat = Config.SSE_HEARTBEAT_SECONDS if heartbeat is None else heartbeat
+        self.max_subscribers = Config.SSE_MAX_SUBSCRIBERS if max_subscribers is None else max_subscribers
+
+        self._feeds = {}  # (branch, section) -> ClassFeed
+        self._sessions = {}  # (branch, section) -> latest recognizer counters
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._watcher = None
+        self.subscribers = 0
+
+    # ---------- subscribers ----------
+
+    def subscribe(self, branch, section):
+        """
+        Open a stream for one class
+
+        Raises:
+            AttendanceStreamError: SSE_MAX_SUBSCRIBERS streams already open
+        """
+        key = (branch, section)
+        with self._lock:
+            if self.subscribers >= self.max_subscribers:
+                raise AttendanceStreamError(
+                    f"Too many live streams ({self.subscribers}); use polling instead"
+                )
+            feed = self._feeds.get(key)
+            if feed is None:
+                feed = self._feeds[key] = ClassFeed()
+            feed.subscribers += 1
+            self.subscribers += 1
+
+            if self._watcher is None:
+                self._watcher = threading.Thread(target=self._watch, name="attendance-events", daemon=True)
+                self._watcher.start()
+
+        subscription = Subscription(self, key, feed)
+        if feed.state is None:
+            try:
+                self._refresh(key, feed, self.registry_cache.snapshot())
+            except Exception:
+                subscription.close()
+                raise
+        return subscription
+
+    def _unsubscribe(self, key, feed):
+        with self._lock:
+            feed.subscribers -= 1
+            self.subscribers -= 1
+            if feed.subscribers == 0 and self._feeds.get(key) is feed:
+                del self._feeds[key]
+
+    def wake(self):
+        """Check for new marks now instead of at the next interval"""
+        self._wake.set()
+
+    def update_session(self, branch, section, counters):
+        """Latest counters from a recognizer session"""
+        self._sessions[(branch, section)] = dict(counters, updated=time.time())
+        self.wake()
+
+    def session(self, branch, section):
+        return self._sessions.get((branch, section))
+
+    # ---------- watcher ----------
+
+    def _refresh(self, key, feed, snapshot):
+        """Publish the class's current state if it changed"""
+        with self._refresh_lock:
+            date, epoch, records = self.today.cursor_view(*key)
+            total = snapshot.count_in_class(*key)
+            session = self._sessions.get(key)
+            with feed.condition:
+                state = feed.state
+                if state is not None and (
+                    state.date, state.epoch, len(state.records), state.total, state.session
+                ) == (date, epoch, len(records), total, session):
+                    return
+                feed.state = FeedState(date, epoch, tuple(records), total, session)
+                feed.sequence += 1
+                feed.condition.notify_all()
+
+    def _watch(self):
+        """Check every subscribed class until nobody is subscribed"""
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            with self._lock:
+                feeds = list(self._feeds.items())
+                if not feeds:
+                    self._watcher = None
+                    return
+
+            snapshot = self.registry_cache.snapshot()
+            for key, feed in feeds:
+                try:
+                    self._refresh(key, feed, snapshot)
+                except Exception as e:
+                    print(f"⚠️  Attendance stream {key[0]}-{key[1]}: {e}")
+
+    # ---------- streams ----------
+
+    def _catch_up(self, key, state, cursor, known_total, known_session):
+        """SSE text that brings a client at cursor up to state"""
+        count = len(state.records)
+        if cursor is None or cursor[:2] != (state.date, state.epoch) or cursor[2] > count:
+            data = {'class': f"{key[0]}-{key[1]}", 'date': state.date, 'records': list(state.records),
+                    'session': state.session}
+            data.update(counters(count, state.total))
+            return format_event("snapshot", data, state.event_id())
+
+        chunks = []
+        for index in range(cursor[2], count):
+            data = {'record': state.records[index]}
+            data.update(counters(index + 1, state.total))
+            chunks.append(format_event("mark", data, state.event_id(index + 1)))
+        if not chunks and known_total != state.total:
+            chunks.append(format_event("counts", counters(count, state.total), state.event_id()))
+        if state.session is not None and state.session != known_session:
+            chunks.append(format_event("session", state.session, state.event_id()))
+        return "".join(chunks)
+
+    def events(self, subscription, last_event_id=None):
+        """SSE text for one subscriber until the client goes away"""
+        key, feed = subscription.key, subscription.feed
+        try:
+            yield f"retry: {Config.SSE_RETRY_MS}\n\n"
+            cursor = parse_event_id(last_event_id)
+            known_total = None
+            known_session = None
+            seen = None
+            while True:
+                with feed.condition:
+                    if feed.sequence == seen:
+                        feed.condition.wait(self.heartbeat)
+                    state, sequence = feed.state, feed.sequence
+                if sequence == seen:
+                    yield ": heartbeat\n\n"
+                    continue
+                seen = sequence
+                if state is None:
+                    continue
+
+                chunk = self._catch_up(key, state, cursor, known_total, known_session)
+                cursor = (state.date, state.epoch, len(state.records))
+                known_total = state.total
+                known_session = state.session
+                if chunk:
+                    yield chunk
+        finally:
+            subscription.close()
@@ -0,0 +1,288 @@
+"""
+Smart Attendance System - Attendance Date Index
+Sparse date -> byte offset index over attendance.csv
+
+attendance.csv is appended in time order, so each date's rows are one
+contiguous block. The index keeps only where each date starts, which is
+enough to read any date range by slicing an mmap of the file instead of
+parsing everything before it.
+
+The first time a file is indexed (no sidecar, or one that no longer
+matches the file) every line is read once, checking the dates are in
+order. After that the writer (CsvAttendanceStore.append) extends the
+index and saves it next to the file (attendance.csv.idx). A reader whose
+file has grown past the saved index picks up the writer's sidecar, and
+finds any boundaries still missing in the appended rows by binary search
+on the mmap.
+"""
+
+import bisect
+import csv
+import json
+import mmap
+import os
+
+DATE_COLUMN = 4  # Name, RollNo, Branch, Section, Date, Time
+INDEX_VERSION = 2  # Sidecars of other versions are rebuilt
+
+
+def line_date(line):
+    """Date field of one raw CSV line (bytes); '' if there is none"""
+    if b'"' not in line:
+        fields = line.split(b",", DATE_COLUMN + 1)
+        if len(fields) <= DATE_COLUMN:
+            return ''
+        return fields[DATE_COLUMN].decode('utf-8', errors='replace').strip()
+    try:
+        row = next(csv.reader([line.decode('utf-8', errors='replace')]))
+    except StopIteration:
+        return ''
+    return row[DATE_COLUMN].strip() if len(row) > DATE_COLUMN else ''
+
+
+class DateOffsetIndex:
+    """
+    Sorted dates with the byte offset of each date's first row
+
+    covered is the file size the index describes; it always ends on a
+    complete line. If the file turns out not to be in date order,
+    ordered is False and readers fall back to a full scan.
+    """
+
+    def __init__(self, csv_path, index_path=None):
+        self.csv_path = csv_path
+        self.index_path = index_path or csv_path + ".idx"
+        self.reset()
+
+    def reset(self):
+        self.dates = []
+        self.offsets = []
+        self.covered = 0
+        self.data_start = 0
+        self.ordered = True
+        self.loaded = False  # From the sidecar and not checked against the file yet
+
+    def __len__(self):
+        return len(self.dates)
+
+    # ---------- persistence ----------
+
+    def load(self):
+        """Read the sidecar file; returns False if it is missing or unreadable"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != INDEX_VERSION:
+                raise ValueError("index version")
+            self.dates = [date for date, offset in data['dates']]
+            self.offsets = [offset for date, offset in data['dates']]
+            self.covered = data['covered']
+            self.data_start = data['data_start']
+            self.ordered = data['ordered']
+            self.loaded = True
+            return True
+        except (OSError, ValueError, KeyError, TypeError):
+            self.reset()
+            return False
+
+    def save(self):
+        """Write the sidecar file (atomically)"""
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': INDEX_VERSION,
+                'covered': self.covered,
+                'data_start': self.data_start,
+                'ordered': self.ordered,
+                'dates': list(zip(self.dates, self.offsets))
+            }, f)
+        os.replace(temp_path, self.index_path)
+
+    def load_newer(self, mm, size):
+        """Take the saved index instead if it describes more of the file"""
+        saved = DateOffsetIndex(self.csv_path, self.index_path)
+        if not saved.load() or saved.covered <= self.covered:
+            return False
+        known = len(self.dates)
+        if self.covered and saved.data_start == self.data_start and \
+                (saved.dates[:known], saved.offsets[:known]) == (self.dates, self.offsets):
+            # Same as this index so far: only the boundaries after it need checking
+            saved.dates, saved.offsets = saved.dates[known:], saved.offsets[known:]
+            valid = saved._valid_for(mm, size) and (not saved.offsets or saved.offsets[0] >= self.covered)
+            saved.dates, saved.offsets = self.dates + saved.dates, self.offsets + saved.offsets
+        else:
+            valid = saved._valid_for(mm, size)
+        if not valid:
+            return False
+        self.dates, self.offsets = saved.dates, saved.offsets
+        self.covered, self.data_start, self.ordered = saved.covered, saved.data_start, saved.ordered
+        return True
+
+    # ---------- maintenance ----------
+
+    def note_append(self, start_offset, lines):
+        """
+        Record rows the writer just appended at start_offset
+
+        Args:
+            lines: [(date, encoded_length)] for each appended line, in order
+        """
+        if self.covered != start_offset:
+            # Someone else wrote to the file; the next refresh will catch up
+            return False
+
+        offset = start_offset
+        for date, length in lines:
+            if not self.dates or date != self.dates[-1]:
+                if self.dates and date < self.dates[-1]:
+                    self.ordered = False
+                self.dates.append(date)
+                self.offsets.append(offset)
+            offset += length
+        self.covered = offset
+        return True
+
+    def _valid_for(self, mm, size):
+        """Cheap checks that the index still describes this file"""
+        if self.covered > size:
+            return False  # Truncated or replaced
+        if self.covered and mm[self.covered - 1:self.covered] != b"\n":
+            return False
+        if self.loaded:
+            # Fresh from the sidecar: every date still starts where it says
+            dates, offsets = self.dates, self.offsets
+        else:
+            # Kept up to date here: first and last date are enough
+            dates, offsets = self.dates[:1] + self.dates[-1:], self.offsets[:1] + self.offsets[-1:]
+        for date, offset in zip(dates, offsets):
+            if mm[offset - 1:offset] != b"\n" or self._date_at(mm, offset, size) != date:
+                return False
+        return True
+
+    def refresh(self, mm, size):
+        """
+        Bring the index up to date with the mapped file
+
+        Returns:
+            bool: True if anything changed
+        """
+        if not self._valid_for(mm, size):
+            self.reset()
+        self.loaded = False
+
+        # Only complete lines are indexed
+        end = mm.rfind(b"\n", 0, size) + 1
+        if end <= self.covered:
+            return False
+
+        if self.covered == 0:
+            # Nothing trusted yet: read every line once
+            header_end = mm.find(b"\n", 0, end)
+            self.data_start = self.covered = header_end + 1
+            self._scan(mm, self.covered, end)
+        else:
+            self._extend(mm, self.covered, end)
+        return True
+
+    def _next_line_start(self, mm, position, end):
+        if position <= self.data_start:
+            return self.data_start
+        if mm[position - 1:position] == b"\n":
+            return position
+        newline = mm.find(b"\n", position, end)
+        return end if newline == -1 else newline + 1
+
+    def _date_at(self, mm, line_start, end):
+        newline = mm.find(b"\n", line_start, end)
+        return line_date(mm[line_start:newline if newline != -1 else end])
+
+    def _scan(self, mm, start, end):
+        """Add the date boundaries in [start, end) line by line, checking the order"""
+        mm.seek(start)
+        position = start
+        current = self.dates[-1] if self.dates else None
+        while position < end:
+            line = mm.readline()
+            date = line_date(line)
+            if date != current:
+                if current is not None and date < current:
+                    self.ordered = False
+                self.dates.append(date)
+                self.offsets.append(position)
+                current = date
+            position += len(line)
+        self.covered = end
+
+    def _extend(self, mm, start, end):
+        """
+        Add the date boundaries in [start, end) by binary search
+
+        Only for rows appended after an index built by _scan or the
+        writer: a run of rows out of date order inside [start, end) is
+        not noticed.
+        """
+        position = start
+        if position >= end:
+            self.covered = max(self.covered, end)
+            return
+        if self.dates:
+            current = self.dates[-1]
+        else:
+            current = self._date_at(mm, position, end)
+            self.dates.append(current)
+            self.offsets.append(position)
+
+        while position < end:
+            # Smallest line start whose date differs from current
+            low, high = position, end
+            while low < high:
+                middle = (low + high) // 2
+                line_start = self._next_line_start(mm, middle, end)
+                if line_start >= end or self._date_at(mm, line_start, end) != current:
+                    high = middle
+                else:
+                    low = middle + 1
+            boundary = self._next_line_start(mm, low, end)
+            if boundary >= end:
+                break
+
+            date = self._date_at(mm, boundary, end)
+            if date < current:
+                self.ordered = False
+            self.dates.append(date)
+            self.offsets.append(boundary)
+            current = date
+            position = boundary
+
+        self.covered = end
+
+    # ---------- lookups ----------
+
+    def start_of(self, date):
+        """Offset of the first row dated date or later (covered if there is none)"""
+        position = bisect.bisect_left(self.dates, date)
+        return self.offsets[position] if position < len(self.offsets) else self.covered
+
+    def byte_range(self, first_date, last_date=None):
+        """(start, end) offsets of the rows from first_date to last_date inclusive"""
+        last_date = last_date or first_date
+        first = bisect.bisect_left(self.dates, first_date)
+        last = bisect.bisect_right(self.dates, last_date)
+        if first >= last:
+            return None
+        start = self.offsets[first]
+        end = self.offsets[last] if last < len(self.offsets) else self.covered
+        return start, end
+
+
+def open_mapped(path):
+    """(file, mmap, size) for reading, or None for a missing or empty file"""
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+    size = os.fstat(f.fileno()).st_size
+    if size == 0:
+        f.close()
+        return None
+    return f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), size
@@ -0,0 +1,222 @@
+"""
+Smart Attendance System - Attendance IPC
+Recognizer -> API channel for live marks and session counters
+
+The API listens on a local socket (a Unix socket where the platform has
+them, otherwise a localhost TCP port). The recognizer sends every mark
+the moment it is made, plus session counters about once a second, so
+dashboards hear about a mark in milliseconds instead of after the next
+batch write and file check.
+
+The attendance files stay the record of truth: marks are still written
+by the recognizer's batch writer and tailed by the API. When the API is
+not listening, nothing is lost - it sees the marks in the files as
+before; the recognizer simply retries the connection now and then.
+
+Connections are authenticated with a random key the API writes to
+IPC_KEY_FILE (readable by the same user only). Messages are JSON.
+"""
+
+import json
+import os
+import secrets
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client, families
+from config import Config
+
+
+def ipc_address():
+    """Unix socket path, or (host, port) where Unix sockets are unavailable"""
+    if 'AF_UNIX' in families:
+        return Config.IPC_SOCKET
+    return ('127.0.0.1', Config.IPC_PORT)
+
+
+def _write_key(key):
+    """Save the API's key, readable only by this user"""
+    os.makedirs(os.path.dirname(Config.IPC_KEY_FILE), exist_ok=True)
+    temp_path = Config.IPC_KEY_FILE + ".tmp"
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    os.replace(temp_path, Config.IPC_KEY_FILE)
+
+
+def _read_key():
+    try:
+        with open(Config.IPC_KEY_FILE, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+class MarkPublisher:
+    """
+    Recognizer side: sends marks and session counters to the API
+
+    Never holds up recognition: a failed connect is retried after
+    IPC_RETRY_SECONDS, and anything not delivered reaches the API
+    through the attendance files instead.
+    """
+
+    def __init__(self, branch, section, enabled=None):
+        self.branch = branch
+        self.section = section
+        self.enabled = Config.IPC_ENABLED if enabled is None else enabled
+        self._conn = None
+        self._next_attempt = 0
+
+        # Statistics
+        self.sent = 0
+        self.undelivered = 0
+
+    @property
+    def connected(self):
+        return self._conn is not None
+
+    def _connection(self):
+        if self._conn is not None or not self.enabled:
+            return self._conn
+        if time.monotonic() < self._next_attempt:
+            return None
+
+        key = _read_key()
+        try:
+            if key is None:
+                raise OSError("API is not listening")
+            self._conn = Client(ipc_address(), authkey=key)
+            print("📡 Live updates: connected to the API")
+        except (OSError, EOFError, AuthenticationError):
+            self._next_attempt = time.monotonic() + Config.IPC_RETRY_SECONDS
+        return self._conn
+
+    def _send(self, message):
+        conn = self._connection()
+        if conn is None:
+            self.undelivered += 1
+            return False
+        try:
+            conn.send_bytes(json.dumps(message).encode('utf-8'))
+        except (OSError, ValueError):
+            # API went away; the files still get everything
+            self.close()
+            self._next_attempt = time.monotonic() + Config.IPC_RETRY_SECONDS
+            self.undelivered += 1
+            return False
+        self.sent += 1
+        return True
+
+    def publish_marks(self, rows):
+        """Marks ([name, roll_no, branch, section, date, time]) just made"""
+        return self._send({'type': 'marks', 'rows': [list(row) for row in rows], 'sent': time.time()})
+
+    def publish_session(self, counters):
+        """Live session counters (present, classSize, fps, ...)"""
+        return self._send({
+            'type': 'session',
+            'branch': self.branch,
+            'section': self.section,
+            'counters': counters,
+            'sent': time.time()
+        })
+
+    def close(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except OSError:
+                pass
+            self._conn = None
+
+
+class MarkListener:
+    """
+    API side: accepts recognizer connections and passes messages on
+
+    Args:
+        on_marks(rows, sent): Called for every batch of marks
+        on_session(branch, section, counters): Called for session counters
+    """
+
+    def __init__(self, on_marks, on_session=None, enabled=None):
+        self.on_marks = on_marks
+        self.on_session = on_session
+        self.enabled = Config.IPC_ENABLED if enabled is None else enabled
+        self._listener = None
+        self.received = 0
+
+    def _bind(self, address, key):
+        try:
+            return Listener(address, authkey=key)
+        except OSError:
+            if not isinstance(address, str) or not os.path.exists(address):
+                raise
+        # The socket file exists: left over, or another API is listening
+        try:
+            Client(address, authkey=_read_key() or b"").close()
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.remove(address)
+            return Listener(address, authkey=key)
+        except (OSError, EOFError, AuthenticationError):
+            pass
+        raise OSError(f"another API process is listening on {address}")
+
+    def start(self):
+        """Start listening; False if the channel could not be opened"""
+        if not self.enabled or self._listener is not None:
+            return False
+        address = ipc_address()
+        key = secrets.token_bytes(32)
+        try:
+            if isinstance(address, str):
+                os.makedirs(os.path.dirname(address), exist_ok=True)
+            self._listener = self._bind(address, key)
+            _write_key(key)
+        except OSError as e:
+            if self._listener is not None:
+                self.stop()
+            print(f"⚠️ Live updates from the recognizer disabled ({e}); using the attendance files")
+            return False
+
+        threading.Thread(target=self._accept, name="attendance-ipc", daemon=True).start()
+        print(f"📡 Listening for the recognizer on {address}")
+        return True
+
+    def _accept(self):
+        listener = self._listener
+        while True:
+            try:
+                conn = listener.accept()
+            except (AuthenticationError, EOFError):
+                continue
+            except OSError:
+                return  # Listener closed
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        """Handle one recognizer's messages until it disconnects"""
+        with conn:
+            while True:
+                try:
+                    message = json.loads(conn.recv_bytes(Config.IPC_MAX_MESSAGE_BYTES))
+                except (EOFError, OSError):
+                    return
+                except ValueError:
+                    continue
+                self.received += 1
+                try:
+                    if message.get('type') == 'marks':
+                        self.on_marks(message.get('rows', []), message.get('sent'))
+                    elif message.get('type') == 'session' and self.on_session is not None:
+                        self.on_session(message.get('branch', ''), message.get('section', ''),
+                                        message.get('counters', {}))
+                except Exception as e:
+                    print(f"⚠️ Live update not applied: {e}")
+
+    def stop(self):
+        """Stop accepting recognizers (a Unix socket file is removed)"""
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.close()
@@ -0,0 +1,515 @@
+"""
+Smart Attendance System - Attendance Store
+Where attendance marks are written and read back
+
+Two backends (Config.ATTENDANCE_STORAGE):
+    partitioned - one file per class per day:
+                  attendance/YYYY-MM-DD/BRANCH-SECTION.csv
+                  Reading one class-day only touches that class-day's rows.
+    csv         - the original single attendance.csv
+
+Every row has the attendance.csv columns (FIELDNAMES). An existing
+attendance.csv is split into partitions the first time the partitioned
+store is opened; the file itself is left untouched.
+
+Usage:
+    python attendance_store.py export [output.csv]   # one CSV, old layout
+    python attendance_store.py migrate               # partitions from attendance.csv
+"""
+
+import csv
+import glob
+import io
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+from datetime import datetime
+from config import Config
+from attendance_index import DateOffsetIndex, open_mapped
+from file_lock import FileLock
+
+FIELDNAMES = ["Name", "RollNo", "Branch", "Section", "Date", "Time"]
+
+META_FILE = "meta.json"
+INVALID_ROWS_FILE = "invalid_rows.csv"
+
+_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+_CLASS_PART_PATTERN = re.compile(r"[A-Za-z0-9]+")
+
+
+class AttendanceStoreError(Exception):
+    """Raised for an unknown storage backend or an unusable store"""
+    pass
+
+
+def _complete_lines(text):
+    """
+    Drop a trailing line without a newline
+
+    The recognizer appends while the API reads, so the last line of a
+    file can be half written.
+    """
+    if text and not text.endswith("\n"):
+        return text[:text.rfind("\n") + 1]
+    return text
+
+
+def read_rows(path):
+    """Rows of one attendance CSV as dicts ([] if the file does not exist)"""
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            text = _complete_lines(f.read())
+    except FileNotFoundError:
+        return []
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+def _format_rows(rows, header=False):
+    """CSV text for rows (lists in FIELDNAMES order)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(FIELDNAMES)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def _as_list(row):
+    if isinstance(row, dict):
+        return [row.get(field, '') for field in FIELDNAMES]
+    return list(row)
+
+
+class CsvAttendanceStore:
+    """
+    The original layout: every mark appended to one attendance.csv
+
+    With Config.ATTENDANCE_INDEX_ENABLED, append() keeps a sparse
+    date -> byte offset index (attendance_index.py) next to the file and
+    read_day() maps the file and parses only the requested date's rows.
+    """
+
+    name = "csv"
+
+    def __init__(self, csv_path=None, use_index=None):
+        self.csv_path = csv_path or Config.ATTENDANCE_CSV
+        self.use_index = Config.ATTENDANCE_INDEX_ENABLED if use_index is None else use_index
+        self.index = DateOffsetIndex(self.csv_path)
+        self._index_loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def location(self):
+        return self.csv_path
+
+    def _refresh_index(self, mm, size):
+        """Load the saved index, then catch up with the file"""
+        if not self._index_loaded:
+            self.index.load()
+            self._index_loaded = True
+        elif size > self.index.covered:
+            # Rows appended by another process's store are in its sidecar
+            self.index.load_newer(mm, size)
+        self.index.refresh(mm, size)
+
+    def append(self, rows):
+        """Append marks ([name, roll_no, branch, section, date, time] or dicts)"""
+        rows = [_as_list(row) for row in rows]
+        if not rows:
+            return 0
+        with self._lock:
+            start = os.path.getsize(self.csv_path) if os.path.exists(self.csv_path) else 0
+            header = _format_rows([], header=True) if start == 0 else ""
+            lines = [_format_rows([row]) for row in rows]
+
+            # The index must describe the file up to here before it is extended
+            if self.use_index and start and (not self._index_loaded or self.index.covered != start):
+                mapped = open_mapped(self.csv_path)
+                if mapped:
+                    f, mm, size = mapped
+                    try:
+                        self._refresh_index(mm, size)
+                    finally:
+                        mm.close()
+                        f.close()
+
+            with open(self.csv_path, 'a', newline='', encoding='utf-8') as f:
+                f.write(header + "".join(lines))
+
+            if self.use_index:
+                if header:
+                    self.index.reset()
+                    self.index.data_start = self.index.covered = len(header.encode('utf-8'))
+                    self._index_loaded = True
+                    start = self.index.covered
+                self.index.note_append(start, [
+                    (str(row[4]).strip(), len(line.encode('utf-8'))) for row, line in zip(rows, lines)
+                ])
+                self.index.save()
+        return len(rows)
+
+    def _scan_day(self, date, branch, section):
+        return [
+            row for row in read_rows(self.csv_path)
+            if str(row.get('Date', '')).strip() == date
+            and str(row.get('Branch', '')).strip() == branch
+            and str(row.get('Section', '')).strip() == section
+        ]
+
+    def read_day(self, date, branch, section):
+        """Rows for one class on one date, in the order they were marked"""
+        if not self.use_index:
+            return self._scan_day(date, branch, section)
+
+        mapped = open_mapped(self.csv_path)
+        if mapped is None:
+            return []
+        f, mm, size = mapped
+        try:
+            with self._lock:
+                self._refresh_index(mm, size)
+                ordered = self.index.ordered
+                byte_range = self.index.byte_range(date)
+                header = mm[:self.index.data_start]
+            if not ordered:
+                # Someone wrote rows out of date order; the index cannot be trusted
+                return self._scan_day(date, branch, section)
+            if byte_range is None:
+                return []
+            start, end = byte_range
+            text = (header + mm[start:end]).decode('utf-8')
+        finally:
+            mm.close()
+            f.close()
+
+        return [
+            row for row in csv.DictReader(io.StringIO(text))
+            if str(row.get('Date', '')).strip() == date
+            and str(row.get('Branch', '')).strip() == branch
+            and str(row.get('Section', '')).strip() == section
+        ]
+
+    def day_offset(self, date):
+        """
+        Byte offset where date's rows start (or would start)
+
+        Returns None when there is no usable index; callers then read
+        from the top of the file.
+        """
+        if not self.use_index:
+            return None
+        mapped = open_mapped(self.csv_path)
+        if mapped is None:
+            return None
+        f, mm, size = mapped
+        try:
+            with self._lock:
+                self._refresh_index(mm, size)
+                if not self.index.ordered or not self.index.dates:
+                    return None
+                return self.index.start_of(date)
+        finally:
+            mm.close()
+            f.close()
+
+    def iter_class(self, branch, section):
+        """Every row for one class, oldest first"""
+        for row in read_rows(self.csv_path):
+            if row.get('Branch', '') == branch and row.get('Section', '') == section:
+                yield row
+
+    def iter_all(self):
+        """Every row, oldest first"""
+        yield from read_rows(self.csv_path)
+
+    def backup(self, backup_base):
+        """Copy the store next to backup_base; returns the backup path or None"""
+        if not os.path.exists(self.csv_path):
+            return None
+        backup_file = backup_base + ".csv"
+        shutil.copy2(self.csv_path, backup_file)
+        return backup_file
+
+
+class PartitionedAttendanceStore:
+    """
+    One CSV per class per day: <root>/YYYY-MM-DD/BRANCH-SECTION.csv
+
+    Each partition has the attendance.csv header, so any single file can
+    be opened on its own. Rows whose date or class cannot name a file are
+    kept in <root>/invalid_rows.csv.
+    """
+
+    name = "partitioned"
+
+    def __init__(self, root=None, legacy_csv=None, migrate=True):
+        self.root = root or Config.ATTENDANCE_DIR
+        self.legacy_csv = legacy_csv or Config.ATTENDANCE_CSV
+        self._lock = threading.Lock()
+
+        if not os.path.isdir(self.root):
+            if migrate and os.path.exists(self.legacy_csv):
+                self.migrate_from_csv(self.legacy_csv)
+            else:
+                os.makedirs(self.root, exist_ok=True)
+
+    @property
+    def location(self):
+        return self.root
+
+    # ---------- paths ----------
+
+    def partition_path(self, date, branch, section):
+        """File for one class-day, or None if the values cannot name a file"""
+        if not (_DATE_PATTERN.fullmatch(date) and _CLASS_PART_PATTERN.fullmatch(branch)
+                and _CLASS_PART_PATTERN.fullmatch(section)):
+            return None
+        return os.path.join(self.root, date, f"{branch}-{section}.csv")
+
+    def dates(self):
+        """Dates with at least one partition, oldest first"""
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        return sorted(name for name in names if _DATE_PATTERN.fullmatch(name))
+
+    def classes_on(self, date):
+        """[(branch, section)] with marks on date"""
+        try:
+            names = os.listdir(os.path.join(self.root, date))
+        except FileNotFoundError:
+            return []
+        classes = []
+        for name in sorted(names):
+            stem, ext = os.path.splitext(name)
+            if ext == ".csv" and "-" in stem:
+                classes.append(tuple(stem.split("-", 1)))
+        return classes
+
+    # ---------- writes ----------
+
+    def _write_partitions(self, root, rows):
+        """Append rows (lists) to their partitions under root"""
+        groups = {}
+        for row in rows:
+            date, branch, section = (str(value).strip() for value in (row[4], row[2], row[3]))
+            groups.setdefault((date, branch, section), []).append(row)
+
+        invalid = []
+        for (date, branch, section), group in groups.items():
+            if not (_DATE_PATTERN.fullmatch(date) and _CLASS_PART_PATTERN.fullmatch(branch)
+                    and _CLASS_PART_PATTERN.fullmatch(section)):
+                invalid.extend(group)
+                continue
+            path = os.path.join(root, date, f"{branch}-{section}.csv")
+            new_file = not os.path.exists(path)
+            if new_file:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            # One write per partition, so readers see whole batches
+            with open(path, 'a', newline='', encoding='utf-8') as f:
+                f.write(_format_rows(group, header=new_file))
+
+        if invalid:
+            path = os.path.join(root, INVALID_ROWS_FILE)
+            new_file = not os.path.exists(path)
+            with open(path, 'a', newline='', encoding='utf-8') as f:
+                f.write(_format_rows(invalid, header=new_file))
+        return len(invalid)
+
+    def append(self, rows):
+        """Append marks ([name, roll_no, branch, section, date, time] or dicts)"""
+        rows = [_as_list(row) for row in rows]
+        if not rows:
+            return 0
+        with self._lock:
+            self._write_partitions(self.root, rows)
+        return len(rows)
+
+    # ---------- reads ----------
+
+    def read_day(self, date, branch, section):
+        """Rows for one class on one date, in the order they were marked"""
+        path = self.partition_path(date, branch, section)
+        return read_rows(path) if path else []
+
+    def iter_class(self, branch, section):
+        """Every row for one class, oldest first"""
+        for date in self.dates():
+            yield from self.read_day(date, branch, section)
+
+    def iter_all(self):
+        """Every row, oldest first (classes interleaved by time within a day)"""
+        for date in self.dates():
+            rows = []
+            for branch, section in self.classes_on(date):
+                rows.extend(self.read_day(date, branch, section))
+            rows.sort(key=lambda row: row.get('Time', ''))
+            yield from rows
+
+    # ---------- maintenance ----------
+
+    def migrate_from_csv(self, csv_path):
+        """
+        Split attendance.csv into partitions (one-time)
+
+        Runs under a lock file, so when the API and the recognizer open
+        the store at the same time only one of them migrates and the other
+        waits and then uses the result. Written to a private temporary
+        directory that is renamed into place at the end, so an interrupted
+        migration is simply redone next time.
+
+        Returns:
+            int: Number of rows migrated (0 if another process did it)
+
+        Raises:
+            AttendanceStoreError: The partitions could not be written or moved into place
+        """
+        with FileLock(self.root + ".lock"):
+            if os.path.isdir(self.root) and os.listdir(self.root):
+                # Migrated by another process while this one waited
+                return 0
+
+            # Left over by interrupted migrations (nobody else holds the lock)
+            for leftover in glob.glob(glob.escape(self.root) + ".migrating*"):
+                shutil.rmtree(leftover, ignore_errors=True)
+
+            parent = os.path.dirname(os.path.abspath(self.root))
+            staging = tempfile.mkdtemp(prefix=os.path.basename(self.root) + ".migrating-", dir=parent)
+            try:
+                migrated, invalid = self._migrate_into(staging, csv_path)
+                if os.path.isdir(self.root):
+                    os.rmdir(self.root)  # Empty (checked above); os.replace needs it gone on Windows
+                os.replace(staging, self.root)
+            except OSError as e:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise AttendanceStoreError(f"Could not migrate {csv_path} to {self.root}: {e}")
+
+        print(f"✅ Migrated {migrated} attendance rows from {csv_path} to {self.root}")
+        if invalid:
+            print(f"⚠️  {invalid} rows without a valid date/class kept in {INVALID_ROWS_FILE}")
+        return migrated
+
+    def _migrate_into(self, staging, csv_path):
+        """Write the partitions of csv_path into staging; (rows, invalid rows)"""
+        migrated = 0
+        invalid = 0
+        batch = []
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                batch.append(_as_list(row))
+                if len(batch) >= 50000:
+                    invalid += self._write_partitions(staging, batch)
+                    migrated += len(batch)
+                    batch = []
+        if batch:
+            invalid += self._write_partitions(staging, batch)
+            migrated += len(batch)
+
+        with open(os.path.join(staging, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump({
+                'migrated_from': os.path.basename(csv_path),
+                'migrated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'rows': migrated,
+                'invalid_rows': invalid
+            }, f, indent=4)
+        return migrated, invalid
+
+    def backup(self, backup_base):
+        """Zip the partitions next to backup_base; returns the backup path or None"""
+        if not self.dates():
+            return None
+        return shutil.make_archive(backup_base, 'zip', self.root)
+
+
+BACKENDS = {
+    CsvAttendanceStore.name: CsvAttendanceStore,
+    PartitionedAttendanceStore.name: PartitionedAttendanceStore,
+}
+
+
+def create_attendance_store(backend=None):
+    """
+    Create an attendance store
+
+    Args:
+        backend: "partitioned" or "csv" (default: Config.ATTENDANCE_STORAGE)
+
+    Raises:
+        AttendanceStoreError: Unknown backend
+    """
+    backend = backend or Config.ATTENDANCE_STORAGE
+    if backend not in BACKENDS:
+        raise AttendanceStoreError(
+            f"Unknown attendance storage '{backend}'. Allowed: {', '.join(sorted(BACKENDS))}"
+        )
+    return BACKENDS[backend]()
+
+
+def export_csv(output_file, store=None, branch=None, section=None):
+    """
+    Write one CSV in the original attendance.csv layout
+
+    Args:
+        branch, section: Only this class (default: every class)
+
+    Returns:
+        int: Number of rows written
+    """
+    store = store or get_attendance_store()
+    rows = store.iter_class(branch, section) if branch else store.iter_all()
+
+    count = 0
+    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES, extrasaction='ignore')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_attendance_store():
+    """The shared store for Config.ATTENDANCE_STORAGE"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = create_attendance_store()
+        return _store
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("export", "migrate"):
+        print("Usage: python attendance_store.py export [output.csv]")
+        print("       python attendance_store.py migrate")
+        sys.exit(1)
+
+    if sys.argv[1] == "migrate":
+        if os.path.isdir(Config.ATTENDANCE_DIR):
+            print(f"✅ Already partitioned: {Config.ATTENDANCE_DIR}")
+            return
+        if not os.path.exists(Config.ATTENDANCE_CSV):
+            print(f"❌ Nothing to migrate: {Config.ATTENDANCE_CSV} not found")
+            sys.exit(1)
+        PartitionedAttendanceStore()
+        return
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    output_file = sys.argv[2] if len(sys.argv) > 2 else os.path.join(
+        Config.BACKUP_PATH, f"attendance_export_{timestamp}.csv"
+    )
+    store = get_attendance_store()
+    count = export_csv(output_file, store)
+    print(f"✅ Exported {count} rows from {store.location} to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
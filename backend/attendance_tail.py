@@ -0,0 +1,277 @@
+"""
+Smart Attendance System - Attendance Tail
+Today's attendance per class, read incrementally
+
+A FileTailer remembers which file it is reading (device + inode) and how
+far it got, so each call parses only the complete lines appended since
+the last one; a poll with nothing new costs one stat(). Truncation,
+replacement (rotation) or removal of the file is noticed and reading
+starts over.
+
+TodayAttendance keeps the first mark of every student per class for the
+current date, with a version per class that changes whenever the class's
+records do (for ETags), and rolls over at midnight:
+    csv         - one tailer on attendance.csv, starting at today's rows
+                  (found with the date index when it is enabled)
+    partitioned - one tailer per class on today's partition file
+"""
+
+import csv
+import io
+import os
+import threading
+import time
+from datetime import datetime
+from attendance_store import FIELDNAMES, CsvAttendanceStore, get_attendance_store
+
+
+class FileTailer:
+    """
+    Incremental reader of one attendance CSV
+
+    start: optional callable returning the byte offset (a line start) to
+    begin at when the file is first opened, or None for the first row.
+    """
+
+    def __init__(self, path, start=None):
+        self.path = path
+        self.start = start
+        self._forget()
+
+    def _forget(self):
+        self.identity = None  # (st_dev, st_ino) of the file being read
+        self.offset = 0
+        self.fieldnames = None
+
+    def _open_at_start(self, f, identity):
+        """Read the header; False if it is not completely written yet"""
+        f.seek(0)
+        header = f.readline()
+        if not header.endswith(b"\n"):
+            return False
+        self.fieldnames = [name.strip() for name in next(csv.reader([header.decode('utf-8', errors='replace')]))]
+        self.identity = identity
+        self.offset = len(header)
+        if self.start is not None:
+            start = self.start()
+            if start is not None and start > self.offset:
+                self.offset = start
+        return True
+
+    def _still_ends_line(self, f):
+        """The byte before offset is still a newline (not rewritten in place)"""
+        f.seek(self.offset - 1)
+        return f.read(1) == b"\n"
+
+    def read_new(self):
+        """
+        Rows appended since the last call
+
+        Returns:
+            (rows, reset) - reset is True if the file was truncated,
+            replaced or removed since the last call; rows then start over.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            reset = self.identity is not None
+            self._forget()
+            return [], reset
+        if (stat.st_dev, stat.st_ino) == self.identity and stat.st_size == self.offset:
+            return [], False
+
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            reset = self.identity is not None
+            self._forget()
+            return [], reset
+
+        with f:
+            stat = os.fstat(f.fileno())
+            identity = (stat.st_dev, stat.st_ino)
+            reset = False
+            if self.identity is not None and (
+                identity != self.identity or stat.st_size < self.offset or not self._still_ends_line(f)
+            ):
+                self._forget()
+                reset = True
+            if self.identity is None and not self._open_at_start(f, identity):
+                return [], reset
+
+            f.seek(self.offset)
+            data = f.read(max(0, stat.st_size - self.offset))
+
+        # A half-written last line is left for the next call
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return [], reset
+        self.offset += end
+        text = data[:end].decode('utf-8', errors='replace')
+        rows = [dict(zip(self.fieldnames, row)) for row in csv.reader(io.StringIO(text)) if row]
+        return rows, reset
+
+
+class ClassDay:
+    """
+    First mark of each student of one class on one day, in marking order
+
+    records only ever grow; epoch tells one ClassDay from the one that
+    replaces it when the file is read again from the start.
+    """
+
+    def __init__(self, epoch=0):
+        self.epoch = epoch
+        self.records = []
+        self.rolls = set()
+
+    def add(self, row):
+        roll_no = str(row.get('RollNo', '')).strip()
+        if roll_no in self.rolls:
+            return
+        self.rolls.add(roll_no)
+        self.records.append({
+            'name': row.get('Name', 'Unknown'),
+            'rollNo': roll_no,
+            'date': row.get('Date', ''),
+            'time': row.get('Time', '')
+        })
+
+
+def unique_records(rows):
+    """API records for rows of one class-day, one per student"""
+    day = ClassDay()
+    for row in rows:
+        day.add(row)
+    return day.records
+
+
+class TodayAttendance:
+    """
+    Per-class view of today's attendance, kept up to date by tailing
+
+    Each view() call reads only what was appended since the previous
+    one. Nothing is cached across dates. Class versions come from one
+    counter, so a version is never reused for different records.
+    """
+
+    def __init__(self, store=None):
+        self._store = store
+        self.date = None
+        self._tailers = {}  # path -> FileTailer
+        self._classes = {}  # (branch, section) -> ClassDay
+        self._versions = {}  # (branch, section) -> (version, changed at)
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = get_attendance_store()
+        return self._store
+
+    def _tailer(self, branch, section):
+        """(tailer, shared) for a class; shared tailers feed every class"""
+        store = self.store
+        if store.name == CsvAttendanceStore.name:
+            path = store.csv_path
+            date = self.date
+            start = lambda: store.day_offset(date)
+            shared = True
+        else:
+            path = store.partition_path(self.date, branch, section)
+            if path is None:
+                return None, False
+            start = None
+            shared = False
+
+        tailer = self._tailers.get(path)
+        if tailer is None:
+            tailer = self._tailers[path] = FileTailer(path, start)
+        return tailer, shared
+
+    def _changed(self, key):
+        self._counter += 1
+        self._versions[key] = (self._counter, time.time())
+
+    def _add(self, row):
+        if str(row.get('Date', '')).strip() != self.date:
+            return
+        key = (str(row.get('Branch', '')).strip(), str(row.get('Section', '')).strip())
+        day = self._classes.get(key)
+        if day is None:
+            self._counter += 1
+            day = self._classes[key] = ClassDay(self._counter)
+        count = len(day.records)
+        day.add(row)
+        if len(day.records) != count:
+            self._changed(key)
+
+    def _roll_over(self, date):
+        if date != self.date:
+            # Day rollover: yesterday's view and file positions are dropped
+            self.date = date
+            self._tailers = {}
+            self._classes = {}
+            self._versions = {}
+
+    def _current(self, branch, section, date):
+        """Catch up with the files; the class's ClassDay or None (lock held)"""
+        key = (branch, section)
+        self._roll_over(date)
+
+        tailer, shared = self._tailer(branch, section)
+        if tailer is not None:
+            rows, reset = tailer.read_new()
+            if reset:
+                for reset_key in (list(self._classes) if shared else [key]):
+                    if self._classes.pop(reset_key, None) is not None:
+                        self._changed(reset_key)
+            for row in rows:
+                self._add(row)
+        return self._classes.get(key)
+
+    def view(self, branch, section, date=None):
+        """
+        Today's records for one class and their version
+
+        Returns:
+            (records, version, modified) - records as the first mark per
+            student in marking order; modified is a Unix time or None
+        """
+        date = date or str(datetime.now().date())
+        with self._lock:
+            day = self._current(branch, section, date)
+            version, modified = self._versions.get((branch, section), (0, None))
+            return (list(day.records) if day else []), version, modified
+
+    def cursor_view(self, branch, section, date=None):
+        """
+        (date, epoch, records) for one class
+
+        Within one (date, epoch) records only grow, so a reader that has
+        seen the first n can continue from records[n:].
+        """
+        date = date or str(datetime.now().date())
+        with self._lock:
+            day = self._current(branch, section, date)
+            if day is None:
+                return date, 0, []
+            return date, day.epoch, list(day.records)
+
+    def add_rows(self, rows, date=None):
+        """
+        Marks pushed by the recognizer ahead of its batch write
+
+        The same rows are read from the files later and skipped then,
+        as each student's first mark is already there.
+        """
+        date = date or str(datetime.now().date())
+        with self._lock:
+            self._roll_over(date)
+            for row in rows:
+                self._add(row if isinstance(row, dict) else dict(zip(FIELDNAMES, row)))
+
+    def records(self, branch, section, date=None):
+        """Today's records for one class (first mark per student, in marking order)"""
+        return self.view(branch, section, date)[0]
@@ -0,0 +1,2130 @@
+"""
+Smart Attendance System - Benchmarks
+Performance measurements for the recognition and data pipelines
+
+Usage: python benchmark.py <name> [options]
+"""
+
+import random
+import sys
+import time
+from config import Config
+
+
+def print_header(title):
+    print("=" * 70)
+    print(f"⏱️  BENCHMARK - {title}")
+    print("=" * 70)
+
+
+# ==================== RECOGNITION SCHEDULER ====================
+
+def simulate_room(strategy, students=60, predict_ms=8.0, detect_ms=25.0,
+                  success_range=(0.15, 0.6), seed=42, max_seconds=600):
+    """
+    Simulate a full classroom on a virtual clock
+
+    Every face is visible on every processed frame. A prediction on a
+    face identifies it with that student's success probability (pose,
+    lighting, distance). Returns virtual seconds until everyone is marked.
+
+    Strategies:
+        unbudgeted  - predict every face on every frame (original loop)
+        fifo        - per-frame budget, faces in detection order
+        prioritized - per-frame budget, RecognitionScheduler order
+    """
+    from face_tracking import FaceTrack
+    from recognition_scheduler import RecognitionScheduler
+
+    rng = random.Random(seed)
+    frame_area = Config.CAMERA_WIDTH * Config.CAMERA_HEIGHT
+
+    tracks = []
+    for index in range(students):
+        size = rng.randint(60, 140)
+        track = FaceTrack(index, (0, 0, size, size), 0.0)
+        track.success = rng.uniform(*success_range)
+        tracks.append(track)
+
+    scheduler = RecognitionScheduler()
+    scheduler.predict_cost_ms = predict_ms
+    threshold = Config.RECOGNITION_CONFIDENCE_THRESHOLD
+
+    now = 0.0
+    marked = set()
+
+    while len(marked) < students and now < max_seconds:
+        frame_start = now
+        now += detect_ms / 1000.0
+
+        if strategy == 'prioritized':
+            queue = scheduler.rank(tracks, now, frame_area)
+        else:
+            queue = list(tracks)
+
+        scheduler.start_frame()
+        for track in queue:
+            if strategy != 'unbudgeted' and not scheduler.can_afford():
+                break
+
+            now += predict_ms / 1000.0
+            if rng.random() < track.success:
+                confidence = rng.uniform(30, threshold - 5)
+                marked.add(track.track_id)
+                track.settled = True
+            else:
+                confidence = rng.uniform(threshold + 5, threshold * 2)
+                track.settled = False
+            scheduler.record_prediction(track, 0, confidence, predict_ms, now)
+
+        # Camera delivers frames at a fixed rate at best
+        now = max(now, frame_start + 1.0 / Config.CAMERA_FPS)
+
+    return now, len(marked)
+
+
+def benchmark_scheduler(args):
+    """Time-to-mark-everyone for the recognition scheduler"""
+    students = int(args[0]) if args else 60
+    print_header(f"RECOGNITION SCHEDULER ({students} students in view)")
+    print(f"Frame budget: {Config.RECOGNITION_FRAME_BUDGET_MS}ms")
+    print("-" * 70)
+    print(f"{'Strategy':<15} {'Time to mark all':>18} {'Marked':>10}")
+    print("-" * 70)
+
+    for strategy in ('unbudgeted', 'fifo', 'prioritized'):
+        results = [simulate_room(strategy, students=students, seed=seed) for seed in range(5)]
+        avg_time = sum(r[0] for r in results) / len(results)
+        avg_marked = sum(r[1] for r in results) / len(results)
+        print(f"{strategy:<15} {avg_time:>17.1f}s {avg_marked:>10.1f}")
+
+    print("=" * 70)
+
+
+# ==================== PREDICTION CACHE ====================
+
+def synthetic_faces(people, per_person, size=120, seed=0):
+    """Blurred random textures standing in for face crops"""
+    import cv2
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    faces, labels, bases = [], [], []
+    for label in range(people):
+        base = rng.integers(0, 256, (size, size), dtype=np.uint8)
+        base = cv2.GaussianBlur(base, (0, 0), 4)
+        bases.append(base)
+        for _ in range(per_person):
+            noise = rng.integers(-12, 13, base.shape)
+            faces.append(np.clip(base.astype(np.int16) + noise, 0, 255).astype(np.uint8))
+            labels.append(label)
+    return faces, labels, bases
+
+
+def benchmark_cache(args):
+    """Hit rate and predict time saved for seated students"""
+    import cv2
+    import numpy as np
+    from prediction_cache import PredictionCache
+
+    frames = int(args[0]) if args else 100
+    seated = 10
+    print_header(f"PREDICTION CACHE ({seated} seated students, {frames} frames)")
+
+    faces, labels, bases = synthetic_faces(people=20, per_person=10)
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    recognizer.train(faces, np.array(labels))
+
+    rng = np.random.default_rng(1)
+    positions = [(40 + 55 * i, 200) for i in range(seated)]
+
+    def frame_crops():
+        """Each student's crop with sensor noise and small head movement"""
+        for index in range(seated):
+            dx, dy = rng.integers(-3, 4, 2)
+            crop = np.roll(bases[index], (dy, dx), axis=(0, 1))
+            noise = rng.integers(-2, 3, crop.shape)
+            crop = np.clip(crop.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+            x, y = positions[index]
+            yield crop, (x + dx, y + dy, 120, 120)
+
+    sequence = [list(frame_crops()) for _ in range(frames)]
+
+    # Without cache
+    start = time.perf_counter()
+    for crops in sequence:
+        for crop, bbox in crops:
+            recognizer.predict(crop)
+    uncached_s = time.perf_counter() - start
+
+    # With cache (virtual clock: 15 processed frames per second)
+    virtual_now = [0.0]
+    cache = PredictionCache(clock=lambda: virtual_now[0])
+    start = time.perf_counter()
+    for crops in sequence:
+        virtual_now[0] += 1.0 / 15
+        for crop, bbox in crops:
+            key = cache.make_key(crop, bbox)
+            if cache.get(key) is None:
+                predict_start = time.perf_counter()
+                label, confidence = recognizer.predict(crop)
+                cache.put(key, label, confidence, (time.perf_counter() - predict_start) * 1000)
+    cached_s = time.perf_counter() - start
+
+    stats = cache.summary()
+    print(f"Without cache: {uncached_s * 1000:.0f}ms total predict time")
+    print(f"With cache:    {cached_s * 1000:.0f}ms total (including hashing)")
+    print(f"Hit rate:      {stats['hit_rate']}% ({stats['hits']} hits / {stats['misses']} misses)")
+    print(f"Saved (est.):  {stats['saved_ms']:.0f}ms")
+    print("=" * 70)
+
+
+# ==================== FACE DETECTORS ====================
+
+def load_frame_set(frames_dir):
+    """
+    Load a recorded frame set
+
+    Layout:
+        frames_dir/*.jpg|*.png        recorded camera frames
+        frames_dir/annotations.json   {"frame.jpg": [[x, y, w, h], ...], ...}
+    """
+    import cv2
+    import json
+    import os
+
+    annotations_file = os.path.join(frames_dir, "annotations.json")
+    if not os.path.exists(annotations_file):
+        print(f"❌ {annotations_file} not found")
+        print('   Expected: {"frame_001.jpg": [[x, y, w, h], ...], ...}')
+        sys.exit(1)
+
+    with open(annotations_file, 'r', encoding='utf-8') as f:
+        annotations = json.load(f)
+
+    frames = []
+    for filename, boxes in sorted(annotations.items()):
+        frame = cv2.imread(os.path.join(frames_dir, filename))
+        if frame is None:
+            print(f"⚠️  Could not load: {filename}")
+            continue
+        frames.append((filename, frame, [tuple(box) for box in boxes]))
+    return frames
+
+
+def match_detections(detections, truth, min_iou=0.5):
+    """Return (true positives, false positives) for one frame"""
+    from face_tracking import bbox_iou
+
+    unmatched = list(truth)
+    true_positives = 0
+    for box in detections:
+        best = max(unmatched, key=lambda t: bbox_iou(box, t), default=None)
+        if best is not None and bbox_iou(box, best) >= min_iou:
+            unmatched.remove(best)
+            true_positives += 1
+    return true_positives, len(detections) - true_positives
+
+
+def benchmark_detectors(args):
+    """ms/frame, recall and false positives for each detector backend"""
+    import cv2
+    from face_detectors import available_backends, create_face_detector, DetectorError
+
+    if not args:
+        print("Usage: python benchmark.py detectors <frames_dir>")
+        sys.exit(1)
+
+    frames = load_frame_set(args[0])
+    total_faces = sum(len(truth) for _, _, truth in frames)
+    print_header(f"FACE DETECTORS ({len(frames)} frames, {total_faces} faces)")
+    print(f"{'Backend':<15} {'ms/frame':>10} {'p95 ms':>10} {'Recall':>10} {'FP':>6} {'FP/frame':>10}")
+    print("-" * 70)
+
+    for backend in available_backends():
+        try:
+            detector = create_face_detector(backend)
+        except DetectorError as e:
+            print(f"{backend:<15} skipped - {str(e).splitlines()[0]}")
+            continue
+
+        timings = []
+        true_positives = 0
+        false_positives = 0
+        for _, frame, truth in frames:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            start = time.perf_counter()
+            detections = detector.detect(gray, frame)
+            timings.append((time.perf_counter() - start) * 1000)
+
+            tp, fp = match_detections(detections, truth)
+            true_positives += tp
+            false_positives += fp
+
+        timings.sort()
+        mean_ms = sum(timings) / len(timings) if timings else 0.0
+        p95_ms = timings[int(len(timings) * 0.95)] if timings else 0.0
+        recall = true_positives / total_faces * 100 if total_faces else 0.0
+        fp_per_frame = false_positives / len(frames) if frames else 0.0
+        print(f"{backend:<15} {mean_ms:>10.1f} {p95_ms:>10.1f} {recall:>9.1f}% "
+              f"{false_positives:>6} {fp_per_frame:>10.2f}")
+
+    print("=" * 70)
+
+
+# ==================== RECOGNIZER BACKENDS ====================
+
+def load_split_dataset(dataset_path, test_every=5):
+    """
+    Load student images and hold out every Nth image per student
+
+    Returns:
+        (train, test) lists of (gray_face, label)
+    """
+    import cv2
+    import os
+    from train_model import list_student_images
+
+    train, test = [], []
+    if not os.path.exists(dataset_path):
+        return train, test
+
+    for label, (person_name, image_paths) in enumerate(list_student_images(dataset_path)):
+        for index, image_path in enumerate(sorted(image_paths)):
+            gray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+            if gray is None:
+                continue
+            target = test if index % test_every == test_every - 1 else train
+            target.append((gray, label))
+    return train, test
+
+
+def evaluate_recognizer(backend, train, test):
+    """Train one backend and measure it on held-out faces"""
+    import os
+    import tempfile
+    import numpy as np
+    from recognizer_backends import create_recognizer, prepare_face
+
+    faces = [prepare_face(face, backend) for face, _ in train]
+    labels = np.array([label for _, label in train])
+
+    recognizer = create_recognizer(backend)
+    start = time.perf_counter()
+    recognizer.train(faces, labels)
+    train_s = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_file = os.path.join(tmp, "model.yml")
+        recognizer.save(model_file)
+        model_bytes = os.path.getsize(model_file)
+
+    threshold = Config.RECOGNIZER_THRESHOLDS[backend]
+    timings = []
+    correct = 0
+    accepted = 0
+    for face, truth in test:
+        face = prepare_face(face, backend)
+        start = time.perf_counter()
+        label, confidence = recognizer.predict(face)
+        timings.append((time.perf_counter() - start) * 1000)
+        if label == truth:
+            correct += 1
+            if confidence < threshold:
+                accepted += 1
+
+    return {
+        'train_s': train_s,
+        'model_mb': model_bytes / (1024 * 1024),
+        'predict_ms': sum(timings) / len(timings) if timings else 0.0,
+        'top1': correct / len(test) * 100 if test else 0.0,
+        'accepted': accepted / len(test) * 100 if test else 0.0
+    }
+
+
+def benchmark_recognizers(args):
+    """Train time, model size, predict latency and accuracy per recognizer"""
+    from recognizer_backends import BACKENDS
+
+    dataset_path = args[0] if args else Config.DATASET_PATH
+    train, test = load_split_dataset(dataset_path)
+
+    if not test or len({label for _, label in train}) < 2:
+        print(f"⚠️  Need 2+ students at {dataset_path} - using synthetic faces")
+        faces, labels, _ = synthetic_faces(people=20, per_person=25)
+        pairs = list(zip(faces, labels))
+        train = [p for i, p in enumerate(pairs) if i % 5 != 4]
+        test = [p for i, p in enumerate(pairs) if i % 5 == 4]
+
+    students = len({label for _, label in train})
+    print_header(f"RECOGNIZERS ({students} students, {len(train)} train / {len(test)} test)")
+    print(f"{'Backend':<10} {'Train s':>9} {'Model MB':>10} {'Predict ms':>12} {'Top-1':>8} {'Accepted':>10}")
+    print("-" * 70)
+
+    for backend in BACKENDS:
+        try:
+            r = evaluate_recognizer(backend, train, test)
+        except Exception as e:
+            print(f"{backend:<10} failed - {e}")
+            continue
+        print(f"{backend:<10} {r['train_s']:>9.2f} {r['model_mb']:>10.2f} {r['predict_ms']:>12.2f} "
+              f"{r['top1']:>7.1f}% {r['accepted']:>9.1f}%")
+
+    print("-" * 70)
+    print("Accepted = correct and under the backend's threshold in Config.RECOGNIZER_THRESHOLDS")
+    print("=" * 70)
+
+
+# ==================== STREAMING TRAINING ====================
+
+def _train_in_child(dataset_dir, trainer_dir, streaming, results):
+    """Run train_model() against a scratch dataset (own process = own peak RSS)"""
+    import contextlib
+    import io
+    import os
+    from train_model import train_model
+    from streaming_trainer import peak_rss_mb
+
+    Config.DATASET_PATH = dataset_dir
+    Config.TRAINER_PATH = trainer_dir
+    Config.TRAINER_MODEL = os.path.join(trainer_dir, "trainer.yml")
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        success = train_model("lbph", streaming=streaming)
+    results.put({
+        'success': success,
+        'seconds': time.perf_counter() - start,
+        'peak_mb': peak_rss_mb(),
+        'model_mb': os.path.getsize(Config.TRAINER_MODEL) / (1024 * 1024) if success else 0.0
+    })
+
+
+def benchmark_streaming(args):
+    """Peak memory and time of in-memory vs streaming LBPH training"""
+    import multiprocessing
+    import os
+    import tempfile
+    import cv2
+
+    images = int(args[0]) if args else 1000
+    per_person = 50
+    people = max(2, images // per_person)
+    faces, labels, _ = synthetic_faces(people, per_person)
+
+    print_header(f"STREAMING TRAINING ({people} students, {len(faces)} images)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset_dir = os.path.join(tmp, "dataset")
+        for index, (face, label) in enumerate(zip(faces, labels)):
+            folder = os.path.join(dataset_dir, f"S{label:04d}")
+            os.makedirs(folder, exist_ok=True)
+            cv2.imwrite(os.path.join(folder, f"{index:06d}.png"), face)
+        del faces
+
+        context = multiprocessing.get_context("spawn")
+        results = {}
+        for name, streaming in (("in-memory", False), ("streaming", True)):
+            trainer_dir = os.path.join(tmp, name)
+            os.makedirs(trainer_dir)
+            queue = context.Queue()
+            process = context.Process(target=_train_in_child, args=(dataset_dir, trainer_dir, streaming, queue))
+            process.start()
+            results[name] = queue.get()
+            process.join()
+
+        print(f"{'Mode':<12} {'Train s':>9} {'Peak MB':>10} {'Model MB':>10}")
+        print("-" * 70)
+        for name, r in results.items():
+            peak = f"{r['peak_mb']:.0f}" if r['peak_mb'] is not None else "n/a"
+            print(f"{name:<12} {r['seconds']:>9.2f} {peak:>10} {r['model_mb']:>10.1f}")
+        print("-" * 70)
+
+        # Both models must give the same answers
+        if all(r['success'] for r in results.values()):
+            models = {}
+            for name in results:
+                models[name] = cv2.face.LBPHFaceRecognizer_create()
+                models[name].read(os.path.join(tmp, name, "trainer.yml"))
+
+            probes, _, _ = synthetic_faces(people, 1, seed=1)
+            agree = 0
+            for probe in probes[:20]:
+                a = models["in-memory"].predict(probe)
+                b = models["streaming"].predict(probe)
+                agree += a[0] == b[0] and abs(a[1] - b[1]) < 1e-3
+            print(f"Prediction agreement: {agree}/{min(20, len(probes))}")
+
+    print("=" * 70)
+
+
+# ==================== DATASET PRUNING ====================
+
+def synthetic_capture_session(people, poses, repeats, seed=0):
+    """
+    Face crops the way the capture tools save them: a few distinct head
+    poses, each repeated for several frames while the student holds still
+
+    Returns:
+        (sessions, test) - sessions: {name: [crops]}, test: [(crop, label)]
+        with unseen poses for every student
+    """
+    import cv2
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+
+    def random_pose(base):
+        matrix = cv2.getRotationMatrix2D((80, 80), rng.uniform(-12, 12), rng.uniform(0.92, 1.08))
+        matrix[:, 2] += rng.uniform(-8, 8, 2)
+        return cv2.warpAffine(base, matrix, (160, 160), borderMode=cv2.BORDER_REFLECT)[20:140, 20:140]
+
+    def camera_noise(crop):
+        return np.clip(crop.astype(np.int16) + rng.integers(-6, 7, crop.shape), 0, 255).astype(np.uint8)
+
+    sessions, test = {}, []
+    for label in range(people):
+        base = cv2.GaussianBlur(rng.integers(0, 256, (160, 160), dtype=np.uint8), (0, 0), 4)
+        crops = []
+        for _ in range(poses):
+            pose = random_pose(base)
+            crops.extend(camera_noise(pose) for _ in range(repeats))
+        sessions[f"S{label:03d}"] = crops
+        test.extend((camera_noise(random_pose(base)), label) for _ in range(3))
+    return sessions, test
+
+
+def benchmark_prune(args):
+    """Images removed, prune time and the effect on model size / accuracy"""
+    import os
+    import tempfile
+    import cv2
+    from prune_dataset import analyze_dataset
+
+    people = int(args[0]) if args else 30
+    sessions, test = synthetic_capture_session(people, poses=12, repeats=5)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, crops in sessions.items():
+            os.makedirs(os.path.join(tmp, name))
+            for index, crop in enumerate(crops, 1):
+                cv2.imwrite(os.path.join(tmp, name, f"{index}.jpg"), crop)
+
+        timings = {}
+        for workers in (1, os.cpu_count() or 1):
+            start = time.perf_counter()
+            results = analyze_dataset(tmp, workers=workers)
+            timings[workers] = time.perf_counter() - start
+
+        labels = {name: label for label, name in enumerate(sorted(sessions))}
+        full = [(cv2.imread(p, cv2.IMREAD_GRAYSCALE), labels[r['name']])
+                for r in results for p in r['kept'] + r['duplicates']]
+        pruned = [(cv2.imread(p, cv2.IMREAD_GRAYSCALE), labels[r['name']])
+                  for r in results for p in r['kept']]
+
+    removed = len(full) - len(pruned)
+    print_header(f"DATASET PRUNING ({people} students, {len(full)} images)")
+    print(f"Removed: {removed} images ({removed / len(full) * 100:.1f}%) "
+          f"at max distance {Config.DEDUP_MAX_DISTANCE}")
+    for workers, seconds in timings.items():
+        print(f"Analyze with {workers} worker(s): {seconds:.2f}s")
+    print("-" * 70)
+    print(f"{'Dataset':<10} {'Images':>8} {'Train s':>9} {'Model MB':>10} {'Predict ms':>12} {'Top-1':>8}")
+    print("-" * 70)
+    for name, train in (("full", full), ("pruned", pruned)):
+        r = evaluate_recognizer("lbph", train, test)
+        print(f"{name:<10} {len(train):>8} {r['train_s']:>9.2f} {r['model_mb']:>10.2f} "
+              f"{r['predict_ms']:>12.2f} {r['top1']:>7.1f}%")
+    print("=" * 70)
+
+
+# ==================== CAPTURE QUALITY GATE ====================
+
+def synthetic_capture_stream(frames, seed=0):
+    """
+    Face crops from one enrollment session: the student changes pose every
+    ~10 frames; some frames are motion-blurred or underexposed
+
+    Returns:
+        List of (crop, pose_id, defect) - defect is None, 'blurry' or 'dark'
+    """
+    import cv2
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    base = cv2.GaussianBlur(rng.integers(0, 256, (160, 160), dtype=np.uint8), (0, 0), 1.5)
+
+    stream = []
+    pose_id = -1
+    for index in range(frames):
+        if index % 10 == 0:
+            pose_id += 1
+            matrix = cv2.getRotationMatrix2D((80, 80), rng.uniform(-12, 12), rng.uniform(0.92, 1.08))
+            matrix[:, 2] += rng.uniform(-8, 8, 2)
+            pose = cv2.warpAffine(base, matrix, (160, 160), borderMode=cv2.BORDER_REFLECT)[20:140, 20:140]
+
+        crop = np.clip(pose.astype(np.int16) + rng.integers(-6, 7, pose.shape), 0, 255).astype(np.uint8)
+        defect = None
+        roll = rng.random()
+        if roll < 0.2:
+            crop, defect = cv2.GaussianBlur(crop, (0, 0), 2.5), 'blurry'
+        elif roll < 0.3:
+            crop, defect = (crop * 0.3).astype(np.uint8), 'dark'
+        stream.append((crop, pose_id, defect))
+    return stream
+
+
+def benchmark_quality(args):
+    """Frames needed to fill an enrollment set, with and without the quality gate"""
+    from capture_quality import QualityGate
+
+    target = int(args[0]) if args else Config.REQUIRED_IMAGES_PER_STUDENT
+    stream = synthetic_capture_stream(frames=target * 40)
+
+    def run(select):
+        """Frames and saved images until the set holds `target` clean, distinct poses"""
+        saved = 0
+        poses = set()
+        for frames_used, (crop, pose_id, defect) in enumerate(stream, 1):
+            if select(frames_used, crop):
+                saved += 1
+                if defect is None:
+                    poses.add(pose_id)
+                if len(poses) == target:
+                    break
+        return frames_used, saved, len(poses)
+
+    gate = QualityGate(enabled=True)
+    results = {
+        f"every {Config.IMAGE_CAPTURE_FRAME_SKIP}nd frame": run(
+            lambda n, crop: n % Config.IMAGE_CAPTURE_FRAME_SKIP == 0),
+        "quality gate": run(lambda n, crop: gate.evaluate(crop)[0]),
+    }
+
+    print_header(f"CAPTURE QUALITY GATE (until {target} usable images)")
+    print(f"{'Strategy':<18} {'Frames':>8} {'Saved':>7} {'Usable':>8} {'Wasted':>8}")
+    print("-" * 70)
+    for name, (frames_used, saved, usable) in results.items():
+        print(f"{name:<18} {frames_used:>8} {saved:>7} {usable:>8} {saved - usable:>8}")
+    print("-" * 70)
+    print("Usable = sharp, well-lit and a head pose not saved before")
+    print(f"Gate: {gate.summary()}")
+    print("=" * 70)
+
+
+# ==================== ASYNC IMAGE WRITER ====================
+
+def benchmark_writer(args):
+    """Capture-loop FPS with inline vs background image writes"""
+    import os
+    import tempfile
+    import cv2
+    import numpy as np
+    from async_writer import AsyncImageWriter
+    from face_detectors import create_face_detector
+
+    frames = int(args[0]) if args else 150
+    camera_fps = Config.CAMERA_FPS
+    detector = create_face_detector()
+    rng = np.random.default_rng(0)
+    camera = [cv2.GaussianBlur(rng.integers(0, 256, (480, 640, 3), dtype=np.uint8), (0, 0), 3)
+              for _ in range(10)]
+
+    def slow_disk(delay_ms):
+        def write(path, image):
+            ok = cv2.imwrite(path, image)
+            time.sleep(delay_ms / 1000)  # SD card / network share latency
+            return ok
+        return write
+
+    print_header(f"ASYNC IMAGE WRITER ({frames} frames from a {camera_fps} FPS camera, "
+                 f"save every {Config.IMAGE_CAPTURE_FRAME_SKIP}nd)")
+    print(f"{'Disk latency':<14} {'Mode':<8} {'FPS':>7} {'Missed':>8} {'Saved':>7} {'Waited s':>10} {'Max queue':>10}")
+    print("-" * 70)
+
+    for delay_ms in (0, 20, 50, 100, 200):
+        for mode, enabled in (("inline", False), ("async", True)):
+            with tempfile.TemporaryDirectory() as tmp:
+                writer = AsyncImageWriter(enabled=enabled, write_func=slow_disk(delay_ms))
+                start = time.perf_counter()
+                next_frame = start
+                saves = 0
+                for index in range(frames):
+                    # cam.read() blocks until the next frame is ready
+                    now = time.perf_counter()
+                    if now < next_frame:
+                        time.sleep(next_frame - now)
+                    next_frame = max(next_frame, now) + 1.0 / camera_fps
+
+                    gray = cv2.cvtColor(camera[index % len(camera)], cv2.COLOR_BGR2GRAY)
+                    detector.detect(gray)
+                    if index % Config.IMAGE_CAPTURE_FRAME_SKIP == 0:
+                        saves += 1
+                        writer.write(os.path.join(tmp, f"{saves}.jpg"), gray[140:340, 220:420])
+                elapsed = time.perf_counter() - start
+                fps = frames / elapsed
+                # Frames the camera produced that the loop never read
+                missed = max(0, round(elapsed * camera_fps) - frames)
+                writer.close()
+                saved = len(os.listdir(tmp))
+
+            waited = f"{writer.blocked_seconds:.2f}" if enabled else "-"
+            depth = str(writer.max_depth) if enabled else "-"
+            print(f"{str(delay_ms) + ' ms':<14} {mode:<8} {fps:>7.1f} {missed:>8} {saved:>4}/{saves:<2} "
+                  f"{waited:>10} {depth:>10}")
+
+    print("-" * 70)
+    print("Missed = camera frames lost while the loop was busy")
+    print(f"Queue size {Config.ASYNC_WRITER_QUEUE_SIZE}: when the disk cannot keep up the loop waits "
+          "instead of dropping images")
+    print("=" * 70)
+
+
+# ==================== STUDENT REGISTRY ====================
+
+def synthetic_students(count, seed=0):
+    """[(student_id, record)] spread over every class, like csv_import.py output"""
+    rng = random.Random(seed)
+    classes = [(b, s) for b in Config.ALLOWED_BRANCHES for s in Config.ALLOWED_SECTIONS]
+    students = []
+    for index in range(count):
+        branch, section = classes[index % len(classes)]
+        name = f"Student {rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ')}{index}"
+        students.append((name.lower().replace(" ", "_"), {
+            "name": name,
+            "rollNo": f"{branch}{section}{index:06d}",
+            "branch": branch,
+            "section": section,
+            "imagesCount": 0,
+            "registeredDate": "2026-01-05 09:00:00",
+            "datasetPath": "",
+            "imported": True
+        }))
+    return students
+
+
+def benchmark_registry(args):
+    """SQLite registry vs the old load-scan-rewrite JSON file"""
+    import json
+    import os
+    import tempfile
+    from student_registry import StudentRegistry, RegistryError
+
+    count = int(args[0]) if args else 100000
+    lookups = 1000
+    students = synthetic_students(count)
+    rng = random.Random(1)
+    probe_rolls = [students[rng.randrange(count)][1]['rollNo'] for _ in range(lookups)]
+    branch, section = Config.ALLOWED_BRANCHES[0], Config.ALLOWED_SECTIONS[0]
+    new_student = ("late_joiner", dict(students[0][1], name="Late Joiner", rollNo="LATE000001"))
+
+    def timed(func, repeat=1):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = func()
+        return (time.perf_counter() - start) / repeat * 1000, result
+
+    print_header(f"STUDENT REGISTRY ({count:,} students)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_file = os.path.join(tmp, "student_database.json")
+        db_file = os.path.join(tmp, "student_registry.db")
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(dict(students), indent=4, fp=f)
+
+        # ---------- old JSON file: every operation loads the whole file ----------
+        def json_load():
+            with open(json_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        def json_find_roll(db, roll):
+            for student_id, info in db.items():
+                if info.get('rollNo', '').upper() == roll.upper():
+                    return student_id
+            return None
+
+        def json_add():
+            db = json_load()
+            if json_find_roll(db, new_student[1]['rollNo']) is None:
+                db[new_student[0]] = new_student[1]
+            with open(json_file, 'w', encoding='utf-8') as f:
+                json.dump(db, indent=4, fp=f)
+
+        load_ms, db = timed(json_load, 3)
+        json_rows = {
+            'load all': load_ms,
+            'roll lookup': load_ms + timed(lambda: [json_find_roll(db, r) for r in probe_rolls[:50]])[0] / 50,
+            'class roster': load_ms + timed(lambda: [
+                info for info in db.values() if info['branch'] == branch and info['section'] == section
+            ], 10)[0],
+            'class count': load_ms + timed(lambda: sum(
+                1 for info in db.values() if info['branch'] == branch and info['section'] == section
+            ), 10)[0],
+            'add (dup check)': timed(json_add, 3)[0],
+        }
+        del db
+
+        # ---------- registry ----------
+        registry = StudentRegistry(db_file, json_path="")
+        bulk_ms, _ = timed(lambda: registry.add_many(students))
+        registry_rows = {
+            'load all': timed(registry.all, 3)[0],
+            'roll lookup': timed(lambda: [registry.find_by_roll(r) for r in probe_rolls])[0] / lookups,
+            'class roster': timed(lambda: registry.by_class(branch, section), 10)[0],
+            'class count': timed(lambda: registry.count_in_class(branch, section), 100)[0],
+        }
+
+        late_joiners = iter(
+            (f"late_joiner_{i}", dict(new_student[1], rollNo=f"LATE{i:06d}")) for i in range(100)
+        )
+
+        def registry_add():
+            student_id, record = next(late_joiners)
+            if registry.find_by_roll(record['rollNo']) is None:
+                registry.add(student_id, record)
+
+        registry_rows['add (dup check)'] = timed(registry_add, 100)[0]
+
+        try:
+            registry.add(students[5][0] + "_x", dict(students[5][1]))
+            duplicate_rejected = False
+        except RegistryError:
+            duplicate_rejected = True
+
+        updates = {student_id: (50, f"dataset/{info['name']}") for student_id, info in students[:1000]}
+        update_ms, _ = timed(lambda: registry.update_images(updates))
+        registry.close()
+
+        migrate_file = os.path.join(tmp, "migrated.db")
+        migrate_ms, _ = timed(lambda: StudentRegistry(migrate_file, json_file).count())
+        json_mb = os.path.getsize(json_file) / 1024 / 1024
+        db_mb = os.path.getsize(db_file) / 1024 / 1024
+
+    print(f"{'Operation':<18} {'JSON ms':>12} {'Registry ms':>14} {'Speedup':>10}")
+    print("-" * 70)
+    for operation, json_ms in json_rows.items():
+        db_ms = registry_rows[operation]
+        print(f"{operation:<18} {json_ms:>12.2f} {db_ms:>14.3f} {json_ms / db_ms:>9.1f}x")
+    print("-" * 70)
+    print(f"Bulk insert {count:,} (one transaction): {bulk_ms:.0f} ms "
+          f"({count / bulk_ms * 1000:,.0f} students/s)")
+    print(f"One-time JSON migration: {migrate_ms:.0f} ms")
+    print(f"update_images for 1,000 students: {update_ms:.1f} ms")
+    print(f"Duplicate roll number rejected by the unique index: {'yes' if duplicate_rejected else 'NO'}")
+    print(f"File size: JSON {json_mb:.1f} MB, SQLite {db_mb:.1f} MB")
+    print("JSON lookups include loading the file, as every module did per call")
+    print("=" * 70)
+
+
+def benchmark_validation(args):
+    """Per-student duplicate checks: JSON scans, registry queries, ValidationContext"""
+    import json
+    import os
+    import tempfile
+    from student_registry import get_registry
+    from validators import StudentValidator, ValidationContext
+
+    count = int(args[0]) if args else 100000
+    batch_size = 1000
+    students = synthetic_students(count)
+    rng = random.Random(2)
+
+    # New students; every 20th reuses a registered roll number
+    batch = []
+    for index in range(batch_size):
+        branch = Config.ALLOWED_BRANCHES[index % len(Config.ALLOWED_BRANCHES)]
+        section = Config.ALLOWED_SECTIONS[index % len(Config.ALLOWED_SECTIONS)]
+        roll_no = students[rng.randrange(count)][1]['rollNo'] if index % 20 == 0 else f"{branch}{section}9{index:05d}"
+        batch.append({'name': f"New Student {chr(65 + index % 26)}", 'rollNo': roll_no,
+                      'branch': branch, 'section': section})
+
+    def check_with(checks, row):
+        checks.check_duplicate_roll_number(row['rollNo'])
+        checks.check_duplicate_name(row['name'], row['branch'], row['section'])
+        checks.generate_unique_student_id(row['name'])
+
+    print_header(f"VALIDATION ({batch_size:,} new students vs {count:,} registered)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_file = os.path.join(tmp, "student_database.json")
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(dict(students), indent=4, fp=f)
+
+        # Old validators.py: every check loaded the file and scanned it
+        def json_checks(row):
+            for _ in range(3):
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    db = json.load(f)
+                any(info['rollNo'].upper() == row['rollNo'].upper() for info in db.values())
+
+        json_rows = 5
+        start = time.perf_counter()
+        for row in batch[:json_rows]:
+            json_checks(row)
+        json_us = (time.perf_counter() - start) / json_rows * 1e6
+
+        Config.STUDENT_REGISTRY_DB = os.path.join(tmp, "student_registry.db")
+        Config.STUDENT_DB = json_file + ".unused"
+        registry = get_registry()
+        registry.add_many(students)
+
+        start = time.perf_counter()
+        for row in batch:
+            check_with(StudentValidator, row)
+        query_us = (time.perf_counter() - start) / batch_size * 1e6
+
+        start = time.perf_counter()
+        context = ValidationContext()
+        build_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for row in batch:
+            check_with(context, row)
+        context_us = (time.perf_counter() - start) / batch_size * 1e6
+
+        start = time.perf_counter()
+        accepted, rejected, warnings = ValidationContext().validate_batch(batch)
+        batch_ms = (time.perf_counter() - start) * 1000
+
+        duplicate = batch[0]['rollNo']
+        same_messages = (
+            StudentValidator.check_duplicate_roll_number(duplicate) ==
+            ValidationContext().check_duplicate_roll_number(duplicate)
+        )
+        registry.close()
+
+    print(f"{'Checks per student':<34} {'µs/student':>12} {'Batch of ' + str(batch_size):>16}")
+    print("-" * 70)
+    print(f"{'JSON reload + scan (old)':<34} {json_us:>12,.0f} {json_us * batch_size / 1e6:>15.1f}s")
+    print(f"{'Registry queries':<34} {query_us:>12,.1f} {query_us * batch_size / 1e3:>14.1f}ms")
+    print(f"{'ValidationContext':<34} {context_us:>12,.2f} {context_us * batch_size / 1e3:>14.1f}ms")
+    print("-" * 70)
+    print(f"Context build (load + index {count:,}): {build_ms:.0f} ms")
+    print(f"validate_batch incl. build: {batch_ms:.0f} ms - {len(accepted)} accepted, "
+          f"{len(rejected)} rejected, {len(warnings)} warnings")
+    print(f"Same duplicate message as StudentValidator: {'yes' if same_messages else 'NO'}")
+    print(f"JSON row measured on {json_rows} students (roll number check x3, as before)")
+    print("=" * 70)
+
+
+def benchmark_csv_import(args):
+    """Streaming CSV import vs the old per-row scan of the whole database"""
+    import contextlib
+    import csv
+    import io
+    import os
+    import tempfile
+    import csv_import
+    from student_registry import get_registry
+
+    rows = int(args[0]) if args else 100000
+    registered = synthetic_students(rows, seed=1)
+    rng = random.Random(3)
+
+    def letters(number):
+        """Names may only contain letters: 0 -> A, 27 -> BB"""
+        text = ""
+        while True:
+            text = chr(65 + number % 26) + text.lower()
+            number //= 26
+            if not number:
+                return text
+
+    def write_csv(path, count):
+        """New students with 1% in-file duplicates, 1% registered rolls, 0.5% bad branch"""
+        planted = {'duplicate_in_file': 0, 'duplicate_registered': 0, 'branch': 0}
+        clean_rolls = []
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(csv_import.REQUIRED_HEADERS)
+            for index, (_, info) in enumerate(synthetic_students(count, seed=4)):
+                roll_no, branch = f"N{info['rollNo']}", info['branch']
+                draw = rng.random()
+                if draw < 0.01 and clean_rolls:
+                    roll_no = rng.choice(clean_rolls)
+                    planted['duplicate_in_file'] += 1
+                elif draw < 0.02:
+                    roll_no = registered[rng.randrange(len(registered))][1]['rollNo']
+                    planted['duplicate_registered'] += 1
+                elif draw < 0.025:
+                    branch = "ARTS"
+                    planted['branch'] += 1
+                else:
+                    clean_rolls.append(roll_no)
+                writer.writerow([f"Student {letters(index)}", roll_no, branch, info['section']])
+        return planted
+
+    def old_import(path, db):
+        """The original loop: every row scans every student"""
+        with open(path, 'r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                if any(info.get('rollNo') == row['RollNo'] for info in db.values()):
+                    continue
+                student_id = row['Name'].lower().replace(" ", "_")
+                if student_id in db:
+                    counter = 1
+                    while f"{student_id}_{counter}" in db:
+                        counter += 1
+                    student_id = f"{student_id}_{counter}"
+                db[student_id] = {"name": row['Name'], "rollNo": row['RollNo']}
+
+    print_header(f"CSV IMPORT ({rows:,} rows, {len(registered):,} students already registered)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.STUDENT_REGISTRY_DB = os.path.join(tmp, "student_registry.db")
+        Config.STUDENT_DB = os.path.join(tmp, "student_database.json")
+        registry = get_registry()
+        registry.add_many(registered)
+
+        print(f"{'Rows':>8} {'Old loop s':>12} {'Rows/s':>10}")
+        print("-" * 70)
+        old_rate = None
+        for small in (250, 500, 1000):
+            path = os.path.join(tmp, f"old_{small}.csv")
+            write_csv(path, small)
+            start = time.perf_counter()
+            old_import(path, dict(registered))
+            elapsed = time.perf_counter() - start
+            old_rate = small / elapsed
+            print(f"{small:>8,} {elapsed:>12.2f} {old_rate:>10,.0f}")
+        # Each row scans a database that keeps growing: rows x (students + rows/2)
+        scans_per_row = len(registered) + rows / 2
+        old_estimate = rows * scans_per_row / ((len(registered) + 500) * old_rate) if old_rate else 0
+        print("-" * 70)
+
+        path = os.path.join(tmp, "students.csv")
+        planted = write_csv(path, rows)
+        results = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            for dry_run in (True, False):
+                results[dry_run] = csv_import.import_csv(path, dry_run=dry_run)
+        total_after = registry.count()
+        registry.close()
+
+    print(f"{'Streaming import':<22} {'Seconds':>9} {'Rows/s':>10} {'Accepted':>10} {'Rejected':>10}")
+    print("-" * 70)
+    for dry_run, label in ((True, "dry run"), (False, "import (1 transaction)")):
+        report = results[dry_run]
+        print(f"{label:<22} {report['seconds']:>9.2f} {report['rows'] / report['seconds']:>10,.0f} "
+              f"{report['accepted']:>10,} {len(report['errors']):>10,}")
+    print("-" * 70)
+
+    found = {}
+    for _, kind, _ in results[False]['errors']:
+        found[kind] = found.get(kind, 0) + 1
+    for kind, count in planted.items():
+        print(f"{csv_import.ERROR_KINDS[kind]:<40} planted {count:>6,}  found {found.get(kind, 0):>6,}")
+    print(f"Saved {results[False]['saved']:,} rows; registry now holds {total_after:,} students")
+    print(f"Registry write lock held {results[False]['write_seconds']:.2f} s of the "
+          f"{results[False]['seconds']:.2f} s import (busy timeout {Config.REGISTRY_BUSY_TIMEOUT_SECONDS} s)")
+    print(f"Old loop at {rows:,} rows (extrapolated from the 1,000-row run): ~{old_estimate / 60:,.0f} min")
+    print("=" * 70)
+
+
+def synthetic_attendance(path, rows, class_size=60, seed=0):
+    """
+    Write an attendance.csv history of about rows marks, oldest first
+
+    Every class marks class_size students a day (a random 75-100% show
+    up), ending today. Returns the last date written.
+    """
+    import csv
+    from datetime import date, timedelta
+
+    rng = random.Random(seed)
+    classes = [(b, s) for b in Config.ALLOWED_BRANCHES for s in Config.ALLOWED_SECTIONS]
+    days = max(1, rows // (len(classes) * class_size * 7 // 8))
+    day = date.today() - timedelta(days=days - 1)
+
+    written = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Name", "RollNo", "Branch", "Section", "Date", "Time"])
+        while written < rows and day <= date.today():
+            date_str = str(day)
+            marks = []
+            for branch, section in classes:
+                for index in rng.sample(range(class_size), rng.randint(class_size * 3 // 4, class_size)):
+                    seconds = 9 * 3600 + rng.randrange(1800)
+                    marks.append((seconds, [f"Student {index}", f"{branch}{section}{index:03d}",
+                                            branch, section, date_str]))
+            marks.sort(key=lambda mark: mark[0])
+            for seconds, row in marks[:rows - written]:
+                writer.writerow(row + [f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"])
+            written += min(len(marks), rows - written)
+            day += timedelta(days=1)
+    return str(day - timedelta(days=1))
+
+
+def benchmark_attendance(args):
+    """One class-day read and class export: single attendance.csv vs date/class partitions"""
+    import os
+    import tempfile
+    from attendance_store import CsvAttendanceStore, PartitionedAttendanceStore, export_csv
+
+    rows = int(args[0]) if args else 1000000
+    repeats = 5
+    branch, section = Config.ALLOWED_BRANCHES[0], Config.ALLOWED_SECTIONS[0]
+
+    print_header(f"ATTENDANCE STORAGE ({rows:,} marks)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "attendance.csv")
+        last_day = synthetic_attendance(csv_path, rows)
+        csv_mb = os.path.getsize(csv_path) / 1e6
+
+        start = time.perf_counter()
+        partitioned = PartitionedAttendanceStore(os.path.join(tmp, "attendance"), csv_path)
+        migrate_s = time.perf_counter() - start
+        single = CsvAttendanceStore(csv_path)
+
+        results = {}
+        for name, store in (("csv", single), ("partitioned", partitioned)):
+            start = time.perf_counter()
+            for _ in range(repeats):
+                day_rows = store.read_day(last_day, branch, section)
+            read_ms = (time.perf_counter() - start) / repeats * 1000
+
+            start = time.perf_counter()
+            exported = export_csv(os.path.join(tmp, f"export_{name}.csv"), store, branch, section)
+            export_ms = (time.perf_counter() - start) * 1000
+            results[name] = (read_ms, len(day_rows), export_ms, exported)
+
+        start = time.perf_counter()
+        total = export_csv(os.path.join(tmp, "export_all.csv"), partitioned)
+        export_all_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        partitioned.append([["Late Student", f"{branch}{section}999", branch, section, last_day, "10:00:00"]])
+        append_ms = (time.perf_counter() - start) * 1000
+        appended = len(partitioned.read_day(last_day, branch, section)) == results["partitioned"][1] + 1
+
+        with open(csv_path, 'r', encoding='utf-8') as f:
+            original = f.read()
+        with open(os.path.join(tmp, "export_all.csv"), 'r', encoding='utf-8') as f:
+            exported_all = f.read()
+        same_rows = sorted(original.splitlines()) == sorted(exported_all.splitlines())
+        partitions = sum(len(partitioned.classes_on(day)) for day in partitioned.dates())
+
+    print(f"{'Storage':<14} {'Class-day read':>15} {'Rows':>6} {'Class export':>14} {'Rows':>9}")
+    print("-" * 70)
+    for name in ("csv", "partitioned"):
+        read_ms, day_count, export_ms, exported = results[name]
+        print(f"{name:<14} {read_ms:>13.2f}ms {day_count:>6} {export_ms:>12.0f}ms {exported:>9,}")
+    print("-" * 70)
+    print(f"attendance.csv: {csv_mb:.0f} MB, {partitions:,} partitions")
+    print(f"Class-day read speedup: {results['csv'][0] / results['partitioned'][0]:.0f}x")
+    print(f"Migration: {migrate_s:.1f} s | full compatibility export: {export_all_s:.1f} s ({total:,} rows)")
+    print(f"Export has the same rows as attendance.csv: {'yes' if same_rows else 'NO'}")
+    print(f"Append one mark: {append_ms:.2f} ms, visible to the next read: {'yes' if appended else 'NO'}")
+    print("=" * 70)
+
+
+def benchmark_attendance_index(args):
+    """One class-day from a large attendance.csv: full parse vs date offset index"""
+    import os
+    import tempfile
+    from datetime import datetime
+    from attendance_store import CsvAttendanceStore
+
+    rows = int(args[0]) if args else 5000000
+    requests = 200
+    branch, section = Config.ALLOWED_BRANCHES[0], Config.ALLOWED_SECTIONS[0]
+    today = str(datetime.now().date())
+
+    print_header(f"ATTENDANCE DATE INDEX ({rows:,} rows in attendance.csv)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "attendance.csv")
+
+        start = time.perf_counter()
+        synthetic_attendance(csv_path, rows)
+        generate_s = time.perf_counter() - start
+        csv_mb = os.path.getsize(csv_path) / 1e6
+
+        def timed_read(store):
+            start = time.perf_counter()
+            count = len(store.read_day(today, branch, section))
+            return (time.perf_counter() - start) * 1000, count
+
+        def percentiles(times):
+            times = sorted(times)
+            return times[len(times) // 2], times[int(len(times) * 0.99)]
+
+        # Full parse of the file per read (what the csv backend did)
+        scan_store = CsvAttendanceStore(csv_path, use_index=False)
+        scan = [timed_read(scan_store) for _ in range(3)]
+        scan_ms = sum(ms for ms, count in scan) / len(scan)
+
+        # A fresh API process: no sidecar yet, every line read once
+        store = CsvAttendanceStore(csv_path, use_index=True)
+        build_ms, present = timed_read(store)
+        store.index.save()
+        dates = len(store.index)
+        ordered = store.index.ordered
+        steady = [timed_read(store)[0] for _ in range(requests)]
+
+        # The recognizer (another store) appends between reads and saves its sidecar
+        writer = CsvAttendanceStore(csv_path, use_index=True)
+        with_writes = []
+        for index_number in range(requests):
+            writer.append([[f"Late Student {index_number}", f"{branch}{section}9{index_number:04d}",
+                             branch, section, today, "10:00:00"]])
+            with_writes.append(timed_read(store))
+        sidecar_kb = os.path.getsize(csv_path + ".idx") / 1024
+        all_seen = with_writes[-1][1] == present + requests
+
+        # Another process starting up with the writer's sidecar
+        sidecar_ms = timed_read(CsvAttendanceStore(csv_path, use_index=True))[0]
+
+    steady_p50, steady_p99 = percentiles(steady)
+    write_p50, write_p99 = percentiles([ms for ms, count in with_writes])
+    print(f"{'Mode':<40} {'p50':>10} {'p99':>10}")
+    print("-" * 70)
+    print(f"{'Full DictReader parse (old)':<40} {scan_ms:>8.0f}ms {'':>10}")
+    print(f"{'Index, first read (no sidecar)':<40} {build_ms:>8.1f}ms {'':>10}")
+    print(f"{'Index, first read (with sidecar)':<40} {sidecar_ms:>8.1f}ms {'':>10}")
+    print(f"{'Index, repeated reads':<40} {steady_p50:>8.2f}ms {steady_p99:>8.2f}ms")
+    print(f"{'Index, recognizer appending':<40} {write_p50:>8.2f}ms {write_p99:>8.2f}ms")
+    print("-" * 70)
+    print(f"attendance.csv: {csv_mb:.0f} MB ({generate_s:.0f} s to generate), "
+          f"{dates:,} dates ({'in order' if ordered else 'OUT OF ORDER'}), sidecar {sidecar_kb:.0f} KB")
+    print(f"Speedup (repeated reads p50): {scan_ms / steady_p50:,.0f}x")
+    print(f"Same rows as the full parse: {'yes' if present == scan[0][1] else 'NO'}")
+    print(f"Every appended mark visible on the next read: {'yes' if all_seen else 'NO'}")
+    print("=" * 70)
+
+
+def benchmark_today(args):
+    """Polling today's attendance: re-reading the store vs tailing newly appended rows"""
+    import os
+    import tempfile
+    from datetime import date
+    from attendance_store import CsvAttendanceStore, PartitionedAttendanceStore
+    from attendance_tail import TodayAttendance, unique_records
+
+    rows = int(args[0]) if args else 1000000
+    polls = 200
+    branch, section = Config.ALLOWED_BRANCHES[0], Config.ALLOWED_SECTIONS[0]
+    today = str(date.today())
+
+    def percentiles(times):
+        times = sorted(times)
+        return times[len(times) // 2], times[int(len(times) * 0.99)]
+
+    def measure(poll, writers, repeats=polls):
+        """First poll, then polls with nothing new, then polls after one new mark each"""
+        run = len(results)
+        start = time.perf_counter()
+        present = len(poll())
+        first_ms = (time.perf_counter() - start) * 1000
+
+        idle = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            poll()
+            idle.append((time.perf_counter() - start) * 1000)
+
+        after_write = []
+        for number in range(repeats):
+            row = [f"Late Student {number}", f"{branch}{section}L{run}{number:04d}",
+                   branch, section, today, "10:00:00"]
+            for writer in writers:
+                writer.append([row])
+            start = time.perf_counter()
+            count = len(poll())
+            after_write.append((time.perf_counter() - start) * 1000)
+        return first_ms, percentiles(idle), percentiles(after_write), count == present + repeats
+
+    print_header(f"TODAY'S ATTENDANCE POLLING ({rows:,} rows of history)")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "attendance.csv")
+        synthetic_attendance(csv_path, rows)
+        partitioned = PartitionedAttendanceStore(os.path.join(tmp, "attendance"), csv_path)
+        csv_store = CsvAttendanceStore(csv_path, use_index=True)
+        # The recognizer writes every mark to both layouts
+        writers = [csv_store, partitioned]
+
+        full_parse = CsvAttendanceStore(csv_path, use_index=False)
+        results.append(("Full parse of attendance.csv", measure(
+            lambda: unique_records(full_parse.read_day(today, branch, section)), writers, repeats=3)))
+        results.append(("attendance.csv + date index", measure(
+            lambda: unique_records(csv_store.read_day(today, branch, section)), writers)))
+        results.append(("Partition file re-read", measure(
+            lambda: unique_records(partitioned.read_day(today, branch, section)), writers)))
+
+        tail_csv = TodayAttendance(CsvAttendanceStore(csv_path, use_index=True))
+        results.append(("Tail attendance.csv", measure(
+            lambda: tail_csv.records(branch, section, today), writers)))
+        tail_partitioned = TodayAttendance(PartitionedAttendanceStore(os.path.join(tmp, "attendance")))
+        results.append(("Tail partition file", measure(
+            lambda: tail_partitioned.records(branch, section, today), writers)))
+        csv_mb = os.path.getsize(csv_path) / 1e6
+
+    print(f"{'Per poll (' + branch + '-' + section + ')':<30} {'first':>9} {'idle p50':>9} {'idle p99':>9} "
+          f"{'+1 p50':>9} {'+1 p99':>9}")
+    print("-" * 80)
+    all_seen = True
+    for label, (first_ms, (idle_p50, idle_p99), (write_p50, write_p99), seen) in results:
+        print(f"{label:<30} {first_ms:>7.2f}ms {idle_p50:>7.3f}ms {idle_p99:>7.3f}ms "
+              f"{write_p50:>7.3f}ms {write_p99:>7.3f}ms")
+        all_seen = all_seen and seen
+    print("-" * 80)
+    print(f"attendance.csv: {csv_mb:.0f} MB | +1 = poll right after the recognizer appends one mark")
+    print(f"Every poll saw every new mark: {'yes' if all_seen else 'NO'}")
+    print("=" * 80)
+
+
+def benchmark_columnar(args):
+    """Class analytics: Python over CSV rows vs NumPy over the columnar store"""
+    import os
+    import tempfile
+    from collections import Counter
+    from datetime import date, timedelta
+    from attendance_store import CsvAttendanceStore
+    from attendance_columnar import ColumnarAttendanceStore
+
+    rows = int(args[0]) if args else 5000000
+    appends = int(args[1]) if len(args) > 1 else 2000
+    classes = [(b, s) for b in Config.ALLOWED_BRANCHES for s in Config.ALLOWED_SECTIONS]
+    branch, section = classes[0]
+    semester_start = str(date.today() - timedelta(days=120))
+
+    def python_report(class_rows, first_date=None):
+        """Per-day counts, per-student days and 5-minute arrival bins the row-by-row way"""
+        first = {}
+        for row in class_rows:
+            if first_date and row['Date'] < first_date:
+                continue
+            key = (row['RollNo'], row['Date'])
+            hours, minutes, seconds = (int(part) for part in row['Time'].split(":"))
+            arrival = hours * 3600 + minutes * 60 + seconds
+            if key not in first or arrival < first[key]:
+                first[key] = arrival
+        days = Counter(day for roll, day in first)
+        students = Counter(roll for roll, day in first)
+        arrivals = Counter(arrival // 300 for arrival in first.values())
+        return days, students, arrivals
+
+    print_header(f"COLUMNAR ATTENDANCE ANALYTICS ({rows:,} marks)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "attendance.csv")
+        synthetic_attendance(csv_path, rows)
+        source = CsvAttendanceStore(csv_path, use_index=False)
+
+        start = time.perf_counter()
+        ColumnarAttendanceStore(os.path.join(tmp, "columnar"), source)
+        build_s = time.perf_counter() - start
+        columnar_mb = sum(os.path.getsize(os.path.join(tmp, "columnar", name))
+                          for name in os.listdir(os.path.join(tmp, "columnar"))) / 1e6
+
+        # Old way: parse the CSV and aggregate row by row
+        start = time.perf_counter()
+        class_rows = list(source.iter_class(branch, section))
+        parse_s = time.perf_counter() - start
+        start = time.perf_counter()
+        expected = python_report(class_rows)
+        python_all_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        expected_semester = python_report(class_rows, semester_start)
+        python_semester_ms = (time.perf_counter() - start) * 1000
+
+        # A fresh process: load the segments, then query
+        store = ColumnarAttendanceStore(os.path.join(tmp, "columnar"))
+        start = time.perf_counter()
+        events = len(store)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        def report_ms(first_date=None):
+            times = []
+            for class_branch, class_section in classes:
+                start = time.perf_counter()
+                store.class_report(class_branch, class_section, first_date)
+                times.append((time.perf_counter() - start) * 1000)
+            return sum(times) / len(times), max(times)
+
+        # The first query per class also finds the class's event positions
+        cold_avg, cold_max = report_ms()
+        all_avg, all_max = report_ms()
+        semester_avg, semester_max = report_ms(semester_start)
+
+        report = store.class_report(branch, section)
+        semester = store.class_report(branch, section, semester_start)
+
+        def same(result, expected):
+            days, students, arrivals = expected
+            return (dict(result['days']) == dict(days)
+                    and {roll: present for roll, (name, present) in result['students'].items()} == dict(students)
+                    and sum(count for time_str, count in result['arrivals']) == sum(arrivals.values())
+                    and len(result['arrivals']) == len(arrivals))
+
+        matches = same(report, expected) and same(semester, expected_semester)
+
+        # The recognizer appends a batch; a reader picks up only the new segment
+        today = str(date.today())
+        batch = [[f"Late {index}", f"{branch}{section}9{index:02d}", branch, section, today, "10:00:00"]
+                 for index in range(20)]
+        writer = ColumnarAttendanceStore(os.path.join(tmp, "columnar"))
+        start = time.perf_counter()
+        writer.append(batch)
+        append_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        picked_up = len(store) == events + len(batch)
+        refresh_ms = (time.perf_counter() - start) * 1000
+        csv_mb = os.path.getsize(csv_path) / 1e6
+
+        # A long session: tiered merges only ever read small files
+        session_ms = []
+        for _ in range(appends):
+            start = time.perf_counter()
+            writer.append(batch)
+            session_ms.append((time.perf_counter() - start) * 1000)
+        session_ms.sort()
+        session_seen = len(store) == events + len(batch) * (appends + 1)
+        files = len(os.listdir(os.path.join(tmp, "columnar")))
+
+        # What every COLUMNAR_COMPACT_SEGMENTS-th append used to cost: rewrite the whole history
+        start = time.perf_counter()
+        writer.compact()
+        compact_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{'Class report (' + branch + '-' + section + ')':<40} {'All history':>13} {'Semester':>13}")
+    print("-" * 70)
+    print(f"{'Python, rows already parsed':<40} {python_all_ms:>11.0f}ms {python_semester_ms:>11.0f}ms")
+    print(f"{'Python incl. CSV parse':<40} {parse_s * 1000 + python_all_ms:>11.0f}ms "
+          f"{parse_s * 1000 + python_semester_ms:>11.0f}ms")
+    print(f"{'NumPy columnar, first query per class':<40} {cold_avg:>11.1f}ms {'':>13}")
+    print(f"{'NumPy columnar (avg of all classes)':<40} {all_avg:>11.1f}ms {semester_avg:>11.1f}ms")
+    print(f"{'NumPy columnar (slowest class)':<40} {all_max:>11.1f}ms {semester_max:>11.1f}ms")
+    print("-" * 70)
+    print(f"{events:,} events over {report['days_held']:,} days | "
+          f"CSV {csv_mb:.0f} MB -> columnar {columnar_mb:.0f} MB")
+    print(f"Build from CSV: {build_s:.1f} s | load in a new process: {load_ms:.0f} ms")
+    print(f"Append a batch of {len(batch)}: {append_ms:.1f} ms | reader refresh: {refresh_ms:.1f} ms "
+          f"({'picked up' if picked_up else 'NOT picked up'})")
+    print(f"{appends} more appends (tiered merges): p50 {session_ms[len(session_ms) // 2]:.1f} ms, "
+          f"p99 {session_ms[int(len(session_ms) * 0.99)]:.1f} ms, max {session_ms[-1]:.1f} ms | "
+          f"{files} files | reader {'up to date' if session_seen else 'STALE'}")
+    print(f"Full merge of the history (python attendance_columnar.py compact, "
+          f"was inline every 32 appends): {compact_ms:.0f} ms")
+    print(f"Same counts, percentages and arrival bins as the Python loop: {'yes' if matches else 'NO'}")
+    print("=" * 70)
+
+
+def benchmark_presence(args):
+    """Absentee list and semester stats: Python over CSV rows vs per-class presence bitsets"""
+    import os
+    import tempfile
+    from datetime import date, timedelta
+    from attendance_store import CsvAttendanceStore
+    from attendance_columnar import ColumnarAttendanceStore
+    from presence_matrix import PresenceMatrixCache, absentee_report, semester_report, below_threshold
+
+    rows = int(args[0]) if args else 5000000
+    class_size = 60
+    classes = [(b, s) for b in Config.ALLOWED_BRANCHES for s in Config.ALLOWED_SECTIONS]
+    branch, section = classes[0]
+    today = str(date.today())
+    semester_start = str(date.today() - timedelta(days=120))
+
+    def roster_of(class_branch, class_section):
+        return [{'rollNo': f"{class_branch}{class_section}{index:03d}", 'name': f"Student {index}",
+                 'registered': None} for index in range(class_size)]
+
+    def python_semester(class_rows, roster, first_date):
+        """Present days, held days and absence streaks the row-by-row way"""
+        attended = {}
+        for row in class_rows:
+            if row['Date'] >= first_date:
+                attended.setdefault(row['Date'], set()).add(row['RollNo'])
+        days = sorted(attended)
+        stats = {}
+        for student in roster:
+            present = current = longest = 0
+            for day in days:
+                if student['rollNo'] in attended[day]:
+                    present += 1
+                    current = 0
+                else:
+                    current += 1
+                    longest = max(longest, current)
+            stats[student['rollNo']] = (present, len(days), current, longest)
+        return stats
+
+    print_header(f"PRESENCE MATRIX ({rows:,} marks, {class_size} students per class)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "attendance.csv")
+        synthetic_attendance(csv_path, rows, class_size=class_size)
+        source = CsvAttendanceStore(csv_path, use_index=False)
+        ColumnarAttendanceStore(os.path.join(tmp, "columnar"), source)
+        roster = roster_of(branch, section)
+
+        # Old way: read the rows, diff against the roster
+        start = time.perf_counter()
+        class_rows = list(source.iter_class(branch, section))
+        parse_s = time.perf_counter() - start
+        start = time.perf_counter()
+        present_today = {row['RollNo'] for row in class_rows if row['Date'] == today}
+        expected_absent = [student['rollNo'] for student in roster if student['rollNo'] not in present_today]
+        python_absent_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        expected = python_semester(class_rows, roster, semester_start)
+        python_semester_ms = (time.perf_counter() - start) * 1000
+
+        # Bitsets: built once per class from the columnar store, then queried
+        columnar = ColumnarAttendanceStore(os.path.join(tmp, "columnar"))
+        len(columnar)
+        cache = PresenceMatrixCache(columnar)
+        build_times = []
+        for class_branch, class_section in classes:
+            start = time.perf_counter()
+            cache.matrix(class_branch, class_section, roster_of(class_branch, class_section))
+            build_times.append((time.perf_counter() - start) * 1000)
+
+        def timed(query, repeats=50):
+            times = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                result = query()
+                times.append((time.perf_counter() - start) * 1000)
+            times.sort()
+            return result, times[len(times) // 2], times[-1]
+
+        absent, absent_p50, absent_max = timed(
+            lambda: absentee_report(cache.matrix(branch, section, roster), today))
+        semester, semester_p50, semester_max = timed(
+            lambda: semester_report(cache.matrix(branch, section, roster), semester_start))
+        low, low_p50, low_max = timed(
+            lambda: below_threshold(semester_report(cache.matrix(branch, section, roster), semester_start)))
+
+        matches = ([student['rollNo'] for student in absent['absent']] == expected_absent
+                   and all(expected[student['rollNo']] == (student['present'], student['held'],
+                                                           student['currentAbsentStreak'],
+                                                           student['longestAbsentStreak'])
+                           for student in semester['students']))
+
+        # The recognizer stores a batch; the next request marks only those bits
+        batch = [[f"Student {index}", f"{branch}{section}{index:03d}", branch, section, today, "10:00:00"]
+                 for index in range(class_size)]
+        ColumnarAttendanceStore(os.path.join(tmp, "columnar")).append(batch)
+        start = time.perf_counter()
+        after = absentee_report(cache.matrix(branch, section, roster), today)
+        incremental_ms = (time.perf_counter() - start) * 1000
+        matrix = cache.matrix(branch, section, roster)
+
+    print(f"{'Query (' + branch + '-' + section + ')':<40} {'p50':>13} {'max':>13}")
+    print("-" * 70)
+    print(f"{'Python absentees, rows already parsed':<40} {python_absent_ms:>11.1f}ms {'':>13}")
+    print(f"{'Python semester stats, rows parsed':<40} {python_semester_ms:>11.1f}ms {'':>13}")
+    print(f"{'Python incl. CSV parse':<40} {parse_s * 1000 + python_semester_ms:>11.0f}ms {'':>13}")
+    print(f"{'Bitset absentees (today)':<40} {absent_p50:>11.2f}ms {absent_max:>11.2f}ms")
+    print(f"{'Bitset semester stats':<40} {semester_p50:>11.2f}ms {semester_max:>11.2f}ms")
+    print(f"{'Bitset below ' + str(Config.ATTENDANCE_MIN_PERCENTAGE) + '%':<40} {low_p50:>11.2f}ms {low_max:>11.2f}ms")
+    print("-" * 70)
+    print(f"Matrix build per class: avg {sum(build_times) / len(build_times):.1f} ms, "
+          f"max {max(build_times):.1f} ms | {len(matrix)} days x {matrix.width} bytes "
+          f"= {matrix.bits.nbytes / 1024:.1f} KB")
+    print(f"After a batch of {len(batch)} marks: {incremental_ms:.2f} ms "
+          f"({len(after['absent'])} absent now) | {len(low)} students below threshold")
+    print(f"Same absentees, percentages and streaks as the Python loop: {'yes' if matches else 'NO'}")
+    print("=" * 70)
+
+
+def benchmark_conditional(args):
+    """Idle dashboard polls: full JSON body vs If-None-Match -> 304 Not Modified"""
+    import contextlib
+    import csv
+    import io
+    import os
+    import tempfile
+    from datetime import datetime
+
+    count = int(args[0]) if args else 10000
+    seconds_per_run = 2.0
+    students = synthetic_students(count)
+    branch, section = Config.ALLOWED_BRANCHES[0], Config.ALLOWED_SECTIONS[0]
+    endpoints = [
+        ("/api/attendance/today", f"/api/attendance/today?branch={branch}&section={section}"),
+        ("/api/class/stats", f"/api/class/stats?branch={branch}&section={section}"),
+        ("/api/classes/summary", "/api/classes/summary"),
+    ]
+
+    print_header(f"CONDITIONAL GET ({count:,} students)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.STUDENT_REGISTRY_DB = os.path.join(tmp, "student_registry.db")
+        Config.STUDENT_DB = os.path.join(tmp, "student_database.json")
+        Config.ATTENDANCE_CSV = os.path.join(tmp, "attendance.csv")
+        Config.ATTENDANCE_DIR = os.path.join(tmp, "attendance")
+
+        # A third of the students present today
+        today = str(datetime.now().date())
+        with open(Config.ATTENDANCE_CSV, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["Name", "RollNo", "Branch", "Section", "Date", "Time"])
+            for student_id, info in students[:count // 3]:
+                writer.writerow([info['name'], info['rollNo'], info['branch'], info['section'], today, "09:00:00"])
+
+        import app
+        from student_registry import get_registry
+
+        registry = get_registry()
+        registry.add_many(students)
+        client = app.app.test_client()
+
+        def poll(url, headers):
+            """(requests/second, ms per request, bytes per response)"""
+            done = 0
+            sent = 0
+            start = time.perf_counter()
+            # The endpoints log every request
+            with contextlib.redirect_stdout(io.StringIO()):
+                while time.perf_counter() - start < seconds_per_run:
+                    response = client.get(url, headers=headers)
+                    assert response.status_code in (200, 304), response.status_code
+                    sent += len(response.data)
+                    done += 1
+            elapsed = time.perf_counter() - start
+            return done / elapsed, elapsed / done * 1000, sent / done
+
+        results = {}
+        for name, url in endpoints:
+            with contextlib.redirect_stdout(io.StringIO()):
+                etag = client.get(url).headers['ETag']
+            results[name] = (poll(url, {}), poll(url, {'If-None-Match': etag}))
+
+        # A new mark changes the ETag of that class only
+        with contextlib.redirect_stdout(io.StringIO()):
+            url = endpoints[0][1]
+            etag = client.get(url).headers['ETag']
+            info = students[-1][1]
+            app.get_attendance_store().append([[info['name'], info['rollNo'], branch, section, today, "10:00:00"]])
+            changed = client.get(url, headers={'If-None-Match': etag}).status_code
+
+            # The dashboard is on another origin: If-None-Match needs a CORS preflight
+            preflight = client.options(url, headers={
+                'Origin': 'https://dashboard.example',
+                'Access-Control-Request-Method': 'GET',
+                'Access-Control-Request-Headers': 'if-none-match'
+            })
+        max_age = int(preflight.headers.get('Access-Control-Max-Age', 0))
+        registry.close()
+
+    print(f"{'Endpoint':<24} {'200 req/s':>10} {'200 bytes':>10} {'304 req/s':>10} {'304 ms':>8} {'Speedup':>8}")
+    print("-" * 74)
+    for name, url in endpoints:
+        (full_rps, full_ms, full_bytes), (cached_rps, cached_ms, cached_bytes) = results[name]
+        print(f"{name:<24} {full_rps:>10.1f} {full_bytes:>10,.0f} {cached_rps:>10.1f} {cached_ms:>8.2f} "
+              f"{cached_rps / full_rps:>7.1f}x")
+    print("-" * 74)
+    print(f"304 responses have an empty body | poll after a new mark: {changed} "
+          f"({'refreshed' if changed == 200 else 'STALE'})")
+    # Browsers cap an uncached preflight at about 5 s; the dashboard polls every 3 s
+    cached_for = max_age or 5
+    print(f"CORS preflight cached {max_age or 'not'} s (Access-Control-Max-Age): "
+          f"{3600 / max(cached_for, 3):.0f} OPTIONS requests per idle dashboard hour "
+          f"(vs {3600 / 5:.0f} uncached)")
+    print("=" * 74)
+
+
+def benchmark_stream(args):
+    """Mark delivery to many dashboards: polling /api/attendance/today vs the SSE stream"""
+    import contextlib
+    import csv
+    import io
+    import logging
+    import os
+    import socket
+    import tempfile
+    import threading
+    from datetime import datetime
+    from werkzeug.serving import make_server
+
+    subscribers = int(args[0]) if args else 300
+    idle_seconds = 5.0
+    branch, section = Config.ALLOWED_BRANCHES[0], Config.ALLOWED_SECTIONS[0]
+    students = [(sid, info) for sid, info in synthetic_students(720)
+                if info['branch'] == branch and info['section'] == section]
+    today = str(datetime.now().date())
+
+    print_header(f"LIVE ATTENDANCE STREAM ({subscribers} dashboards on {branch}-{section})")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.STUDENT_REGISTRY_DB = os.path.join(tmp, "student_registry.db")
+        Config.STUDENT_DB = os.path.join(tmp, "student_database.json")
+        Config.ATTENDANCE_CSV = os.path.join(tmp, "attendance.csv")
+        Config.ATTENDANCE_DIR = os.path.join(tmp, "attendance")
+        Config.SSE_MAX_SUBSCRIBERS = max(Config.SSE_MAX_SUBSCRIBERS, subscribers)
+
+        # Half the class already marked
+        with open(Config.ATTENDANCE_CSV, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["Name", "RollNo", "Branch", "Section", "Date", "Time"])
+            for student_id, info in students[:len(students) // 2]:
+                writer.writerow([info['name'], info['rollNo'], branch, section, today, "09:00:00"])
+
+        import app
+        from student_registry import get_registry
+        registry = get_registry()
+        registry.add_many(students)
+        store = app.get_attendance_store()
+
+        # What a poll costs the server
+        client = app.app.test_client()
+        url = f"/api/attendance/today?branch={branch}&section={section}"
+        with contextlib.redirect_stdout(io.StringIO()):
+            client.get(url)
+            start = time.perf_counter()
+            for _ in range(200):
+                client.get(url)
+        poll_ms = (time.perf_counter() - start) / 200 * 1000
+
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        server = make_server('127.0.0.1', 0, app.app, threaded=True)
+        port = server.server_port
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        def connect():
+            sock = socket.create_connection(('127.0.0.1', port))
+            sock.sendall(f"GET /api/attendance/stream?branch={branch}&section={section} HTTP/1.1\r\n"
+                         f"Host: localhost\r\n\r\n".encode())
+            sock.settimeout(10)
+            buffer = b""
+            while b"event: snapshot" not in buffer:
+                buffer += sock.recv(65536)
+            return sock
+
+        start = time.perf_counter()
+        socks = [connect() for _ in range(subscribers)]
+        connect_s = time.perf_counter() - start
+
+        # Idle: nothing is marked
+        cpu = time.process_time()
+        time.sleep(idle_seconds)
+        idle_cpu = (time.process_time() - cpu) / idle_seconds * 100
+
+        latencies = []
+        for number in range(5):
+            info = students[len(students) // 2 + number][1]
+            start = time.perf_counter()
+            store.append([[info['name'], info['rollNo'], branch, section, today, "10:00:00"]])
+            for sock in socks:
+                buffer = b""
+                while b"event: mark" not in buffer:
+                    buffer += sock.recv(65536)
+                latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.3)
+
+        for sock in socks:
+            sock.close()
+        server.shutdown()
+        registry.close()
+
+    latencies.sort()
+    print(f"{'Polling every 3 s':<34} {subscribers / 3:>8.0f} requests/s x {poll_ms:.2f} ms "
+          f"= {subscribers / 3 * poll_ms / 10:.0f}% of a CPU; marks seen 1.5 s late on average")
+    print(f"{'SSE stream':<34} {1 / Config.SSE_CHECK_INTERVAL:>8.0f} checks/s for the class, "
+          f"idle CPU {idle_cpu:.1f}%")
+    print("-" * 70)
+    print(f"Mark -> all {subscribers} dashboards: p50 {latencies[len(latencies) // 2]:.0f} ms, "
+          f"max {latencies[-1]:.0f} ms (check interval {Config.SSE_CHECK_INTERVAL * 1000:.0f} ms)")
+    print(f"Opening {subscribers} streams: {connect_s:.1f} s")
+    print("=" * 70)
+
+
+def benchmark_ipc(args):
+    """Mark-to-dashboard latency: attendance files vs the recognizer -> API socket"""
+    import csv
+    import logging
+    import os
+    import socket
+    import tempfile
+    import threading
+    from datetime import datetime
+    from werkzeug.serving import make_server
+
+    marks = int(args[0]) if args else 100
+    dashboards = 20
+    polling_interval_s = 3.0  # faculty_dashboard.html CONFIG.POLLING_INTERVAL
+    branch, section = Config.ALLOWED_BRANCHES[0], Config.ALLOWED_SECTIONS[0]
+    students = [(sid, info) for sid, info in synthetic_students(12 * 2 * marks + 720)
+                if info['branch'] == branch and info['section'] == section]
+    today = str(datetime.now().date())
+
+    print_header(f"RECOGNIZER -> DASHBOARD LATENCY ({marks} marks per path, {dashboards} dashboards)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.STUDENT_REGISTRY_DB = os.path.join(tmp, "student_registry.db")
+        Config.STUDENT_DB = os.path.join(tmp, "student_database.json")
+        Config.ATTENDANCE_CSV = os.path.join(tmp, "attendance.csv")
+        Config.ATTENDANCE_DIR = os.path.join(tmp, "attendance")
+        Config.IPC_SOCKET = os.path.join(tmp, "attendance.sock")
+        Config.IPC_KEY_FILE = os.path.join(tmp, "attendance_ipc.key")
+
+        with open(Config.ATTENDANCE_CSV, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerow(["Name", "RollNo", "Branch", "Section", "Date", "Time"])
+
+        import app
+        from attendance_ipc import MarkPublisher
+        from student_registry import get_registry
+        registry = get_registry()
+        registry.add_many(students)
+        store = app.get_attendance_store()
+
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        server = make_server('127.0.0.1', 0, app.app, threaded=True)
+        port = server.server_port
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        def connect():
+            sock = socket.create_connection(('127.0.0.1', port))
+            sock.sendall(f"GET /api/attendance/stream?branch={branch}&section={section} HTTP/1.1\r\n"
+                         f"Host: localhost\r\n\r\n".encode())
+            sock.settimeout(10)
+            buffer = b""
+            while b"event: snapshot" not in buffer:
+                buffer += sock.recv(65536)
+            return sock
+
+        rows = iter([[info['name'], info['rollNo'], branch, section, today, "10:00:00"]
+                     for sid, info in students])
+        # The class's first mark starts its day (a snapshot); time the ones after it
+        store.append([next(rows)])
+        socks = [connect() for _ in range(dashboards)]
+
+        def delivered(mark):
+            """ms until every dashboard has the mark, after mark() returns its start time"""
+            start = mark()
+            for sock in socks:
+                buffer = b""
+                while b"event: mark" not in buffer:
+                    buffer += sock.recv(65536)
+            return (time.perf_counter() - start) * 1000
+
+        def percentiles(times):
+            times = sorted(times)
+            return times[len(times) // 2], times[int(len(times) * 0.99)], times[-1]
+
+        # Files only: the recognizer's batch write is tailed by the API
+        def file_mark():
+            row = next(rows)
+            start = time.perf_counter()
+            store.append([row])
+            return start
+
+        file_ms = [delivered(file_mark) for _ in range(marks)]
+
+        # Socket: the mark is pushed as it is made (the batch write follows later)
+        app.recognizer_channel.start()
+        publisher = MarkPublisher(branch, section)
+        publish_us = []
+
+        def ipc_mark():
+            row = next(rows)
+            start = time.perf_counter()
+            publisher.publish_marks([row])
+            publish_us.append((time.perf_counter() - start) * 1e6)
+            return start
+
+        ipc_ms = [delivered(ipc_mark) for _ in range(marks)]
+        delivered_over_socket = publisher.sent
+
+        # API down: what publishing costs the recognizer then
+        app.recognizer_channel.stop()
+        publisher.close()
+        os.remove(Config.IPC_KEY_FILE)
+        start = time.perf_counter()
+        for _ in range(1000):
+            publisher.publish_marks([["x"] * 6])
+        down_us = (time.perf_counter() - start) * 1e6 / 1000
+
+        for sock in socks:
+            sock.close()
+        server.shutdown()
+        registry.close()
+
+    batch_s = Config.BATCH_WRITE_INTERVAL / Config.DISPLAY_TARGET_FPS
+    file_p50, file_p99, file_max = percentiles(file_ms)
+    ipc_p50, ipc_p99, ipc_max = percentiles(ipc_ms)
+    publish_p50, publish_p99, _ = percentiles(publish_us)
+    print(f"{'Path':<44} {'p50':>8} {'p99':>8} {'max':>8}")
+    print("-" * 70)
+    print(f"{'Polling (batch write + 3 s poll), expected':<44} "
+          f"{(batch_s / 2 + polling_interval_s / 2) * 1000:>6.0f}ms {(batch_s + polling_interval_s) * 1000:>6.0f}ms {'':>8}")
+    print(f"{'SSE, file tailed (after the batch write)':<44} {file_p50:>6.1f}ms {file_p99:>6.1f}ms {file_max:>6.1f}ms")
+    print(f"{'SSE, pushed over the socket':<44} {ipc_p50:>6.1f}ms {ipc_p99:>6.1f}ms {ipc_max:>6.1f}ms")
+    print("-" * 70)
+    print(f"The file path also waits for the batch write: up to {batch_s * 1000:.0f} ms "
+          f"({Config.BATCH_WRITE_INTERVAL} frames at {Config.DISPLAY_TARGET_FPS} FPS)")
+    print(f"publish_marks() in the recognizer: {publish_p50:.0f} us p50, {publish_p99:.0f} us p99; "
+          f"{down_us:.1f} us with the API down")
+    print(f"Marks delivered over the socket: {delivered_over_socket}/{marks}")
+    print("=" * 70)
+
+
+def benchmark_api(args):
+    """Requests/second of the student endpoints with and without the registry cache"""
+    import contextlib
+    import csv
+    import io
+    import os
+    import tempfile
+    from datetime import datetime
+
+    count = int(args[0]) if args else 10000
+    seconds_per_run = 2.0
+    students = synthetic_students(count)
+    branch, section = Config.ALLOWED_BRANCHES[0], Config.ALLOWED_SECTIONS[0]
+    endpoints = [
+        ("/", "/"),
+        ("/api/attendance/today", f"/api/attendance/today?branch={branch}&section={section}"),
+        ("/api/class/stats", f"/api/class/stats?branch={branch}&section={section}"),
+        ("/api/classes/summary", "/api/classes/summary"),
+    ]
+
+    print_header(f"API REGISTRY CACHE ({count:,} students)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.STUDENT_REGISTRY_DB = os.path.join(tmp, "student_registry.db")
+        Config.STUDENT_DB = os.path.join(tmp, "student_database.json")
+        Config.ATTENDANCE_CSV = os.path.join(tmp, "attendance.csv")
+        Config.ATTENDANCE_DIR = os.path.join(tmp, "attendance")
+
+        # A third of the class present today
+        today = str(datetime.now().date())
+        with open(Config.ATTENDANCE_CSV, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["Name", "RollNo", "Branch", "Section", "Date", "Time"])
+            for student_id, info in students[:count // 3]:
+                writer.writerow([info['name'], info['rollNo'], info['branch'], info['section'], today, "09:00:00"])
+
+        import app
+        from registry_cache import RegistryCache
+        from student_registry import get_registry
+
+        registry = get_registry()
+        registry.add_many(students)
+        client = app.app.test_client()
+
+        def requests_per_second(url):
+            done = 0
+            start = time.perf_counter()
+            # The endpoints log every request
+            with contextlib.redirect_stdout(io.StringIO()):
+                while time.perf_counter() - start < seconds_per_run:
+                    response = client.get(url)
+                    assert response.status_code == 200, response.status_code
+                    done += 1
+            elapsed = time.perf_counter() - start
+            return done / elapsed, elapsed / done * 1000
+
+        results = {}
+        for mode, enabled in (("reload", False), ("cached", True)):
+            app.registry_cache = RegistryCache(registry, enabled=enabled)
+            for name, url in endpoints:
+                results[(mode, name)] = requests_per_second(url)
+        cache_stats = app.registry_cache.summary()
+
+        # A write from another process is picked up by the next request
+        registry.update_images({students[0][0]: (50, "dataset/x")})
+        before = cache_stats['reloads']
+        client.get("/")
+        reloaded = app.registry_cache.summary()['reloads'] - before
+        registry.close()
+
+    print(f"{'Endpoint':<24} {'Reload req/s':>13} {'Cached req/s':>13} {'Cached ms':>10} {'Speedup':>9}")
+    print("-" * 70)
+    for name, url in endpoints:
+        reload_rps, _ = results[("reload", name)]
+        cached_rps, cached_ms = results[("cached", name)]
+        print(f"{name:<24} {reload_rps:>13.1f} {cached_rps:>13.1f} {cached_ms:>10.2f} {cached_rps / reload_rps:>8.1f}x")
+    print("-" * 70)
+    print("Reload = read every student per request (what load_student_database() did)")
+    print(f"Cache: {cache_stats['hits']} hits, {cache_stats['reloads']} reloads")
+    print(f"Registry write picked up on the next request: {'yes' if reloaded == 1 else 'NO'}")
+    print("=" * 70)
+
+
+def benchmark_search(args):
+    """p50/p99 latency of StudentSearchIndex vs scanning every student"""
+    import contextlib
+    import io
+    import os
+    import tempfile
+    from student_search import StudentSearchIndex
+
+    count = int(args[0]) if args else 100000
+    queries_per_kind = 300
+    rng = random.Random(4)
+
+    # Real-looking names so prefixes and typos behave like a college roster
+    first_names = ["Aarav", "Aditi", "Akash", "Ananya", "Arjun", "Bhavya", "Deepak", "Divya",
+                   "Gaurav", "Harini", "Ishaan", "Jyothi", "Karthik", "Kavya", "Lakshmi", "Manoj",
+                   "Meera", "Nikhil", "Pooja", "Pranav", "Rahul", "Ravi", "Sai", "Sneha",
+                   "Suresh", "Swathi", "Tarun", "Varun", "Vidya", "Yash"]
+    surnames = ["Agarwal", "Bhat", "Chowdary", "Das", "Gupta", "Iyer", "Joshi", "Kumar",
+                "Mehta", "Naidu", "Nair", "Patel", "Rao", "Reddy", "Shah", "Sharma",
+                "Singh", "Varma", "Verma", "Yadav"]
+    students = synthetic_students(count)
+    for student_id, info in students:
+        info['name'] = f"{rng.choice(first_names)} {rng.choice(surnames)}"
+    by_id = dict(students)
+
+    def typo(text):
+        position = rng.randrange(1, len(text) - 1)
+        return text[:position] + text[position + 1:]
+
+    picks = [rng.choice(students)[1] for _ in range(queries_per_kind)]
+    query_sets = [
+        ("Name prefix", [info['name'][:rng.randint(2, 6)] for info in picks]),
+        ("Surname prefix", [info['name'].split()[1][:rng.randint(2, 5)] for info in picks]),
+        ("Roll number prefix", [info['rollNo'][:rng.randint(6, 10)] for info in picks]),
+        ("Typo (letter dropped)", [typo(info['name']) for info in picks]),
+    ]
+
+    def percentiles(times):
+        times = sorted(times)
+        return times[len(times) // 2] * 1000, times[int(len(times) * 0.99)] * 1000
+
+    def timed(fn, queries):
+        times = []
+        for query in queries:
+            start = time.perf_counter()
+            fn(query)
+            times.append(time.perf_counter() - start)
+        return percentiles(times)
+
+    # Old manage_students.search_student: lowercase and substring-scan everyone
+    def scan(query):
+        query = query.lower()
+        return [info for info in by_id.values()
+                if query in info['name'].lower() or query in info['rollNo'].lower()]
+
+    print_header(f"STUDENT SEARCH ({count:,} students)")
+
+    start = time.perf_counter()
+    index = StudentSearchIndex(by_id)
+    build_s = time.perf_counter() - start
+
+    page = Config.SEARCH_PAGE_SIZE
+    results = {}
+    for name, queries in query_sets:
+        results[(name, "scan")] = timed(scan, queries)
+        results[(name, "index")] = timed(lambda q: index.search(q, 0, page), queries)
+
+    # Typo queries: did the intended student come back on the first page?
+    found = 0
+    for info, query in zip(picks, query_sets[3][1]):
+        page_ids = [student_id for student_id, match, score in index.search(query, 0, page)[0]]
+        found += any(by_id[student_id]['name'] == info['name'] for student_id in page_ids)
+
+    # Incremental updates
+    newcomers = [(f"late_joiner_{i}", {'name': f"{rng.choice(first_names)} {rng.choice(surnames)}",
+                                       'rollNo': f"CSEA9{i:05d}", 'branch': "CSE", 'section': "A"})
+                 for i in range(1000)]
+    start = time.perf_counter()
+    for student_id, info in newcomers:
+        index.add(student_id, info)
+    add_us = (time.perf_counter() - start) / len(newcomers) * 1e6
+    start = time.perf_counter()
+    for student_id, info in newcomers:
+        index.remove(student_id)
+    remove_us = (time.perf_counter() - start) / len(newcomers) * 1e6
+
+    # End to end through the API, incl. the registry version check
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.STUDENT_REGISTRY_DB = os.path.join(tmp, "student_registry.db")
+        Config.STUDENT_DB = os.path.join(tmp, "student_database.json")
+        Config.ATTENDANCE_CSV = os.path.join(tmp, "attendance.csv")
+        Config.ATTENDANCE_DIR = os.path.join(tmp, "attendance")
+
+        import app
+        from registry_cache import RegistryCache
+        from student_registry import get_registry
+
+        registry = get_registry()
+        registry.add_many(students)
+        app.registry_cache = RegistryCache(registry)
+        client = app.app.test_client()
+
+        start = time.perf_counter()
+        client.get("/api/students/search?q=a")
+        first_ms = (time.perf_counter() - start) * 1000
+
+        api_queries = [query for name, queries in query_sets for query in queries[:100]]
+        times = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for query in api_queries:
+                start = time.perf_counter()
+                response = client.get("/api/students/search", query_string={'q': query})
+                times.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.status_code
+        api_p50, api_p99 = percentiles(times)
+
+        # A registration is picked up with an index diff, not a rebuild
+        registry.add(*newcomers[0])
+        start = time.perf_counter()
+        response = client.get("/api/students/search", query_string={'q': newcomers[0][1]['rollNo']})
+        refresh_ms = (time.perf_counter() - start) * 1000
+        new_found = response.get_json()['data']['results'][0]['studentId'] == newcomers[0][0]
+        registry.close()
+
+    print(f"{'Query':<24} {'Scan p50':>10} {'Scan p99':>10} {'Index p50':>10} {'Index p99':>10}")
+    print("-" * 70)
+    for name, queries in query_sets:
+        scan_p50, scan_p99 = results[(name, "scan")]
+        index_p50, index_p99 = results[(name, "index")]
+        print(f"{name:<24} {scan_p50:>8.2f}ms {scan_p99:>8.2f}ms {index_p50:>8.3f}ms {index_p99:>8.3f}ms")
+    print("-" * 70)
+    print(f"Index build: {build_s:.2f} s ({len(index.words):,} distinct name words)")
+    print(f"Typo queries with the student on page 1: {found}/{len(picks)} (the scan finds none)")
+    print(f"Incremental add: {add_us:.1f} µs, remove: {remove_us:.1f} µs per student")
+    print(f"/api/students/search: p50 {api_p50:.2f} ms, p99 {api_p99:.2f} ms "
+          f"({len(api_queries)} queries, page of {page})")
+    print(f"First API search (snapshot + index build): {first_ms:.0f} ms")
+    print(f"After a registration: {refresh_ms:.0f} ms (snapshot reload + index diff), "
+          f"new student found: {'yes' if new_found else 'NO'}")
+    print("=" * 70)
+
+
+BENCHMARKS = {
+    'api': benchmark_api,
+    'attendance': benchmark_attendance,
+    'attendance_index': benchmark_attendance_index,
+    'cache': benchmark_cache,
+    'columnar': benchmark_columnar,
+    'conditional': benchmark_conditional,
+    'csv_import': benchmark_csv_import,
+    'detectors': benchmark_detectors,
+    'ipc': benchmark_ipc,
+    'presence': benchmark_presence,
+    'prune': benchmark_prune,
+    'quality': benchmark_quality,
+    'recognizers': benchmark_recognizers,
+    'registry': benchmark_registry,
+    'search': benchmark_search,
+    'validation': benchmark_validation,
+    'scheduler': benchmark_scheduler,
+    'writer': benchmark_writer,
+    'stream': benchmark_stream,
+    'streaming': benchmark_streaming,
+    'today': benchmark_today,
+}
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print("Usage: python benchmark.py <name> [options]")
+        print(f"Available: {', '.join(sorted(BENCHMARKS))}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    BENCHMARKS[sys.argv[1]](sys.argv[2:])
+    print(f"Completed in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
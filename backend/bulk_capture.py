@@ -1,20 +1,13 @@
 import cv2
 import os
-import json
 from datetime import datetime
 import time
-
-STUDENT_DB = "student_database.json"
-
-def load_student_database():
-    if os.path.exists(STUDENT_DB):
-        with open(STUDENT_DB, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
-
-def save_student_database(db):
-    with open(STUDENT_DB, 'w', encoding='utf-8') as f:
-        json.dump(db, indent=4, fp=f)
+from config import Config
+from face_detectors import create_face_detector, DetectorError
+from capture_quality import QualityGate, REJECT_REASONS
+from async_writer import AsyncImageWriter
+from group_capture import group_enroll_class
+from student_registry import get_registry, RegistryError
 
 def get_next_roll_number(branch, section, existing_count):
     """Generate sequential roll numbers"""
@@ -50,6 +43,14 @@ def bulk_capture_class():
             section = "A" if choice == "1" else "B"
             break
     
+    # Students already imported from CSV can be captured several at a time
+    print("\n🎬 Capture Mode:")
+    print("  1. One student at a time")
+    print("  2. Group enrollment (students imported with csv_import.py)")
+    if input("\nChoose mode (1-2) [1]: ").strip() == '2':
+        group_enroll_class(branch, section)
+        return
+    
     # Get number of students
     print(f"\n👥 How many students in {branch}-{section}?")
     while True:
@@ -62,11 +63,8 @@ def bulk_capture_class():
         print("❌ Please enter a valid number!")
     
     # Check existing students
-    db = load_student_database()
-    existing_students = [
-        info for info in db.values()
-        if info.get('branch') == branch and info.get('section') == section
-    ]
+    registry = get_registry()
+    existing_students = registry.by_class(branch, section)
     
     if existing_students:
         print(f"\n⚠️  Found {len(existing_students)} existing students in {branch}-{section}")
@@ -107,11 +105,15 @@ def bulk_capture_class():
     cam.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
     cam.set(cv2.CAP_PROP_FPS, 30)
     
-    face_cascade = cv2.CascadeClassifier(
-        cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-    )
+    try:
+        face_detector = create_face_detector(min_size=(120, 120))
+    except DetectorError as e:
+        print(f"❌ Error loading face detector: {e}")
+        cam.release()
+        return
     
     students_captured = start_from
+    writer = AsyncImageWriter()
     
     try:
         for student_num in range(start_from + 1, total_students + 1):
@@ -137,16 +139,15 @@ def bulk_capture_class():
             
             # Check for duplicates
             student_id = name.lower().replace(" ", "_")
-            if student_id in db:
+            if registry.exists(student_id):
                 print(f"⚠️  Student '{name}' exists! Using: {name}_{student_num}")
                 student_id = f"{student_id}_{student_num}"
             
             # Check duplicate roll number
-            for sid, info in db.items():
-                if info.get('rollNo') == roll_no and sid != student_id:
-                    print(f"⚠️  Roll {roll_no} exists! Adding suffix...")
-                    roll_no = f"{roll_no}_{student_num}"
-                    break
+            match = registry.find_by_roll(roll_no)
+            if match and match[0] != student_id:
+                print(f"⚠️  Roll {roll_no} exists! Adding suffix...")
+                roll_no = f"{roll_no}_{student_num}"
             
             print(f"\n✅ Capturing: {name} ({roll_no})")
             print("⏱️  Get ready... Starting in 3 seconds...")
@@ -160,7 +161,9 @@ def bulk_capture_class():
             required_images = 50
             saved_count = 0
             detect_counter = 0
-            frame_skip = 2
+            gate = QualityGate()
+            failed_before = len(writer.failed)
+            frame_skip = 1 if gate.enabled else 2
             
             print(f"📸 Capturing {required_images} images...")
             
@@ -173,21 +176,22 @@ def bulk_capture_class():
                 frame = cv2.flip(frame, 1)
                 gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
                 
-                faces = face_cascade.detectMultiScale(
-                    gray, 
-                    scaleFactor=1.2, 
-                    minNeighbors=5,
-                    minSize=(120, 120)
-                )
+                faces = face_detector.detect(gray, frame)
                 
                 for (x, y, w, h) in faces:
                     detect_counter += 1
                     
                     if detect_counter % frame_skip == 0 and saved_count < required_images:
                         face = gray[y:y+h, x:x+w]
+                        accepted, reason = gate.evaluate(face)
+                        if not accepted:
+                            cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 165, 255), 2)
+                            cv2.putText(frame, REJECT_REASONS[reason], (x, y-10),
+                                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 165, 255), 2)
+                            continue
                         saved_count += 1
                         filename = f"{dataset_path}/{saved_count}.jpg"
-                        cv2.imwrite(filename, face)
+                        writer.write(filename, face)
                         
                         cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 3)
                         cv2.putText(frame, "✓ CAPTURED!", (x, y-10),
@@ -221,20 +225,31 @@ def bulk_capture_class():
                             break
                     break
             
-            if saved_count >= 30:  # Minimum 30 images required
+            print(f"🎯 Capture quality: {gate.summary()}")
+            
+            # Images must be on disk before the student is registered
+            writer.flush()
+            failed = len(writer.failed) - failed_before
+            if failed:
+                print(f"⚠️  {failed} images could not be written to {dataset_path}")
+                saved_count -= failed
+            
+            if saved_count >= Config.MIN_IMAGES_PER_STUDENT:  # Enough images to enroll
                 # Save to database
-                db[student_id] = {
-                    "name": name,
-                    "rollNo": roll_no,
-                    "branch": branch,
-                    "section": section,
-                    "imagesCount": saved_count,
-                    "registeredDate": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "datasetPath": dataset_path
-                }
-                save_student_database(db)
-                students_captured += 1
-                print(f"✅ Saved: {name} ({saved_count} images)")
+                try:
+                    registry.add(student_id, {
+                        "name": name,
+                        "rollNo": roll_no,
+                        "branch": branch,
+                        "section": section,
+                        "imagesCount": saved_count,
+                        "registeredDate": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        "datasetPath": dataset_path
+                    })
+                    students_captured += 1
+                    print(f"✅ Saved: {name} ({saved_count} images)")
+                except RegistryError as e:
+                    print(f"❌ {e} - student not saved (images kept in {dataset_path})")
             else:
                 print(f"❌ Insufficient images ({saved_count}). Student not saved.")
             
@@ -254,13 +269,15 @@ def bulk_capture_class():
     finally:
         cam.release()
         cv2.destroyAllWindows()
+        writer.close()
         
         print("\n" + "=" * 70)
         print("✅ BULK CAPTURE SESSION COMPLETED")
         print("=" * 70)
         print(f"Class: {branch}-{section}")
         print(f"Students captured: {students_captured} / {total_students}")
-        print(f"Database file: {STUDENT_DB}")
+        print(f"Image writer: {writer.summary()}")
+        print(f"Database file: {Config.STUDENT_REGISTRY_DB}")
         print("\n📝 NEXT STEPS:")
         print("  1. Review captured students: python manage_students.py")
         print("  2. Train the model: python train_model.py")
@@ -0,0 +1,106 @@
+"""
+Smart Attendance System - Capture Quality Gate
+Scores candidate face crops and keeps only the ones worth saving
+"""
+
+import cv2
+from config import Config
+from face_utils import NearDuplicateFilter
+
+# Crops are resized to this before measuring sharpness, so the score does
+# not depend on how far the student sits from the camera
+SHARPNESS_SIZE = (100, 100)
+
+REJECT_REASONS = {
+    'too_dark': "TOO DARK - improve lighting",
+    'too_bright': "TOO BRIGHT - avoid direct light",
+    'blurry': "BLURRY - hold still",
+    'duplicate': "SIMILAR - move slightly"
+}
+
+
+def sharpness(gray_face):
+    """Variance of the Laplacian (higher = sharper)"""
+    small = cv2.resize(gray_face, SHARPNESS_SIZE, interpolation=cv2.INTER_AREA)
+    return float(cv2.Laplacian(small, cv2.CV_64F).var())
+
+
+def brightness(gray_face):
+    """Mean pixel value (0-255)"""
+    return float(gray_face.mean())
+
+
+class QualityGate:
+    """
+    Decides whether a captured face crop adds value to the enrollment set
+
+    Checks, cheapest first: brightness, sharpness and pose diversity
+    (not a near-duplicate of a crop already saved). Face size is left to
+    the detector (Config.FACE_DETECTION_MIN_SIZE), which never returns
+    smaller faces. With enabled=False only the diversity check
+    (Config.DEDUP_ENABLED) runs.
+    Keeps per-session counters for every rejection reason.
+    """
+
+    def __init__(self, enabled=None, brightness_range=None, min_sharpness=None, dedup=None):
+        self.enabled = Config.QUALITY_GATE_ENABLED if enabled is None else enabled
+        self.brightness_range = brightness_range or Config.QUALITY_BRIGHTNESS_RANGE
+        self.min_sharpness = Config.QUALITY_MIN_SHARPNESS if min_sharpness is None else min_sharpness
+        if dedup is None and Config.DEDUP_ENABLED:
+            dedup = NearDuplicateFilter(Config.DEDUP_MAX_DISTANCE, Config.DEDUP_HASH_SIZE)
+        self.dedup = dedup
+
+        self.candidates = 0
+        self.accepted = 0
+        self.rejected = {reason: 0 for reason in REJECT_REASONS}
+
+    def _reject_reason(self, gray_face):
+        if self.enabled:
+            low, high = self.brightness_range
+            level = brightness(gray_face)
+            if level < low:
+                return 'too_dark', None
+            if level > high:
+                return 'too_bright', None
+
+            if sharpness(gray_face) < self.min_sharpness:
+                return 'blurry', None
+
+        if self.dedup is not None:
+            is_duplicate, face_hash = self.dedup.check(gray_face)
+            if is_duplicate:
+                return 'duplicate', None
+            return None, face_hash
+
+        return None, None
+
+    def evaluate(self, gray_face):
+        """
+        Score a candidate crop; accepted crops are remembered for diversity
+
+        Returns:
+            (accepted, reason) - reason is None when accepted
+        """
+        self.candidates += 1
+        reason, face_hash = self._reject_reason(gray_face)
+
+        if reason:
+            self.rejected[reason] += 1
+            return False, reason
+
+        if face_hash is not None:
+            self.dedup.add(face_hash)
+        self.accepted += 1
+        return True, None
+
+    @property
+    def acceptance_rate(self):
+        return self.accepted / self.candidates * 100 if self.candidates else 0.0
+
+    def summary(self):
+        """One-line session stats"""
+        text = f"{self.accepted}/{self.candidates} candidates kept ({self.acceptance_rate:.0f}%)"
+        rejected = [f"{reason.replace('_', ' ')} {count}" for reason, count in self.rejected.items() if count]
+        if rejected:
+            text += " - rejected: " + ", ".join(rejected)
+        return text
@@ -14,11 +14,16 @@ class Config:
     TRAINER_PATH = os.path.join(BASE_DIR, "trainer")
     BACKUP_PATH = os.path.join(BASE_DIR, "backups")
     LOGS_PATH = os.path.join(BASE_DIR, "logs")
+    MODELS_PATH = os.path.join(BASE_DIR, "models")
     
     # ==================== FILES ====================
-    STUDENT_DB = os.path.join(BASE_DIR, "student_database.json")
-    ATTENDANCE_CSV = os.path.join(BASE_DIR, "attendance.csv")
+    STUDENT_REGISTRY_DB = os.path.join(BASE_DIR, "student_registry.db")
+    STUDENT_DB = os.path.join(BASE_DIR, "student_database.json")  # Legacy; migrated into the registry once
+    ATTENDANCE_CSV = os.path.join(BASE_DIR, "attendance.csv")  # "csv" storage; migration source for "partitioned"
+    ATTENDANCE_DIR = os.path.join(BASE_DIR, "attendance")  # "partitioned" storage
+    ATTENDANCE_COLUMNAR_DIR = os.path.join(BASE_DIR, "attendance_columnar")
     TRAINER_MODEL = os.path.join(TRAINER_PATH, "trainer.yml")
+    TRAINING_JOBS_FILE = os.path.join(TRAINER_PATH, "training_jobs.json")
     
     # ==================== ACADEMICS ====================
     ALLOWED_BRANCHES = ["CSE", "AIML", "ECE", "EEE", "MECH", "CIVIL"]
@@ -28,16 +33,156 @@ class Config:
     # Confidence threshold (lower = stricter, higher = more lenient)
     RECOGNITION_CONFIDENCE_THRESHOLD = 75
     
+    # Face detector backend: "haar_default", "haar_alt2", "lbp" or "yunet"
+    FACE_DETECTOR_BACKEND = "haar_default"
+    
+    # Model files for the non-bundled backends
+    LBP_CASCADE_PATH = os.path.join(MODELS_PATH, "lbpcascade_frontalface_improved.xml")
+    YUNET_MODEL_PATH = os.path.join(MODELS_PATH, "face_detection_yunet_2023mar.onnx")
+    YUNET_SCORE_THRESHOLD = 0.8
+    YUNET_NMS_THRESHOLD = 0.3
+    YUNET_TOP_K = 100
+    
     # Face detection parameters
     FACE_DETECTION_SCALE_FACTOR = 1.2
     FACE_DETECTION_MIN_NEIGHBORS = 5
     FACE_DETECTION_MIN_SIZE = (100, 100)
     
+    # Recognizer backend: "lbph", "eigen" (Eigenfaces) or "fisher" (Fisherfaces)
+    RECOGNIZER_BACKEND = "lbph"
+    
+    # Per-backend thresholds (confidence is a distance - lower = better match)
+    # Eigen/Fisher distances live on a different scale; tune with
+    # python benchmark.py recognizers
+    RECOGNIZER_THRESHOLDS = {
+        "lbph": RECOGNITION_CONFIDENCE_THRESHOLD,
+        "eigen": 4000,
+        "fisher": 800
+    }
+    
+    # Eigen/Fisher need every face at one size
+    RECOGNIZER_FACE_SIZE = (100, 100)
+    EIGEN_NUM_COMPONENTS = 80
+    FISHER_NUM_COMPONENTS = 0  # 0 = number of students - 1
+    
+    # Background training jobs (API)
+    TRAINING_JOBS_HISTORY_LIMIT = 50
+    
+    # LBPH datasets at least this large are trained in streaming mode
+    # (histograms go to disk instead of keeping every image in memory)
+    TRAINING_STREAMING_MIN_IMAGES = 20000
+    
+    # Reload retrained models during a running recognition session
+    MODEL_HOT_RELOAD_ENABLED = True
+    MODEL_RELOAD_POLL_SECONDS = 2
+    
+    # Face tracking (associate detections across frames)
+    FACE_TRACK_IOU_THRESHOLD = 0.3
+    FACE_TRACK_MAX_MISSED = 5
+    
+    # Recognition scheduling
+    # Per-frame time budget for recognizer.predict calls (milliseconds)
+    RECOGNITION_FRAME_BUDGET_MS = 40
+    # Starting estimate for one predict call until real timings arrive
+    RECOGNITION_INITIAL_COST_MS = 10
+    # Age after which a face counts as fully stale (seconds)
+    RECOGNITION_STALENESS_CAP_SECONDS = 3.0
+    # Priority weights (higher = matters more)
+    RECOGNITION_PRIORITY_WEIGHTS = {
+        "unmarked": 4.0,
+        "size": 1.0,
+        "staleness": 2.0,
+        "confidence": 1.0
+    }
+    
+    # Prediction cache (reuse results for near-identical face crops)
+    PREDICTION_CACHE_ENABLED = True
+    PREDICTION_CACHE_SIZE = 256
+    PREDICTION_CACHE_TTL_SECONDS = 2.0
+    PREDICTION_CACHE_MAX_DISTANCE = 4  # Max differing dHash bits
+    PREDICTION_CACHE_POSITION_BUCKET = 80  # Pixels
+    
     # Image capture settings
     REQUIRED_IMAGES_PER_STUDENT = 50
+    MIN_IMAGES_PER_STUDENT = 30  # Fewer images = student not enrolled
     IMAGE_CAPTURE_FRAME_SKIP = 2  # Capture every 2nd detected face
     
+    # Near-duplicate filtering (capture time and prune_dataset.py)
+    DEDUP_ENABLED = True
+    DEDUP_MAX_DISTANCE = 5  # Max differing dHash bits for "same frame"
+    DEDUP_HASH_SIZE = 8
+    PRUNE_MIN_IMAGES = MIN_IMAGES_PER_STUDENT  # Pruning never leaves a student with fewer images
+    PRUNED_IMAGES_PATH = os.path.join(BACKUP_PATH, "pruned")
+    
+    # Capture quality gate (face_capture.py / bulk_capture.py)
+    # When enabled every detection is a candidate (frame skip is not used)
+    QUALITY_GATE_ENABLED = True
+    QUALITY_BRIGHTNESS_RANGE = (50, 210)  # Mean gray level
+    QUALITY_MIN_SHARPNESS = 50.0  # Laplacian variance at 100x100
+    
+    # Save captured images on a background thread (bounded queue)
+    ASYNC_WRITER_ENABLED = True
+    ASYNC_WRITER_QUEUE_SIZE = 32  # Images; capture waits when full
+    
+    # Group enrollment (group_capture.py): several pre-registered students at once
+    GROUP_CAPTURE_SIZE = 4
+    GROUP_ASSIGNMENT = "order"  # "order" (left to right) or "click"
+    GROUP_CAMERA_WIDTH = 1280
+    GROUP_CAMERA_HEIGHT = 720
+    
+    # Offline enrollment from videos / photo folders (offline_enrollment.py)
+    OFFLINE_WORKERS = None  # None = one per CPU core
+    OFFLINE_VIDEO_FRAME_STEP = 3  # Use every 3rd video frame
+    OFFLINE_MAX_FACE_SIZE = 240  # Larger crops are shrunk to webcam size
+    
+    # ==================== STUDENT REGISTRY ====================
+    # Seconds a writer waits for another process's write lock
+    REGISTRY_BUSY_TIMEOUT_SECONDS = 10
+    
+    # API keeps every student in memory and reloads only after a change
+    REGISTRY_CACHE_ENABLED = True
+    
+    # csv_import.py validates and inserts this many rows at a time
+    CSV_IMPORT_CHUNK_SIZE = 5000
+    
+    # Student search (manage_students.py, /api/students/search)
+    SEARCH_FUZZY_MIN_SIMILARITY = 0.4  # Trigram Dice similarity for typo matches
+    SEARCH_FUZZY_MIN_LENGTH = 3  # Shorter queries are prefix-only
+    SEARCH_PAGE_SIZE = 20
+    SEARCH_MAX_PAGE_SIZE = 100
+    
     # ==================== ATTENDANCE ====================
+    # Storage: "partitioned" (attendance/YYYY-MM-DD/BRANCH-SECTION.csv)
+    # or "csv" (everything in attendance.csv)
+    ATTENDANCE_STORAGE = "partitioned"
+    
+    # "csv" storage: keep a date -> byte offset index (attendance.csv.idx)
+    # so one day is read without parsing the whole file
+    ATTENDANCE_INDEX_ENABLED = True
+    
+    # Keep today's attendance per class in the API, reading only rows
+    # appended since the last request (attendance_tail.py)
+    ATTENDANCE_TAIL_ENABLED = True
+    
+    # ETag / Last-Modified and 304 Not Modified on the polled endpoints
+    # (/api/attendance/today, /api/class/stats, /api/classes/summary)
+    CONDITIONAL_GET_ENABLED = True
+    
+    # Live attendance stream (/api/attendance/stream, Server-Sent Events)
+    SSE_CHECK_INTERVAL = 0.25  # Seconds between checks for new marks
+    SSE_HEARTBEAT_SECONDS = 15
+    SSE_RETRY_MS = 3000  # Browser reconnect delay
+    SSE_MAX_SUBSCRIBERS = 500
+    
+    # Columnar copy of every mark for analytics (attendance_columnar.py)
+    ATTENDANCE_COLUMNAR_ENABLED = True
+    COLUMNAR_COMPACT_SEGMENTS = 8  # Files per tier before they are merged into one (~13 ms)
+    COLUMNAR_MAX_TIER = 5  # Files of this tier (8^5 batches) are never merged while recording
+    
+    # Semester reports (/api/attendance/semester, /api/attendance/below-threshold)
+    SEMESTER_START_DATE = None  # "YYYY-MM-DD"; None = all history
+    ATTENDANCE_MIN_PERCENTAGE = 75
+    
     # Cooldown to prevent multiple marks (seconds)
     ATTENDANCE_COOLDOWN_SECONDS = 5
     
@@ -78,6 +223,19 @@ class Config:
     API_HOST = "0.0.0.0"
     API_PORT = 5000
     API_DEBUG = True
+    # Browsers preflight every cross-origin poll that sends If-None-Match;
+    # without Access-Control-Max-Age they keep the answer only ~5 seconds
+    CORS_PREFLIGHT_MAX_AGE = 600  # Seconds
+    
+    # Recognizer -> API live channel (attendance_ipc.py); the attendance
+    # files are the fallback whenever the API is not listening
+    IPC_ENABLED = True
+    IPC_SOCKET = os.path.join(LOGS_PATH, "attendance.sock")  # Unix socket
+    IPC_PORT = 5001  # localhost port where Unix sockets are unavailable
+    IPC_KEY_FILE = os.path.join(LOGS_PATH, "attendance_ipc.key")
+    IPC_RETRY_SECONDS = 5  # Recognizer reconnect interval while the API is down
+    IPC_SESSION_INTERVAL = 1.0  # Seconds between session counter updates
+    IPC_MAX_MESSAGE_BYTES = 1024 * 1024
     
     # ==================== DEMO CREDENTIALS ====================
     # WARNING: Change these in production!
@@ -93,7 +251,8 @@ class Config:
             cls.DATASET_PATH,
             cls.TRAINER_PATH,
             cls.BACKUP_PATH,
-            cls.LOGS_PATH
+            cls.LOGS_PATH,
+            cls.MODELS_PATH
         ]
         
         for directory in directories:
@@ -1,19 +1,31 @@
+"""
+Smart Attendance System - CSV Import/Export
+Register students in bulk from a CSV file (Name, RollNo, Branch, Section)
+
+Usage: python csv_import.py                          (menu)
+       python csv_import.py <file.csv> [--dry-run]   (import)
+"""
+
 import csv
-import json
 import os
+import sys
+import time
 from datetime import datetime
+from config import Config
+from student_registry import get_registry, RegistryError
+from validators import StudentValidator, ValidationContext, ValidationError
 
-STUDENT_DB = "student_database.json"
-
-def load_student_database():
-    if os.path.exists(STUDENT_DB):
-        with open(STUDENT_DB, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
+REQUIRED_HEADERS = ['Name', 'RollNo', 'Branch', 'Section']
 
-def save_student_database(db):
-    with open(STUDENT_DB, 'w', encoding='utf-8') as f:
-        json.dump(db, indent=4, fp=f)
+# Error kind -> report label
+ERROR_KINDS = {
+    'missing': "Missing fields",
+    'branch': "Invalid branch",
+    'section': "Invalid section",
+    'format': "Invalid name / roll number",
+    'duplicate_in_file': "Duplicate roll number within the file",
+    'duplicate_registered': "Roll number already registered"
+}
 
 def create_sample_csv():
     """Create a sample CSV template"""
@@ -29,6 +41,225 @@ def create_sample_csv():
     print(f"✅ Created sample template: {filename}")
     print("   Edit this file with your student data, then import it.")
 
+class CSVImportError(Exception):
+    """Raised for a CSV file that cannot be imported at all"""
+    pass
+
+
+def read_chunks(csv_file, chunk_size):
+    """Yield lists of (row_number, row) without loading the whole file"""
+    with open(csv_file, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        
+        # Validate headers
+        if not reader.fieldnames or not all(h in reader.fieldnames for h in REQUIRED_HEADERS):
+            raise CSVImportError(
+                f"CSV must have headers: {', '.join(REQUIRED_HEADERS)}\n"
+                f"   Found: {', '.join(reader.fieldnames or [])}"
+            )
+        
+        chunk = []
+        for row_num, row in enumerate(reader, start=2):
+            chunk.append((row_num, row))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def validate_chunk(chunk, context, file_rolls, report):
+    """
+    Validate one chunk of rows
+    
+    Roll numbers are checked against the registry indexes in context and
+    against earlier rows of the file (file_rolls: ROLL -> row number).
+    Accepted rows are added to both, errors to report['errors'].
+    
+    Returns:
+        list: [(student_id, record)] accepted from this chunk
+    """
+    allowed_branches = set(Config.ALLOWED_BRANCHES)
+    allowed_sections = set(Config.ALLOWED_SECTIONS)
+    registered_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    errors = report['errors']
+    accepted = []
+    
+    for row_num, row in chunk:
+        name = (row.get('Name') or '').strip()
+        roll_no = (row.get('RollNo') or '').strip().upper()
+        branch = (row.get('Branch') or '').strip().upper()
+        section = (row.get('Section') or '').strip().upper()
+        
+        if not name or not roll_no or not branch or not section:
+            errors.append((row_num, 'missing', "Missing required fields"))
+            continue
+        if branch not in allowed_branches:
+            errors.append((row_num, 'branch', f"Invalid branch '{branch}'"))
+            continue
+        if section not in allowed_sections:
+            errors.append((row_num, 'section', f"Invalid section '{section}'"))
+            continue
+        
+        # Same format rules as face_capture.py / bulk_capture.py
+        try:
+            StudentValidator.validate_name(name)
+            StudentValidator.validate_roll_number(roll_no)
+        except ValidationError as e:
+            errors.append((row_num, 'format', str(e)))
+            continue
+        
+        if roll_no in file_rolls:
+            errors.append((row_num, 'duplicate_in_file',
+                           f"Duplicate roll number '{roll_no}' (also on row {file_rolls[roll_no]})"))
+            continue
+        existing = context.rolls.get(roll_no)
+        if existing:
+            info = existing[1]
+            errors.append((row_num, 'duplicate_registered',
+                           f"Duplicate roll number '{roll_no}' (registered: {info.get('name', 'Unknown')}, "
+                           f"{info.get('branch', 'N/A')}-{info.get('section', 'N/A')})"))
+            continue
+        
+        # Create student ID (numbered on duplicate names)
+        student_id = context.unique_id(name.lower().replace(" ", "_"))
+        student = {
+            "name": name,
+            "rollNo": roll_no,
+            "branch": branch,
+            "section": section,
+            "imagesCount": 0,  # No images yet - need to capture
+            "registeredDate": registered_date,
+            "datasetPath": "",
+            "imported": True
+        }
+        context.add(student_id, student)
+        file_rolls[roll_no] = row_num
+        accepted.append((student_id, student))
+        
+        class_key = f"{branch}-{section}"
+        report['classes'][class_key] = report['classes'].get(class_key, 0) + 1
+    
+    report['rows'] += len(chunk)
+    report['accepted'] += len(accepted)
+    return accepted
+
+
+def import_csv(csv_file, dry_run=False, chunk_size=None, verbose=True):
+    """
+    Stream-import students from a CSV file
+    
+    Rows are validated chunk by chunk against indexes built once from the
+    registry. Without dry_run, the accepted rows are inserted once the
+    whole file has been validated, in one transaction: either every
+    accepted row is saved or none is. The registry stays writable while
+    the file is read.
+    
+    Returns:
+        dict: Report (rows, accepted, errors [(row, kind, message)],
+              classes {class: count}, saved, seconds, write_seconds
+              (time the registry was locked for writing))
+    
+    Raises:
+        CSVImportError: Missing file or headers
+        RegistryError: Another process registered one of the roll numbers
+                       meanwhile (nothing was saved)
+    """
+    if not os.path.exists(csv_file):
+        raise CSVImportError(f"File '{csv_file}' not found!")
+    
+    chunk_size = chunk_size or Config.CSV_IMPORT_CHUNK_SIZE
+    start = time.perf_counter()
+    context = ValidationContext()
+    report = {
+        'file': csv_file,
+        'dry_run': dry_run,
+        'registered_before': len(context),
+        'rows': 0,
+        'accepted': 0,
+        'errors': [],
+        'classes': {},
+        'saved': 0,
+        'write_seconds': 0
+    }
+    file_rolls = {}
+    accepted = []  # (student_id, record) - the records are shared with context
+    
+    for chunk in read_chunks(csv_file, chunk_size):
+        rows = validate_chunk(chunk, context, file_rolls, report)
+        if not dry_run:
+            accepted.extend(rows)
+        if verbose:
+            print(f"   📝 {report['rows']:,} rows read, {report['accepted']:,} accepted", end='\r')
+    
+    if not dry_run:
+        # Parsing a large file can take longer than REGISTRY_BUSY_TIMEOUT_SECONDS,
+        # so the write lock is only taken for the inserts
+        write_start = time.perf_counter()
+        report['saved'] = get_registry().add_many(accepted)
+        report['write_seconds'] = time.perf_counter() - write_start
+    
+    if verbose:
+        print()
+    report['seconds'] = time.perf_counter() - start
+    return report
+
+
+def write_error_report(report):
+    """Write every rejected row to <file>_import_errors.csv"""
+    base, _ = os.path.splitext(report['file'])
+    filename = f"{base}_import_errors.csv"
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Row', 'Problem', 'Details'])
+        writer.writerows(report['errors'])
+    return filename
+
+
+def print_import_report(report):
+    """Print an import (or dry-run) report"""
+    errors = report['errors']
+    
+    print("\n" + "=" * 70)
+    print("🔍 DRY RUN - NOTHING SAVED" if report['dry_run'] else "✅ IMPORT COMPLETED")
+    print("=" * 70)
+    print(f"Total in database before: {report['registered_before']:,}")
+    print(f"Rows read: {report['rows']:,}")
+    if report['dry_run']:
+        print(f"Would import: {report['accepted']:,}")
+    else:
+        print(f"Successfully imported: {report['saved']:,}")
+    print(f"Skipped/Errors: {len(errors):,}")
+    print(f"Time: {report['seconds']:.1f}s")
+    
+    if report['classes']:
+        print("\n   Students by class:")
+        for class_key, count in sorted(report['classes'].items()):
+            print(f"      {class_key}: {count:,}")
+    
+    if errors:
+        kinds = {}
+        for _, kind, _ in errors:
+            kinds[kind] = kinds.get(kind, 0) + 1
+        print(f"\n⚠️  Errors found ({len(errors):,}):")
+        for kind, count in sorted(kinds.items(), key=lambda item: -item[1]):
+            print(f"   {ERROR_KINDS.get(kind, kind)}: {count:,}")
+        for row_num, _, message in errors[:10]:  # Show first 10 errors
+            print(f"   • Row {row_num}: {message}")
+        if len(errors) > 10:
+            print(f"   ... and {len(errors) - 10:,} more errors")
+        print(f"   📄 All errors: {write_error_report(report)}")
+    
+    if report['saved'] > 0:
+        print("\n⚠️  IMPORTANT: Students imported but NO FACE DATA yet!")
+        print("   You must capture face images for recognition to work.")
+        print("\n📸 Options to capture faces:")
+        print("   1. Bulk capture: python bulk_capture.py")
+        print("   2. Individual: python face_capture.py")
+    
+    print("=" * 70)
+
+
 def import_students_from_csv():
     """Import students from CSV file"""
     print("=" * 70)
@@ -47,128 +278,31 @@ def import_students_from_csv():
             create_sample_csv()
         return
     
-    # Load existing database
-    db = load_student_database()
-    initial_count = len(db)
+    dry_run = input("   Dry run first (report only, nothing saved)? (yes/no): ").strip().lower() == 'yes'
     
-    # Read CSV
     print(f"\n📖 Reading {csv_file}...")
-    
-    imported = 0
-    skipped = 0
-    errors = []
-    
     try:
-        with open(csv_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            
-            # Validate headers
-            required_headers = ['Name', 'RollNo', 'Branch', 'Section']
-            if not all(header in reader.fieldnames for header in required_headers):
-                print(f"❌ CSV must have headers: {', '.join(required_headers)}")
-                print(f"   Found: {', '.join(reader.fieldnames)}")
-                return
-            
-            print("\n📝 Processing students...")
-            
-            for row_num, row in enumerate(reader, start=2):
-                name = row.get('Name', '').strip()
-                roll_no = row.get('RollNo', '').strip()
-                branch = row.get('Branch', '').strip().upper()
-                section = row.get('Section', '').strip().upper()
-                
-                # Validate data
-                if not name or not roll_no or not branch or not section:
-                    errors.append(f"Row {row_num}: Missing required fields")
-                    skipped += 1
-                    continue
-                
-                # Validate branch and section
-                valid_branches = ['CSE', 'AIML', 'ECE', 'EEE', 'MECH', 'CIVIL']
-                valid_sections = ['A', 'B']
-                
-                if branch not in valid_branches:
-                    errors.append(f"Row {row_num}: Invalid branch '{branch}'")
-                    skipped += 1
-                    continue
-                
-                if section not in valid_sections:
-                    errors.append(f"Row {row_num}: Invalid section '{section}'")
-                    skipped += 1
-                    continue
-                
-                # Check for duplicate roll number
-                duplicate = False
-                for student_id, info in db.items():
-                    if info.get('rollNo') == roll_no:
-                        errors.append(f"Row {row_num}: Duplicate roll number '{roll_no}'")
-                        skipped += 1
-                        duplicate = True
-                        break
-                
-                if duplicate:
-                    continue
-                
-                # Create student ID
-                student_id = name.lower().replace(" ", "_")
-                
-                # Handle duplicate names
-                if student_id in db:
-                    counter = 1
-                    while f"{student_id}_{counter}" in db:
-                        counter += 1
-                    student_id = f"{student_id}_{counter}"
-                
-                # Add to database
-                db[student_id] = {
-                    "name": name,
-                    "rollNo": roll_no,
-                    "branch": branch,
-                    "section": section,
-                    "imagesCount": 0,  # No images yet - need to capture
-                    "registeredDate": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "datasetPath": "",
-                    "imported": True
-                }
-                
-                imported += 1
-                print(f"   ✅ {name} ({roll_no}) - {branch}-{section}")
-        
-        # Save database
-        save_student_database(db)
-        
-        print("\n" + "=" * 70)
-        print("✅ IMPORT COMPLETED")
-        print("=" * 70)
-        print(f"Total in database before: {initial_count}")
-        print(f"Successfully imported: {imported}")
-        print(f"Skipped/Errors: {skipped}")
-        print(f"Total in database now: {len(db)}")
-        
-        if errors:
-            print(f"\n⚠️  Errors found ({len(errors)}):")
-            for error in errors[:10]:  # Show first 10 errors
-                print(f"   • {error}")
-            if len(errors) > 10:
-                print(f"   ... and {len(errors) - 10} more errors")
-        
-        if imported > 0:
-            print("\n⚠️  IMPORTANT: Students imported but NO FACE DATA yet!")
-            print("   You must capture face images for recognition to work.")
-            print("\n📸 Options to capture faces:")
-            print("   1. Bulk capture: python bulk_capture.py")
-            print("   2. Individual: python face_capture.py")
-        
-        print("=" * 70)
+        report = import_csv(csv_file, dry_run=dry_run)
+    except CSVImportError as e:
+        print(f"❌ {e}")
+        return
+    except RegistryError as e:
+        # Another process registered one of these meanwhile - nothing was added
+        print(f"\n❌ Import aborted, nothing saved: {e}")
+        return
+    
+    print_import_report(report)
     
-    except Exception as e:
-        print(f"\n❌ Error reading CSV: {e}")
-        import traceback
-        traceback.print_exc()
+    if dry_run and report['accepted'] and \
+            input("\nImport the accepted rows now? (yes/no): ").strip().lower() == 'yes':
+        try:
+            print_import_report(import_csv(csv_file))
+        except RegistryError as e:
+            print(f"\n❌ Import aborted, nothing saved: {e}")
 
 def export_database_to_csv():
     """Export current database to CSV"""
-    db = load_student_database()
+    db = get_registry().all()
     
     if not db:
         print("❌ No students in database to export")
@@ -213,32 +347,43 @@ def main():
         elif choice == '3':
             create_sample_csv()
         elif choice == '4':
-            db = load_student_database()
+            registry = get_registry()
             print(f"\n📊 Database Statistics:")
-            print(f"   Total students: {len(db)}")
-            
-            # Count by class
-            class_counts = {}
-            no_images = 0
-            for info in db.values():
-                class_key = f"{info['branch']}-{info['section']}"
-                class_counts[class_key] = class_counts.get(class_key, 0) + 1
-                if info.get('imagesCount', 0) == 0:
-                    no_images += 1
+            print(f"   Total students: {registry.count()}")
             
             print(f"\n   Students by class:")
-            for class_key, count in sorted(class_counts.items()):
-                print(f"      {class_key}: {count}")
+            for (branch, section), count in sorted(registry.class_counts().items()):
+                print(f"      {branch}-{section}: {count}")
             
-            print(f"\n   ⚠️  Students without face images: {no_images}")
+            print(f"\n   ⚠️  Students without face images: {registry.count_without_images()}")
         elif choice == '5':
             print("\n👋 Goodbye!")
             break
         else:
             print("\n❌ Invalid choice!")
 
+def import_from_args(args):
+    """Non-interactive import: <file.csv> [--dry-run]"""
+    dry_run = "--dry-run" in args
+    files = [arg for arg in args if arg != "--dry-run"]
+    if len(files) != 1:
+        print(__doc__)
+        sys.exit(1)
+    
+    print(f"📖 Reading {files[0]}...")
+    try:
+        report = import_csv(files[0], dry_run=dry_run)
+    except (CSVImportError, RegistryError) as e:
+        print(f"❌ Import aborted, nothing saved: {e}")
+        sys.exit(1)
+    print_import_report(report)
+
+
 if __name__ == "__main__":
     try:
-        main()
+        if len(sys.argv) > 1:
+            import_from_args(sys.argv[1:])
+        else:
+            main()
     except KeyboardInterrupt:
         print("\n\n👋 Goodbye!")
\ No newline at end of file
@@ -7,6 +7,9 @@ import cv2
 import os
 import time
 from config import Config
+from face_detectors import create_face_detector, DetectorError
+from capture_quality import QualityGate, REJECT_REASONS
+from async_writer import AsyncImageWriter
 from validators import validate_and_add_student, StudentValidator, ValidationError
 
 
@@ -126,21 +129,23 @@ def capture_student_faces():
     cam.set(cv2.CAP_PROP_FRAME_HEIGHT, Config.CAMERA_HEIGHT)
     cam.set(cv2.CAP_PROP_FPS, Config.CAMERA_FPS)
     
-    # Load face cascade
-    face_cascade = cv2.CascadeClassifier(
-        cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-    )
-    
-    if face_cascade.empty():
-        print("❌ Error loading face cascade!")
+    # Load face detector
+    try:
+        face_detector = create_face_detector()
+    except DetectorError as e:
+        print(f"❌ Error loading face detector: {e}")
         cam.release()
         return
     
     required_images = Config.REQUIRED_IMAGES_PER_STUDENT
     saved_count = 0
-    frame_skip = Config.IMAGE_CAPTURE_FRAME_SKIP
     detect_counter = 0
     
+    # Keep only sharp, well-lit, distinct crops; the gate picks the variety,
+    # so every detection is a candidate when it is enabled
+    gate = QualityGate()
+    frame_skip = 1 if gate.enabled else Config.IMAGE_CAPTURE_FRAME_SKIP
+    
     print("\n" + "=" * 70)
     print(f"👤 Student: {name}")
     print(f"🎓 Roll No: {roll_no}")
@@ -159,6 +164,9 @@ def capture_student_faces():
     
     time.sleep(3)
     
+    # JPEG encoding and disk writes happen off the camera loop
+    writer = AsyncImageWriter()
+    
     try:
         while saved_count < required_images:
             ret, frame = cam.read()
@@ -173,12 +181,7 @@ def capture_student_faces():
             gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
             
             # Detect faces
-            faces = face_cascade.detectMultiScale(
-                gray,
-                scaleFactor=Config.FACE_DETECTION_SCALE_FACTOR,
-                minNeighbors=Config.FACE_DETECTION_MIN_NEIGHBORS,
-                minSize=Config.FACE_DETECTION_MIN_SIZE
-            )
+            faces = face_detector.detect(gray, frame)
             
             # Process faces
             face_detected = False
@@ -190,10 +193,18 @@ def capture_student_faces():
                 if detect_counter % frame_skip == 0 and saved_count < required_images:
                     face = gray[y:y+h, x:x+w]
                     
+                    accepted, reason = gate.evaluate(face)
+                    if not accepted:
+                        # Orange box: crop would not add anything
+                        cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 165, 255), 2)
+                        cv2.putText(frame, REJECT_REASONS[reason], (x, y-10),
+                                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 165, 255), 2)
+                        continue
+                    
                     # Save face image
                     saved_count += 1
                     filename = f"{dataset_path}/{saved_count}.jpg"
-                    cv2.imwrite(filename, face)
+                    writer.write(filename, face)
                     
                     # Green box for captured
                     cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 3)
@@ -235,6 +246,8 @@ def capture_student_faces():
                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
             cv2.putText(frame, f"Class: {branch}-{section}", (10, 120),
                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+            cv2.putText(frame, f"Kept: {gate.accepted}/{gate.candidates}", (10, 145),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
             
             # Instructions
             if not face_detected:
@@ -265,10 +278,19 @@ def capture_student_faces():
         cam.release()
         cv2.destroyAllWindows()
         
+        # Every image must be on disk before the student is registered
+        writer.close()
+        print(f"\n💾 Image writer: {writer.summary()}")
+        if writer.failed:
+            print(f"⚠️  {len(writer.failed)} images could not be written to {dataset_path}")
+            saved_count -= len(writer.failed)
+        
+        print(f"🎯 Capture quality: {gate.summary()}")
+        
         # Minimum images check
-        if saved_count < 30:
+        if saved_count < Config.MIN_IMAGES_PER_STUDENT:
             print(f"\n❌ ERROR: Only {saved_count} images captured!")
-            print("   Minimum 30 images required for accurate recognition.")
+            print(f"   Minimum {Config.MIN_IMAGES_PER_STUDENT} images required for accurate recognition.")
             print("   Student NOT saved to database.")
             return
         
@@ -288,7 +310,7 @@ def capture_student_faces():
             print(f"🏢 Branch-Section: {branch}-{section}")
             print(f"📸 Images Captured: {saved_count}/{required_images}")
             print(f"📂 Dataset Path: {dataset_path}")
-            print(f"💾 Database File: {Config.STUDENT_DB}")
+            print(f"💾 Database File: {Config.STUDENT_REGISTRY_DB}")
             print("=" * 70)
             print("\n📝 NEXT STEPS:")
             print("  1. Capture more students if needed (run this script again)")
@@ -306,6 +328,8 @@ def capture_student_faces():
         traceback.print_exc()
         cam.release()
         cv2.destroyAllWindows()
+    finally:
+        writer.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,143 @@
+"""
+Smart Attendance System - Face Detectors
+Pluggable CPU face detection backends selected in Config
+"""
+
+import os
+import cv2
+from config import Config
+
+
+class DetectorError(Exception):
+    """Raised when a detector backend cannot be loaded"""
+    pass
+
+
+class FaceDetector:
+    """
+    Detector interface
+
+    detect() takes the grayscale frame (and optionally the colour frame
+    for backends that need it) and returns a list of (x, y, w, h) boxes.
+    """
+
+    name = "base"
+
+    def detect(self, gray, frame=None):
+        raise NotImplementedError
+
+
+class CascadeDetector(FaceDetector):
+    """Haar or LBP cascade (cv2.CascadeClassifier)"""
+
+    def __init__(self, name, cascade_path, min_size=None):
+        self.name = name
+        self.min_size = min_size or Config.FACE_DETECTION_MIN_SIZE
+
+        if not os.path.exists(cascade_path):
+            raise DetectorError(f"Cascade file not found: {cascade_path}")
+
+        self.cascade = cv2.CascadeClassifier(cascade_path)
+        if self.cascade.empty():
+            raise DetectorError(f"Could not load cascade: {cascade_path}")
+
+    def detect(self, gray, frame=None):
+        faces = self.cascade.detectMultiScale(
+            gray,
+            scaleFactor=Config.FACE_DETECTION_SCALE_FACTOR,
+            minNeighbors=Config.FACE_DETECTION_MIN_NEIGHBORS,
+            minSize=self.min_size
+        )
+        return [tuple(int(v) for v in face) for face in faces]
+
+
+class YuNetDetector(FaceDetector):
+    """OpenCV DNN face detector (YuNet ONNX model from a local path)"""
+
+    name = "yunet"
+
+    def __init__(self, model_path, min_size=None):
+        self.min_size = min_size or Config.FACE_DETECTION_MIN_SIZE
+
+        if not os.path.exists(model_path):
+            raise DetectorError(
+                f"YuNet model not found: {model_path}\n"
+                f"Download face_detection_yunet_2023mar.onnx from the OpenCV model zoo"
+            )
+
+        try:
+            self.detector = cv2.FaceDetectorYN_create(
+                model_path, "", (320, 320),
+                Config.YUNET_SCORE_THRESHOLD,
+                Config.YUNET_NMS_THRESHOLD,
+                Config.YUNET_TOP_K
+            )
+        except cv2.error as e:
+            raise DetectorError(f"Could not load YuNet model: {e}")
+
+        self._input_size = None
+
+    def detect(self, gray, frame=None):
+        image = frame if frame is not None else cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+        height, width = image.shape[:2]
+
+        if self._input_size != (width, height):
+            self.detector.setInputSize((width, height))
+            self._input_size = (width, height)
+
+        _, faces = self.detector.detect(image)
+        if faces is None:
+            return []
+
+        boxes = []
+        min_w, min_h = self.min_size
+        for face in faces:
+            x, y, w, h = (int(v) for v in face[:4])
+            # Clip to the frame so crops are always valid
+            x, y = max(0, x), max(0, y)
+            w, h = min(w, width - x), min(h, height - y)
+            if w >= min_w and h >= min_h:
+                boxes.append((x, y, w, h))
+        return boxes
+
+
+def available_backends():
+    """Backend name -> description"""
+    return {
+        "haar_default": "Haar cascade (frontalface_default)",
+        "haar_alt2": "Haar cascade (frontalface_alt2)",
+        "lbp": "LBP cascade (local file)",
+        "yunet": "OpenCV DNN YuNet (local ONNX model)"
+    }
+
+
+def create_face_detector(backend=None, min_size=None):
+    """
+    Create a face detector
+
+    Args:
+        backend: Backend name (default: Config.FACE_DETECTOR_BACKEND)
+        min_size: Minimum face size (default: Config.FACE_DETECTION_MIN_SIZE)
+
+    Raises:
+        DetectorError: Unknown backend or missing model file
+    """
+    backend = backend or Config.FACE_DETECTOR_BACKEND
+
+    if backend == "haar_default":
+        return CascadeDetector(
+            backend, cv2.data.haarcascades + "haarcascade_frontalface_default.xml", min_size
+        )
+    if backend == "haar_alt2":
+        return CascadeDetector(
+            backend, cv2.data.haarcascades + "haarcascade_frontalface_alt2.xml", min_size
+        )
+    if backend == "lbp":
+        return CascadeDetector(backend, Config.LBP_CASCADE_PATH, min_size)
+    if backend == "yunet":
+        return YuNetDetector(Config.YUNET_MODEL_PATH, min_size)
+
+    raise DetectorError(
+        f"Unknown face detector '{backend}'. "
+        f"Allowed: {', '.join(available_backends())}"
+    )
@@ -0,0 +1,115 @@
+"""
+Smart Attendance System - Face Tracking
+Associates face detections across frames so per-face state survives
+"""
+
+from config import Config
+
+
+def bbox_iou(a, b):
+    """Intersection-over-union of two (x, y, w, h) boxes"""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    intersection = ix * iy
+
+    union = aw * ah + bw * bh - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+class FaceTrack:
+    """A face followed across frames"""
+
+    def __init__(self, track_id, bbox, now):
+        self.track_id = track_id
+        self.bbox = bbox
+        self.first_seen = now
+        self.last_seen = now
+        self.missed = 0
+
+        # Recognition state (filled in by the recognizer)
+        self.last_predicted = None
+        self.label = None
+        self.confidence = None
+        self.name = None
+        self.result = None
+
+        # True once the face is identified and needs no more work
+        # (marked present, or a known student from another class)
+        self.settled = False
+
+    @property
+    def area(self):
+        return self.bbox[2] * self.bbox[3]
+
+
+class FaceTracker:
+    """Greedy IoU tracker - cheap enough to run on every detection pass"""
+
+    def __init__(self, iou_threshold=None, max_missed=None):
+        self.iou_threshold = (
+            iou_threshold if iou_threshold is not None else Config.FACE_TRACK_IOU_THRESHOLD
+        )
+        self.max_missed = (
+            max_missed if max_missed is not None else Config.FACE_TRACK_MAX_MISSED
+        )
+        self.tracks = {}
+        self._next_id = 0
+
+    def update(self, boxes, now):
+        """
+        Match detections to existing tracks
+
+        Args:
+            boxes: Detected (x, y, w, h) boxes for this frame
+            now: Current time (seconds)
+
+        Returns:
+            list: FaceTrack for each box, in the same order as boxes
+        """
+        boxes = [tuple(int(v) for v in box) for box in boxes]
+
+        # Score every (track, box) pair and match best pairs first
+        candidates = []
+        for track_id, track in self.tracks.items():
+            for index, box in enumerate(boxes):
+                iou = bbox_iou(track.bbox, box)
+                if iou >= self.iou_threshold:
+                    candidates.append((iou, track_id, index))
+        candidates.sort(reverse=True)
+
+        matched = [None] * len(boxes)
+        used_tracks = set()
+        for iou, track_id, index in candidates:
+            if track_id in used_tracks or matched[index] is not None:
+                continue
+            track = self.tracks[track_id]
+            track.bbox = boxes[index]
+            track.last_seen = now
+            track.missed = 0
+            matched[index] = track
+            used_tracks.add(track_id)
+
+        # Age out tracks that were not seen
+        for track_id in list(self.tracks):
+            if track_id not in used_tracks:
+                track = self.tracks[track_id]
+                track.missed += 1
+                if track.missed > self.max_missed:
+                    del self.tracks[track_id]
+
+        # New faces
+        for index, box in enumerate(boxes):
+            if matched[index] is None:
+                track = FaceTrack(self._next_id, box, now)
+                self._next_id += 1
+                self.tracks[track.track_id] = track
+                matched[index] = track
+
+        return matched
+
+    def reset(self):
+        """Forget all tracks"""
+        self.tracks = {}
@@ -0,0 +1,71 @@
+"""
+Smart Attendance System - Face Image Utilities
+Shared helpers for fingerprinting face crops
+"""
+
+import cv2
+import numpy as np
+
+
+def dhash(gray_face, hash_size=8):
+    """
+    Difference hash of a grayscale face crop
+
+    The crop is shrunk to (hash_size + 1) x hash_size and each bit records
+    whether a pixel is brighter than its right neighbour. Small shifts,
+    noise and brightness changes leave most bits unchanged.
+
+    Returns:
+        int: hash_size * hash_size bit fingerprint
+    """
+    small = cv2.resize(gray_face, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    diff = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(diff).tobytes(), "big")
+
+
+def hamming_distance(a, b):
+    """Number of differing bits between two hashes"""
+    return bin(a ^ b).count("1")
+
+
+class NearDuplicateFilter:
+    """
+    Rejects face crops that look almost the same as one already kept
+
+    Used while capturing (skip frames where the student has not moved) and
+    by prune_dataset.py (drop long runs of identical frames).
+    """
+
+    def __init__(self, max_distance, hash_size=8):
+        self.max_distance = max_distance
+        self.hash_size = hash_size
+        self.kept = []
+        self.rejected = 0
+
+    def nearest_distance(self, face_hash):
+        """Distance to the closest kept hash (None if nothing kept yet)"""
+        if not self.kept:
+            return None
+        return min(hamming_distance(face_hash, kept) for kept in self.kept)
+
+    def check(self, gray_face):
+        """
+        Returns:
+            (is_duplicate, face_hash)
+        """
+        face_hash = dhash(gray_face, self.hash_size)
+        distance = self.nearest_distance(face_hash)
+        return distance is not None and distance <= self.max_distance, face_hash
+
+    def add(self, face_hash):
+        """Remember a crop that was kept"""
+        self.kept.append(face_hash)
+
+    def accept(self, gray_face):
+        """Keep the crop and return True unless it is a near-duplicate"""
+        is_duplicate, face_hash = self.check(gray_face)
+        if is_duplicate:
+            self.rejected += 1
+            return False
+        self.add(face_hash)
+        return True
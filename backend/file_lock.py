@@ -0,0 +1,85 @@
+"""
+Smart Attendance System - File Lock
+Cross-process lock for one-time jobs on shared data (migrations, rebuilds)
+
+The API and the recognizer run as separate processes and can both open a
+store for the first time at once; the lock makes one of them do the work
+while the other waits. The operating system releases the lock if the
+holder dies, so a crash never leaves it stuck. The lock file itself is
+left in place.
+"""
+
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLockTimeout(Exception):
+    """Raised when the lock could not be taken in time"""
+    pass
+
+
+class FileLock:
+    """
+    Exclusive lock on path (created if needed)
+
+    Usage:
+        with FileLock(root + ".lock"):
+            ...
+    """
+
+    def __init__(self, path, timeout=None, poll_interval=0.05):
+        self.path = path
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._fd = None
+
+    def _try_lock(self):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(self._fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def acquire(self):
+        """Wait for the lock (up to timeout seconds, None = no limit)"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while not self._try_lock():
+            if deadline is not None and time.monotonic() >= deadline:
+                os.close(self._fd)
+                self._fd = None
+                raise FileLockTimeout(f"{self.path} is held by another process")
+            time.sleep(self.poll_interval)
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
@@ -0,0 +1,399 @@
+"""
+Smart Attendance System - Group Enrollment
+Capture several pre-registered students from one camera session
+
+Students imported with csv_import.py (no face images yet) stand in front of
+the camera together. Each tracked face is assigned to a student - by
+left-to-right order or by the operator clicking on it - and crops are saved
+for everyone at once until each student reaches the target.
+
+Usage: python group_capture.py
+"""
+
+import os
+import time
+import cv2
+from config import Config
+from face_detectors import create_face_detector, DetectorError
+from face_tracking import FaceTracker
+from capture_quality import QualityGate, REJECT_REASONS
+from async_writer import AsyncImageWriter
+from validators import dataset_folder_name, update_student_images
+from student_registry import get_registry
+
+ASSIGNMENT_MODES = ("order", "click")
+
+
+def pending_students(branch, section):
+    """Registered students of a class that still need face images, by roll number"""
+    return [
+        (student_id, info) for student_id, info in get_registry().by_class(branch, section)
+        if info.get('imagesCount', 0) < Config.MIN_IMAGES_PER_STUDENT
+    ]
+
+
+class GroupMember:
+    """One student of the group being captured"""
+
+    def __init__(self, student_id, info, target):
+        self.student_id = student_id
+        self.name = info['name']
+        self.roll_no = info.get('rollNo', 'N/A')
+        self.folder = os.path.join(Config.DATASET_PATH, dataset_folder_name(student_id, self.name))
+        self.target = target
+        self.saved = 0
+        self.gate = QualityGate()
+        self.track_id = None
+
+    @property
+    def done(self):
+        return self.saved >= self.target
+
+
+class GroupEnrollment:
+    """
+    Face-to-student assignment and per-student capture state for one group
+
+    "order": unassigned faces are given to unassigned students left to
+    right, in list order - only when exactly as many unassigned faces as
+    unassigned students are visible, so a missing or extra face never
+    shifts everyone's identity. Finished students keep their place (and
+    their face) until the whole group is done. "click": the operator clicks
+    a face to give it to the next unassigned student. A student whose face
+    track is lost becomes unassigned again.
+    """
+
+    def __init__(self, students, target=None, mode=None):
+        target = target or Config.REQUIRED_IMAGES_PER_STUDENT
+        self.mode = mode or Config.GROUP_ASSIGNMENT
+        if self.mode not in ASSIGNMENT_MODES:
+            raise ValueError(f"Invalid assignment mode '{self.mode}'. Allowed: {', '.join(ASSIGNMENT_MODES)}")
+        self.members = [GroupMember(student_id, info, target) for student_id, info in students]
+        self.ambiguous = False
+
+    @property
+    def done(self):
+        return all(member.done for member in self.members)
+
+    def member_for(self, track):
+        for member in self.members:
+            if member.track_id == track.track_id:
+                return member
+        return None
+
+    def next_unassigned(self):
+        for member in self.members:
+            if member.track_id is None and not member.done:
+                return member
+        return None
+
+    def sync(self, tracks, live_ids=None):
+        """
+        Drop assignments of lost faces; auto-assign in order mode
+
+        Args:
+            tracks: Faces detected in this frame
+            live_ids: Track ids the tracker still follows (default: tracks)
+        """
+        live = set(live_ids) if live_ids is not None else {track.track_id for track in tracks}
+        for member in self.members:
+            if member.track_id not in live:
+                member.track_id = None
+
+        self.ambiguous = False
+        if self.mode != "order":
+            return
+
+        assigned = {member.track_id for member in self.members}
+        free_tracks = sorted(
+            (track for track in tracks if track.track_id not in assigned),
+            key=lambda track: track.bbox[0]
+        )
+        free_members = [m for m in self.members if m.track_id is None]
+
+        # A missing or extra face: position order would be a guess
+        if len(free_tracks) != len(free_members):
+            self.ambiguous = any(not m.done for m in free_members)
+            return
+
+        for member, track in zip(free_members, free_tracks):
+            member.track_id = track.track_id
+
+    def click(self, point, tracks, unassign=False):
+        """Assign (or with unassign=True, release) the face under a clicked point"""
+        px, py = point
+        for track in tracks:
+            x, y, w, h = track.bbox
+            if x <= px <= x + w and y <= py <= y + h:
+                member = self.member_for(track)
+                if unassign:
+                    if member is not None:
+                        member.track_id = None
+                    return member
+                if member is None:
+                    member = self.next_unassigned()
+                    if member is not None:
+                        member.track_id = track.track_id
+                return member
+        return None
+
+    def offer(self, track, gray_face):
+        """
+        A crop of a tracked face
+
+        Returns:
+            (member, saved, reason) - member is None for unassigned faces
+        """
+        member = self.member_for(track)
+        if member is None or member.done:
+            return member, False, None
+
+        accepted, reason = member.gate.evaluate(gray_face)
+        if not accepted:
+            return member, False, reason
+
+        member.saved += 1
+        return member, True, None
+
+
+def draw_overlay(frame, enrollment, group_num, groups_total):
+    """Student list with progress on the left edge"""
+    cv2.rectangle(frame, (0, 0), (330, 40 + 28 * len(enrollment.members)), (40, 40, 40), -1)
+    cv2.putText(frame, f"Group {group_num}/{groups_total} - {enrollment.mode} mode", (10, 25),
+               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+
+    for i, member in enumerate(enrollment.members):
+        if member.done:
+            color, status = (0, 255, 0), "DONE"
+        elif member.track_id is None:
+            color, status = (0, 165, 255), "waiting"
+        else:
+            color, status = (255, 255, 255), f"{member.saved}/{member.target}"
+        cv2.putText(frame, f"{i + 1}. {member.name[:18]} {status}", (10, 55 + 28 * i),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.55, color, 2)
+
+    if enrollment.mode == "click":
+        member = enrollment.next_unassigned()
+        if member is not None:
+            cv2.putText(frame, f"Click the face of: {member.name}", (10, frame.shape[0] - 20),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+    elif enrollment.ambiguous:
+        cv2.putText(frame, "Waiting for exactly the group's faces to be visible",
+                   (10, frame.shape[0] - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+
+
+def capture_group(cam, detector, writer, enrollment, group_num, groups_total):
+    """
+    Run the camera until every member has enough images or the operator quits
+
+    Returns:
+        bool: False if the operator asked to stop the whole session
+    """
+    tracker = FaceTracker()
+    visible_tracks = []
+    window = "Group Enrollment - Q: finish group, ESC: stop"
+
+    def on_mouse(event, x, y, flags, param):
+        if event == cv2.EVENT_LBUTTONDOWN:
+            enrollment.click((x, y), visible_tracks)
+        elif event == cv2.EVENT_RBUTTONDOWN:
+            enrollment.click((x, y), visible_tracks, unassign=True)
+
+    cv2.namedWindow(window)
+    cv2.setMouseCallback(window, on_mouse)
+
+    for member in enrollment.members:
+        os.makedirs(member.folder, exist_ok=True)
+
+    while not enrollment.done:
+        ret, frame = cam.read()
+        if not ret:
+            print("❌ Camera error!")
+            return False
+
+        frame = cv2.flip(frame, 1)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+        boxes = detector.detect(gray, frame)
+        visible_tracks = tracker.update(boxes, time.time())
+        enrollment.sync(visible_tracks, tracker.tracks.keys())
+
+        for track in visible_tracks:
+            x, y, w, h = track.bbox
+            member, saved, reason = enrollment.offer(track, gray[y:y+h, x:x+w])
+
+            if member is None:
+                color, label = (200, 200, 200), "?"
+            elif member.done:
+                color, label = (0, 255, 0), f"{member.name} DONE"
+            elif saved:
+                writer.write(os.path.join(member.folder, f"{member.saved}.jpg"), gray[y:y+h, x:x+w])
+                color, label = (0, 255, 0), f"{member.name} {member.saved}/{member.target}"
+            else:
+                color = (0, 165, 255) if reason else (0, 255, 255)
+                label = f"{member.name} - {REJECT_REASONS[reason]}" if reason else member.name
+
+            cv2.rectangle(frame, (x, y), (x+w, y+h), color, 2)
+            cv2.putText(frame, label, (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+
+        draw_overlay(frame, enrollment, group_num, groups_total)
+        cv2.imshow(window, frame)
+
+        key = cv2.waitKey(1) & 0xFF
+        if key == 27:
+            return False
+        if key == ord('q') or key == ord('Q'):
+            break
+
+    return True
+
+
+def finish_group(enrollment, writer):
+    """Flush images and register students that have enough of them"""
+    failed_before = len(writer.failed)
+    writer.flush()
+    failed = set(writer.failed[failed_before:])
+
+    updates = {}
+    enrolled = []
+    print("\n" + "-" * 70)
+    for member in enrollment.members:
+        count = member.saved - sum(1 for path in failed if os.path.dirname(path) == member.folder)
+        if count >= Config.MIN_IMAGES_PER_STUDENT:
+            updates[member.student_id] = (count, member.folder)
+            enrolled.append(member)
+            print(f"✅ {member.name} ({member.roll_no}): {count} images")
+        else:
+            print(f"❌ {member.name} ({member.roll_no}): only {count} images - not enrolled")
+        print(f"   🎯 {member.gate.summary()}")
+    print("-" * 70)
+
+    update_student_images(updates)
+    return enrolled
+
+
+def group_enroll_class(branch, section, group_size=None, mode=None):
+    """Enroll every pending student of a class, several at a time"""
+    group_size = group_size or Config.GROUP_CAPTURE_SIZE
+    students = pending_students(branch, section)
+
+    if not students:
+        print(f"\n✅ No students in {branch}-{section} are waiting for face capture.")
+        print("   Import students first: python csv_import.py")
+        return
+
+    groups = [students[i:i + group_size] for i in range(0, len(students), group_size)]
+    mode = mode or Config.GROUP_ASSIGNMENT
+
+    print("\n" + "=" * 70)
+    print(f"👥 GROUP ENROLLMENT - {branch}-{section}")
+    print("=" * 70)
+    print(f"Students waiting: {len(students)} in {len(groups)} groups of up to {group_size}")
+    print(f"Assignment: {mode}")
+    if mode == "order":
+        print("  • Students stand LEFT to RIGHT in the listed order")
+        print("  • Stay in place until the whole group is DONE")
+    else:
+        print("  • Click each face when its name is shown; right-click to undo")
+    print("  • Q finishes the current group early, ESC stops the session")
+    print("=" * 70)
+
+    cam = cv2.VideoCapture(Config.CAMERA_INDEX)
+    if not cam.isOpened():
+        print("❌ Cannot open camera!")
+        return
+
+    cam.set(cv2.CAP_PROP_FRAME_WIDTH, Config.GROUP_CAMERA_WIDTH)
+    cam.set(cv2.CAP_PROP_FRAME_HEIGHT, Config.GROUP_CAMERA_HEIGHT)
+    cam.set(cv2.CAP_PROP_FPS, Config.CAMERA_FPS)
+
+    try:
+        detector = create_face_detector()
+    except DetectorError as e:
+        print(f"❌ Error loading face detector: {e}")
+        cam.release()
+        return
+
+    writer = AsyncImageWriter()
+    enrolled = []
+    camera_seconds = 0.0
+
+    try:
+        for group_num, group in enumerate(groups, 1):
+            print(f"\n📸 GROUP {group_num} of {len(groups)}:")
+            for i, (_, info) in enumerate(group, 1):
+                print(f"   {i}. {info['name']} ({info.get('rollNo', 'N/A')})")
+            input("\nPress ENTER when the group is in front of the camera...")
+
+            enrollment = GroupEnrollment(group, mode=mode)
+            start = time.time()
+            keep_going = capture_group(cam, detector, writer, enrollment, group_num, len(groups))
+            camera_seconds += time.time() - start
+
+            enrolled.extend(finish_group(enrollment, writer))
+            minutes = camera_seconds / 60
+            print(f"⏱️  {len(enrolled)} students in {minutes:.1f} min "
+                  f"({len(enrolled) / minutes if minutes else 0:.1f} students/min)")
+
+            if not keep_going:
+                print("⏹️  Stopping group enrollment...")
+                break
+
+    except KeyboardInterrupt:
+        print("\n\n⏹️  Group enrollment stopped by user")
+    finally:
+        cam.release()
+        cv2.destroyAllWindows()
+        writer.close()
+
+        minutes = camera_seconds / 60
+        print("\n" + "=" * 70)
+        print("✅ GROUP ENROLLMENT SESSION COMPLETED")
+        print("=" * 70)
+        print(f"Class: {branch}-{section}")
+        print(f"Students enrolled: {len(enrolled)} / {len(students)}")
+        print(f"Camera time: {minutes:.1f} min")
+        if minutes:
+            print(f"Throughput: {len(enrolled) / minutes:.1f} students/min")
+        print(f"Image writer: {writer.summary()}")
+        print("\n📝 NEXT STEP: Train the model: python train_model.py")
+        print("=" * 70)
+
+
+def main():
+    print("=" * 70)
+    print("👥 SMART ATTENDANCE - GROUP ENROLLMENT")
+    print("=" * 70)
+
+    print("\n🏢 Select Branch:")
+    for i, branch in enumerate(Config.ALLOWED_BRANCHES, 1):
+        print(f"  {i}. {branch}")
+    while True:
+        try:
+            branch = Config.ALLOWED_BRANCHES[int(input(f"\nEnter branch number (1-{len(Config.ALLOWED_BRANCHES)}): ")) - 1]
+            break
+        except (ValueError, IndexError):
+            print("❌ Invalid choice!")
+
+    print("\n📋 Select Section:")
+    for i, section in enumerate(Config.ALLOWED_SECTIONS, 1):
+        print(f"  {i}. Section {section}")
+    while True:
+        try:
+            section = Config.ALLOWED_SECTIONS[int(input(f"\nEnter section (1-{len(Config.ALLOWED_SECTIONS)}): ")) - 1]
+            break
+        except (ValueError, IndexError):
+            print("❌ Invalid choice!")
+
+    group_enroll_class(branch, section)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n👋 Goodbye!")
+    except Exception as e:
+        print(f"\n❌ Fatal error: {e}")
+        import traceback
+        traceback.print_exc()
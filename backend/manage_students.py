@@ -1,22 +1,14 @@
-import json
-import os
 from datetime import datetime
+from config import Config
+from student_registry import get_registry
+from registry_cache import RegistryCache
 
-STUDENT_DB = "student_database.json"
-
-def load_db():
-    if os.path.exists(STUDENT_DB):
-        with open(STUDENT_DB, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
-
-def save_db(db):
-    with open(STUDENT_DB, 'w', encoding='utf-8') as f:
-        json.dump(db, indent=4, fp=f)
+# Search index, kept in step with the registry between searches
+registry_cache = RegistryCache()
 
 def list_all_students():
     """List all registered students"""
-    db = load_db()
+    db = get_registry().all()
     
     if not db:
         print("\n📭 No students registered yet.")
@@ -39,17 +31,17 @@ def list_all_students():
 
 def list_by_class():
     """List students by class"""
-    db = load_db()
+    registry = get_registry()
     
-    if not db:
+    if not registry.count():
         print("\n📭 No students registered yet.")
         return
     
     branch = input("\nEnter branch (CSE/AIML/ECE/EEE/MECH/CIVIL): ").strip().upper()
     section = input("Enter section (A/B): ").strip().upper()
     
-    students = [info for info in db.values() 
-                if info.get('branch') == branch and info.get('section') == section]
+    # Ordered by roll number
+    students = [info for student_id, info in registry.by_class(branch, section)]
     
     if not students:
         print(f"\n📭 No students found for {branch}-{section}")
@@ -58,7 +50,7 @@ def list_by_class():
     print(f"\n📚 Students in {branch}-{section}")
     print("=" * 60)
     
-    for i, info in enumerate(sorted(students, key=lambda x: x['rollNo']), 1):
+    for i, info in enumerate(students, 1):
         print(f"{i}. {info['name']} ({info['rollNo']}) - {info.get('imagesCount', 0)} images")
     
     print("=" * 60)
@@ -66,39 +58,50 @@ def list_by_class():
 
 def search_student():
     """Search for a specific student"""
-    db = load_db()
-    
-    search = input("\nEnter name or roll number to search: ").strip().lower()
-    
-    found = []
-    for student_id, info in db.items():
-        if (search in info['name'].lower() or 
-            search in info.get('rollNo', '').lower()):
-            found.append(info)
+    search = input("\nEnter name or roll number to search: ").strip()
+    if not search:
+        print("❌ Enter a name or roll number")
+        return
     
-    if found:
-        print(f"\n✅ Found {len(found)} student(s):")
+    # Prefix matches on any name word or the roll number, then close
+    # spellings; one page at a time
+    offset = 0
+    page_size = Config.SEARCH_PAGE_SIZE
+    while True:
+        snapshot, results, has_more = registry_cache.search(search, offset, page_size)
+        if not results:
+            break
+        
+        if offset == 0:
+            print("\n✅ Found:")
         print("-" * 60)
-        for info in found:
-            print(f"👤 Name: {info['name']}")
+        for student_id, match, score in results:
+            info = snapshot.students[student_id]
+            close = f"   (close match, {score:.0%} similar)" if match == "fuzzy" else ""
+            print(f"👤 Name: {info['name']}{close}")
             print(f"🎓 Roll No: {info['rollNo']}")
             print(f"🏢 Class: {info['branch']}-{info['section']}")
             print(f"📸 Images: {info.get('imagesCount', 0)}")
             print(f"📅 Registered: {info.get('registeredDate', 'N/A')}")
             print(f"📁 Path: {info.get('datasetPath', 'N/A')}")
             print("-" * 60)
-    else:
+        
+        offset += len(results)
+        if not has_more or input("More results? (yes/no): ").strip().lower() != 'yes':
+            break
+    
+    if offset == 0:
         print("❌ No students found")
 
 def delete_student():
     """Delete a student from database"""
-    db = load_db()
+    registry = get_registry()
     
     search = input("\nEnter name of student to delete: ").strip().lower()
     student_id = search.replace(" ", "_")
+    info = registry.get(student_id)
     
-    if student_id in db:
-        info = db[student_id]
+    if info:
         print(f"\n⚠️  Found student:")
         print(f"   Name: {info['name']}")
         print(f"   Roll No: {info['rollNo']}")
@@ -107,8 +110,7 @@ def delete_student():
         confirm = input("\n⚠️  Are you sure you want to delete? (yes/no): ").strip().lower()
         
         if confirm == 'yes':
-            del db[student_id]
-            save_db(db)
+            registry.delete(student_id)
             print("✅ Student deleted from database")
             print("⚠️  Note: Dataset folder not deleted. Delete manually if needed.")
         else:
@@ -118,7 +120,7 @@ def delete_student():
 
 def export_to_csv():
     """Export database to CSV"""
-    db = load_db()
+    db = get_registry().all()
     
     if not db:
         print("\n📭 No students to export")
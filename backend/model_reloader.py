@@ -0,0 +1,79 @@
+"""
+Smart Attendance System - Model Hot Reload
+Picks up retrained models without restarting a recognition session
+"""
+
+import os
+import threading
+from config import Config
+from recognizer_backends import load_model, model_paths, ModelError
+
+
+class ModelWatcher(threading.Thread):
+    """
+    Watches a backend's manifest and loads new model versions in the background
+
+    The trainer publishes the model file first and the manifest last (both via
+    rename), so a changed manifest means a complete model is ready. Loading
+    happens on this thread; the camera loop only calls poll() between frames
+    and swaps in the new model when one is ready.
+    """
+
+    def __init__(self, backend, current_version, poll_seconds=None):
+        super().__init__(name="model-watcher", daemon=True)
+        self.backend = backend
+        self.current_version = current_version
+        self.poll_seconds = poll_seconds if poll_seconds is not None else Config.MODEL_RELOAD_POLL_SECONDS
+        _, self.manifest_file = model_paths(backend)
+
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._pending = None
+        self._last_stat = self._manifest_stat()
+        self._failed_stat = None
+
+        self.reloads = 0
+
+    def _manifest_stat(self):
+        try:
+            stat = os.stat(self.manifest_file)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def run(self):
+        while not self._stop_event.wait(self.poll_seconds):
+            stat = self._manifest_stat()
+            if stat is None or stat == self._last_stat:
+                continue
+
+            try:
+                model = load_model(self.backend)
+            except ModelError as e:
+                # Retry on the next poll; only report each failure once
+                if stat != self._failed_stat:
+                    print(f"⚠️  New model not loaded yet: {e}")
+                    self._failed_stat = stat
+                continue
+
+            self._last_stat = stat
+            if model.version == self.current_version:
+                continue
+
+            with self._lock:
+                self._pending = model
+            self.current_version = model.version
+
+    def poll(self):
+        """Return a newly loaded TrainedModel (once), or None"""
+        with self._lock:
+            model, self._pending = self._pending, None
+        if model is not None:
+            self.reloads += 1
+        return model
+
+    def stop(self):
+        """Stop watching"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=self.poll_seconds + 1)
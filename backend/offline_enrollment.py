@@ -0,0 +1,273 @@
+"""
+Smart Attendance System - Offline Enrollment
+Enroll registered students from recorded videos or photo folders
+
+Usage: python offline_enrollment.py <mapping.csv|mapping.json> [--workers N]
+
+mapping.csv has the columns StudentId,Source; mapping.json is
+{"student_id": "path/to/video.mp4 or path/to/photos/"}. Students must
+already be registered (csv_import.py). Every source is processed in its
+own worker process.
+"""
+
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import cv2
+from config import Config
+from capture_quality import QualityGate
+from validators import dataset_folder_name, update_student_images
+from student_registry import get_registry
+
+PHOTO_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+# One face detector per worker process
+_detector = None
+
+
+class EnrollmentError(Exception):
+    """Raised for an unusable mapping file"""
+    pass
+
+
+def load_mapping(mapping_file):
+    """Read {student_id: source path}; relative paths are relative to the mapping file"""
+    if not os.path.exists(mapping_file):
+        raise EnrollmentError(f"Mapping file not found: {mapping_file}")
+
+    if mapping_file.lower().endswith('.json'):
+        with open(mapping_file, 'r', encoding='utf-8') as f:
+            mapping = json.load(f)
+        if not isinstance(mapping, dict):
+            raise EnrollmentError("JSON mapping must be an object: {\"student_id\": \"source\"}")
+    else:
+        with open(mapping_file, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.DictReader(f)
+            if not reader.fieldnames or not {'StudentId', 'Source'} <= set(reader.fieldnames):
+                raise EnrollmentError("CSV mapping must have headers: StudentId, Source")
+            mapping = {
+                row['StudentId'].strip(): row['Source'].strip()
+                for row in reader if row.get('StudentId', '').strip()
+            }
+
+    base = os.path.dirname(os.path.abspath(mapping_file))
+    return {
+        student_id: source if os.path.isabs(source) else os.path.join(base, source)
+        for student_id, source in mapping.items()
+    }
+
+
+def iter_source_frames(source):
+    """Yield BGR frames from a photo folder, or every Nth frame of a video"""
+    if os.path.isdir(source):
+        for filename in sorted(os.listdir(source)):
+            if filename.lower().endswith(PHOTO_EXTENSIONS):
+                image = cv2.imread(os.path.join(source, filename))
+                if image is not None:
+                    yield image
+        return
+
+    video = cv2.VideoCapture(source)
+    if not video.isOpened():
+        raise EnrollmentError(f"Cannot open video: {source}")
+    try:
+        index = 0
+        while True:
+            ok, frame = video.read()
+            if not ok:
+                break
+            if index % Config.OFFLINE_VIDEO_FRAME_STEP == 0:
+                yield frame
+            index += 1
+    finally:
+        video.release()
+
+
+def normalize_face(gray, box):
+    """Crop the face and shrink large crops to the size the webcam produces"""
+    x, y, w, h = box
+    face = gray[y:y+h, x:x+w]
+    if max(w, h) > Config.OFFLINE_MAX_FACE_SIZE:
+        scale = Config.OFFLINE_MAX_FACE_SIZE / max(w, h)
+        face = cv2.resize(face, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+    return face
+
+
+def next_image_number(folder):
+    """First free N for N.jpg, so existing images are kept"""
+    numbers = [
+        int(os.path.splitext(f)[0]) for f in os.listdir(folder)
+        if os.path.splitext(f)[0].isdigit()
+    ]
+    return max(numbers, default=0) + 1
+
+
+def enroll_from_source(student_id, name, source, target):
+    """
+    Worker: detect, normalize and save faces of one student
+
+    Only the largest face of each frame is used (the student); crops go
+    through the same quality gate as live capture.
+    """
+    from face_detectors import create_face_detector
+
+    global _detector
+    if _detector is None:
+        _detector = create_face_detector()
+
+    start = time.perf_counter()
+    folder = os.path.join(Config.DATASET_PATH, dataset_folder_name(student_id, name))
+    result = {
+        'studentId': student_id,
+        'name': name,
+        'source': source,
+        'folder': folder,
+        'frames': 0,
+        'faces': 0,
+        'saved': 0,
+        'total': 0,
+        'quality': '',
+        'error': None
+    }
+
+    try:
+        if not os.path.exists(source):
+            raise EnrollmentError(f"Source not found: {source}")
+
+        os.makedirs(folder, exist_ok=True)
+        number = next_image_number(folder)
+        gate = QualityGate()
+
+        for frame in iter_source_frames(source):
+            result['frames'] += 1
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            faces = _detector.detect(gray, frame)
+            if len(faces) == 0:
+                continue
+
+            result['faces'] += 1
+            box = max(faces, key=lambda b: b[2] * b[3])
+            face = normalize_face(gray, box)
+
+            accepted, _ = gate.evaluate(face)
+            if accepted and cv2.imwrite(os.path.join(folder, f"{number}.jpg"), face):
+                number += 1
+                result['saved'] += 1
+                if result['saved'] >= target:
+                    break
+
+        result['quality'] = gate.summary()
+        result['total'] = len([f for f in os.listdir(folder) if f.lower().endswith(PHOTO_EXTENSIONS)])
+    except Exception as e:
+        result['error'] = str(e)
+
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def offline_enroll(mapping_file, workers=None, target=None):
+    """Enroll every student in the mapping and print a report"""
+    print("=" * 70)
+    print("🎞️  SMART ATTENDANCE - OFFLINE ENROLLMENT")
+    print("=" * 70)
+
+    try:
+        mapping = load_mapping(mapping_file)
+    except (EnrollmentError, ValueError) as e:
+        print(f"❌ {e}")
+        return None
+
+    target = target or Config.REQUIRED_IMAGES_PER_STUDENT
+    registry = get_registry()
+    db = {student_id: registry.get(student_id) for student_id in mapping}
+
+    unknown = [student_id for student_id, info in db.items() if info is None]
+    for student_id in unknown:
+        print(f"⚠️  Not registered, skipped: {student_id}")
+    jobs = {student_id: source for student_id, source in mapping.items() if db[student_id]}
+
+    if not jobs:
+        print("❌ No registered students in the mapping.")
+        return None
+
+    workers = min(workers or Config.OFFLINE_WORKERS or os.cpu_count() or 1, len(jobs))
+    print(f"👥 Students: {len(jobs)}  |  Workers: {workers}  |  Target: {target} images each")
+    print("-" * 70)
+
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(enroll_from_source, student_id, db[student_id]['name'], source, target)
+            for student_id, source in jobs.items()
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result['error']:
+                print(f"❌ {result['name']}: {result['error']}")
+            else:
+                print(f"✅ {result['name']}: {result['saved']} saved from {result['frames']} frames "
+                      f"({result['seconds']:.1f}s)")
+                print(f"   🎯 {result['quality']}")
+    elapsed = time.perf_counter() - start
+
+    updates = {
+        r['studentId']: (r['total'], r['folder'])
+        for r in results
+        if not r['error'] and r['total'] >= Config.MIN_IMAGES_PER_STUDENT
+    }
+    update_student_images(updates)
+
+    print("\n" + "=" * 70)
+    print("📊 PER-STUDENT YIELD")
+    print("=" * 70)
+    print(f"{'Student':<22} {'Frames':>7} {'Faces':>7} {'Saved':>7} {'Yield':>7} {'Total':>7}  Status")
+    print("-" * 70)
+    for r in sorted(results, key=lambda r: r['name']):
+        if r['error']:
+            status = "error"
+        elif r['studentId'] in updates:
+            status = "enrolled"
+        else:
+            status = f"< {Config.MIN_IMAGES_PER_STUDENT} images"
+        face_yield = r['saved'] / r['frames'] * 100 if r['frames'] else 0.0
+        print(f"{r['name'][:22]:<22} {r['frames']:>7} {r['faces']:>7} {r['saved']:>7} "
+              f"{face_yield:>6.0f}% {r['total']:>7}  {status}")
+    print("-" * 70)
+
+    minutes = elapsed / 60
+    print(f"✅ Enrolled: {len(updates)} / {len(jobs)} students")
+    print(f"⏱️  {elapsed:.1f}s wall time ({len(jobs) / minutes if minutes else 0:.1f} students/min)")
+    print("Yield = saved images / frames read")
+    if updates:
+        print("\n📝 NEXT STEP: Train the model: python train_model.py")
+    print("=" * 70)
+    return results
+
+
+def main():
+    args = sys.argv[1:]
+    workers = None
+    if "--workers" in args:
+        i = args.index("--workers")
+        try:
+            workers = int(args[i + 1])
+        except (IndexError, ValueError):
+            print("❌ --workers needs a number")
+            sys.exit(1)
+        del args[i:i + 2]
+
+    if len(args) != 1:
+        print(__doc__)
+        sys.exit(1)
+
+    if offline_enroll(args[0], workers=workers) is None:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Smart Attendance System - Prediction Cache
+Reuses recognizer results for near-identical face crops
+"""
+
+import time
+from collections import OrderedDict
+from config import Config
+from face_utils import dhash, hamming_distance
+
+
+class PredictionCache:
+    """
+    LRU cache of (label, confidence) keyed by perceptual hash
+
+    Key = (coarse position bucket, dHash of the crop). A lookup hits when
+    an entry in the same bucket is within max_distance bits and younger
+    than the TTL. Seated students produce almost the same crop every
+    frame, so most of their predictions come straight from here.
+    """
+
+    def __init__(self, max_size=None, ttl_seconds=None, max_distance=None,
+                 bucket_size=None, clock=time.monotonic):
+        self.max_size = max_size if max_size is not None else Config.PREDICTION_CACHE_SIZE
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.PREDICTION_CACHE_TTL_SECONDS
+        self.max_distance = max_distance if max_distance is not None else Config.PREDICTION_CACHE_MAX_DISTANCE
+        self.bucket_size = bucket_size if bucket_size is not None else Config.PREDICTION_CACHE_POSITION_BUCKET
+        self.clock = clock
+
+        # (bucket, hash) -> (label, confidence, stored_at), oldest first
+        self._entries = OrderedDict()
+        # bucket -> set of hashes, for near-match scans
+        self._buckets = {}
+
+        # Session statistics
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+        self._predict_cost_ms = 0.0
+
+    def make_key(self, gray_face, bbox):
+        """Cache key for a face crop at a frame position"""
+        x, y, w, h = bbox
+        cx = (x + w // 2) // self.bucket_size
+        cy = (y + h // 2) // self.bucket_size
+        return (cx, cy), dhash(gray_face)
+
+    def get(self, key):
+        """Return (label, confidence) for a near-identical crop, or None"""
+        bucket, face_hash = key
+        now = self.clock()
+
+        match = None
+        if key in self._entries:
+            match = key
+        else:
+            best = self.max_distance + 1
+            for other in self._buckets.get(bucket, ()):
+                distance = hamming_distance(face_hash, other)
+                if distance < best:
+                    best = distance
+                    match = (bucket, other)
+
+        if match is not None:
+            label, confidence, stored_at = self._entries[match]
+            if now - stored_at <= self.ttl_seconds:
+                self._entries.move_to_end(match)
+                self.hits += 1
+                self.saved_ms += self._predict_cost_ms
+                return label, confidence
+            self._remove(match)
+
+        self.misses += 1
+        return None
+
+    def put(self, key, label, confidence, predict_ms=None):
+        """Store a fresh prediction"""
+        bucket, face_hash = key
+
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        self._entries[key] = (label, confidence, self.clock())
+        self._buckets.setdefault(bucket, set()).add(face_hash)
+
+        # Average real predict cost = what each hit saves
+        if predict_ms is not None:
+            if self._predict_cost_ms == 0.0:
+                self._predict_cost_ms = predict_ms
+            else:
+                self._predict_cost_ms = 0.8 * self._predict_cost_ms + 0.2 * predict_ms
+
+        while len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def clear(self):
+        """Drop all entries (e.g. after the model changes)"""
+        self._entries.clear()
+        self._buckets.clear()
+
+    def _remove(self, key):
+        bucket, face_hash = key
+        del self._entries[key]
+        hashes = self._buckets.get(bucket)
+        if hashes is not None:
+            hashes.discard(face_hash)
+            if not hashes:
+                del self._buckets[bucket]
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def summary(self):
+        """Session statistics"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hit_rate * 100, 1),
+            'saved_ms': round(self.saved_ms, 1),
+            'entries': len(self._entries)
+        }
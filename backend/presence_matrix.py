@@ -0,0 +1,238 @@
+"""
+Smart Attendance System - Presence Matrix
+Per-class presence bitsets for absentee lists and semester reports
+
+Each class has one row per day it was held and one bit per roster
+student, packed with np.packbits (8 students per byte). Present counts
+are byte popcounts; absentees, streaks and percentages come from
+unpacking only the rows of the requested date range.
+
+Matrices are built from the columnar attendance store and then updated
+with only the marks stored since the last look. Today's marks are also
+taken from the attendance store (the record of truth), so a batch the
+recognizer has not yet copied to the columnar store is never missed.
+"""
+
+import threading
+import numpy as np
+from config import Config
+from attendance_columnar import get_columnar_store, day_number, day_string
+
+# Set bits in every byte value
+POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint16)
+
+
+def registration_day(registered):
+    """Day number of a 'YYYY-MM-DD ...' registration date, or None"""
+    try:
+        return day_number(str(registered)[:10])
+    except ValueError:
+        return None
+
+
+class PresenceMatrix:
+    """
+    Days x students presence bits for one class roster
+
+    roster: [{'rollNo', 'name', 'registered'}] - bit i is roster[i].
+    """
+
+    def __init__(self, roster):
+        self.rolls = [student['rollNo'] for student in roster]
+        self.names = [student['name'] for student in roster]
+        self.size = len(self.rolls)
+        self.width = max(1, (self.size + 7) // 8)
+
+        # Students are not counted absent before they registered
+        minimum = np.iinfo(np.int32).min
+        self.registered = np.array(
+            [registration_day(student.get('registered')) or minimum for student in roster],
+            dtype=np.int64
+        )
+
+        self.days = np.zeros(0, dtype=np.int32)
+        self.bits = np.zeros((0, self.width), dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.days)
+
+    def mark(self, days, positions):
+        """Set the bits for (day, roster position) pairs; new days get a row"""
+        if len(days) == 0:
+            return
+        days = np.asarray(days, dtype=np.int32)
+        positions = np.asarray(positions, dtype=np.int64)
+
+        new_days = np.setdiff1d(np.unique(days), self.days)
+        if len(new_days):
+            # Usually appended at the end; np.insert keeps out-of-order days sorted
+            at = np.searchsorted(self.days, new_days)
+            self.days = np.insert(self.days, at, new_days)
+            self.bits = np.insert(self.bits, at, 0, axis=0)
+
+        rows = np.searchsorted(self.days, days)
+        # np.packbits order: bit 0 is the most significant bit of byte 0
+        np.bitwise_or.at(self.bits, (rows, positions >> 3),
+                         (np.uint8(0x80) >> (positions & 7)).astype(np.uint8))
+
+    def _row_range(self, first_day=None, last_day=None):
+        start = 0 if first_day is None else np.searchsorted(self.days, first_day, side='left')
+        end = len(self.days) if last_day is None else np.searchsorted(self.days, last_day, side='right')
+        return start, end
+
+    def present_on(self, day):
+        """(held, bool array over the roster)"""
+        row = np.searchsorted(self.days, day)
+        if row >= len(self.days) or self.days[row] != day:
+            return False, np.zeros(self.size, dtype=bool)
+        return True, np.unpackbits(self.bits[row], count=self.size).astype(bool)
+
+    def daily_counts(self, first_day=None, last_day=None):
+        """(days, present counts) - byte popcounts per row"""
+        start, end = self._row_range(first_day, last_day)
+        return self.days[start:end], POPCOUNT[self.bits[start:end]].sum(axis=1)
+
+    def summary(self, first_day=None, last_day=None):
+        """
+        Per-student totals over a date range
+
+        Returns:
+            dict of roster-length arrays: present, held (days the student
+            could attend), current_absent_streak, longest_absent_streak
+        """
+        start, end = self._row_range(first_day, last_day)
+        days = self.days[start:end]
+        present = np.unpackbits(self.bits[start:end], axis=1, count=self.size).astype(bool)
+        count = len(days)
+
+        if count == 0 or self.size == 0:
+            zeros = np.zeros(self.size, dtype=np.int64)
+            return {'present': zeros, 'held': zeros, 'current_absent_streak': zeros,
+                    'longest_absent_streak': zeros}
+
+        # Days before registration do not count, unless the student was marked earlier
+        first_present = np.where(present.any(axis=0), days[present.argmax(axis=0)], np.iinfo(np.int32).max)
+        starts = np.minimum(self.registered, first_present)
+        eligible = days[:, None] >= starts[None, :]
+
+        # Absence runs: day index minus the index of the last day not absent
+        absent = eligible & ~present
+        index = np.arange(count)[:, None]
+        last_not_absent = np.maximum.accumulate(np.where(absent, -1, index), axis=0)
+        runs = index - last_not_absent
+
+        return {
+            'present': present.sum(axis=0),
+            'held': eligible.sum(axis=0),
+            'current_absent_streak': runs[-1],
+            'longest_absent_streak': runs.max(axis=0)
+        }
+
+
+class PresenceMatrixCache:
+    """
+    One PresenceMatrix per class, kept up to date from the columnar store
+
+    A matrix is rebuilt when the class roster changes or the store's
+    generation does (rebuild / compaction); otherwise only events stored
+    since the last call are added.
+    """
+
+    def __init__(self, columnar=None):
+        self._columnar = columnar
+        self._entries = {}  # (branch, section) -> [matrix, position, store generation]
+        self._lock = threading.Lock()
+
+    @property
+    def columnar(self):
+        if self._columnar is None:
+            self._columnar = get_columnar_store()
+        return self._columnar
+
+    def matrix(self, branch, section, roster, today=None):
+        """
+        Current PresenceMatrix for a class; roster as in RegistrySnapshot.roster()
+
+        today: optional (date, roll numbers) from the attendance store, marked
+        on top of the columnar events
+        """
+        key = (branch, section)
+        rolls = [student['rollNo'] for student in roster]
+        with self._lock:
+            self.columnar.columns()
+            generation = self.columnar.generation
+            entry = self._entries.get(key)
+            if entry is None or entry[0].rolls != rolls or entry[2] != generation:
+                # New class, changed roster, or the store was rebuilt / compacted
+                entry = self._entries[key] = [PresenceMatrix(roster), 0, generation]
+
+            matrix, position = entry[0], entry[1]
+            student, day, seconds, end = self.columnar.events_since(branch, section, position)
+            if len(student):
+                # Columnar student code -> roster bit (-1 = not on the roster)
+                lookup = np.full(int(student.max()) + 1, -1, dtype=np.int64)
+                for index, roll in enumerate(rolls):
+                    code = self.columnar.student_code(roll)
+                    if code is not None and code < len(lookup):
+                        lookup[code] = index
+                bits = lookup[student]
+                on_roster = bits >= 0
+                matrix.mark(day[on_roster], bits[on_roster])
+            entry[1] = end
+
+            if today is not None:
+                date, marked = today
+                positions = {roll: index for index, roll in enumerate(rolls)}
+                bits = [positions[roll] for roll in marked if roll in positions]
+                matrix.mark([day_number(date)] * len(bits), bits)
+            return matrix
+
+
+def absentee_report(matrix, date):
+    """Present and absent students of a class on one date"""
+    held, present = matrix.present_on(day_number(date))
+    students = [{'name': name, 'rollNo': roll} for name, roll in zip(matrix.names, matrix.rolls)]
+    return {
+        'held': held,
+        'present': [student for student, here in zip(students, present) if here],
+        'absent': [student for student, here in zip(students, present) if not here]
+    }
+
+
+def semester_report(matrix, first_date=None, last_date=None):
+    """Per-student attendance, percentage and absence streaks over a date range"""
+    first_day = day_number(first_date) if first_date else None
+    last_day = day_number(last_date) if last_date else None
+    totals = matrix.summary(first_day, last_day)
+    days, counts = matrix.daily_counts(first_day, last_day)
+
+    students = []
+    for index, (name, roll) in enumerate(zip(matrix.names, matrix.rolls)):
+        held = int(totals['held'][index])
+        present = int(totals['present'][index])
+        students.append({
+            'name': name,
+            'rollNo': roll,
+            'present': present,
+            'held': held,
+            'percentage': round(present / held * 100, 2) if held else 0,
+            'currentAbsentStreak': int(totals['current_absent_streak'][index]),
+            'longestAbsentStreak': int(totals['longest_absent_streak'][index])
+        })
+
+    return {
+        'daysHeld': len(days),
+        'firstDay': day_string(days[0]) if len(days) else None,
+        'lastDay': day_string(days[-1]) if len(days) else None,
+        'averagePresent': round(float(counts.mean()), 2) if len(counts) else 0,
+        'students': students
+    }
+
+
+def below_threshold(report, threshold=None):
+    """Students of a semester_report under the attendance threshold, lowest first"""
+    threshold = Config.ATTENDANCE_MIN_PERCENTAGE if threshold is None else threshold
+    return sorted(
+        (student for student in report['students'] if student['held'] and student['percentage'] < threshold),
+        key=lambda student: (student['percentage'], student['rollNo'])
+    )
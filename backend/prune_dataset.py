@@ -0,0 +1,208 @@
+"""
+Smart Attendance System - Dataset Pruning
+Remove near-duplicate face images captured while a student held still
+
+Usage: python prune_dataset.py [--dry-run] [--max-distance N] [--workers N]
+
+Pruned images are moved to backups/pruned/<timestamp>/<student>/, not deleted.
+"""
+
+import multiprocessing
+import ntpath
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+import cv2
+from config import Config
+from face_utils import NearDuplicateFilter
+from student_registry import get_registry
+from train_model import list_student_images
+
+
+def capture_order_key(path):
+    """Sort 1.jpg, 2.jpg, ... 10.jpg in the order they were captured"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return (0, int(stem), "") if stem.isdigit() else (1, 0, stem)
+
+
+def find_near_duplicates(image_paths, max_distance, hash_size=8, min_keep=0):
+    """
+    Split one student's images into kept and near-duplicate
+
+    Images are visited in capture order; an image is a duplicate when its
+    dHash is within max_distance bits of an image already kept. If that
+    would leave fewer than min_keep images, the most distinct duplicates
+    are kept as well.
+
+    Returns:
+        (kept_paths, duplicate_paths, unreadable_paths)
+    """
+    dedup = NearDuplicateFilter(max_distance, hash_size)
+    kept, duplicates, unreadable = [], [], []
+
+    for path in sorted(image_paths, key=capture_order_key):
+        gray = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            unreadable.append(path)
+            continue
+
+        is_duplicate, face_hash = dedup.check(gray)
+        if is_duplicate:
+            duplicates.append((path, face_hash))
+        else:
+            dedup.add(face_hash)
+            kept.append(path)
+
+    if len(kept) < min_keep and duplicates:
+        duplicates.sort(key=lambda d: dedup.nearest_distance(d[1]), reverse=True)
+        restore = min_keep - len(kept)
+        kept.extend(path for path, _ in duplicates[:restore])
+        duplicates = duplicates[restore:]
+
+    return kept, [path for path, _ in duplicates], unreadable
+
+
+def _prune_student(task):
+    """Pool worker: (name, paths, max_distance, hash_size, min_keep) -> result dict"""
+    name, image_paths, max_distance, hash_size, min_keep = task
+    kept, duplicates, unreadable = find_near_duplicates(image_paths, max_distance, hash_size, min_keep)
+    return {
+        'name': name,
+        'before': len(image_paths),
+        'kept': kept,
+        'duplicates': duplicates,
+        'unreadable': unreadable
+    }
+
+
+def analyze_dataset(dataset_path, max_distance=None, workers=None, hash_size=None, min_keep=None):
+    """
+    Find near-duplicates for every student, in parallel across students
+
+    Returns:
+        List of per-student result dicts, sorted by student name
+    """
+    max_distance = Config.DEDUP_MAX_DISTANCE if max_distance is None else max_distance
+    hash_size = hash_size or Config.DEDUP_HASH_SIZE
+    min_keep = Config.PRUNE_MIN_IMAGES if min_keep is None else min_keep
+
+    tasks = [
+        (name, paths, max_distance, hash_size, min_keep)
+        for name, paths in list_student_images(dataset_path)
+    ]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+
+    if workers <= 1:
+        results = [_prune_student(task) for task in tasks]
+    else:
+        with multiprocessing.get_context("spawn").Pool(workers) as pool:
+            results = list(pool.imap_unordered(_prune_student, tasks))
+
+    return sorted(results, key=lambda r: r['name'])
+
+
+def move_to_backup(results, backup_root):
+    """Move duplicate images out of the dataset (keeps the folder layout)"""
+    bytes_moved = 0
+    for result in results:
+        if not result['duplicates']:
+            continue
+        target = os.path.join(backup_root, result['name'])
+        os.makedirs(target, exist_ok=True)
+        for path in result['duplicates']:
+            bytes_moved += os.path.getsize(path)
+            shutil.move(path, os.path.join(target, os.path.basename(path)))
+    return bytes_moved
+
+
+def update_images_count(results):
+    """Store the new image counts in the student registry"""
+    registry = get_registry()
+    kept = {result['name']: len(result['kept']) for result in results}
+    updates = {}
+    for student_id, info in registry.all().items():
+        # datasetPath may have been written on Windows
+        folder = ntpath.basename(info.get('datasetPath', '')) or info.get('name')
+        if folder in kept and info.get('imagesCount') != kept[folder]:
+            updates[student_id] = (kept[folder], info.get('datasetPath', ''))
+
+    return registry.update_images(updates)
+
+
+def prune_dataset(max_distance=None, workers=None, dry_run=False):
+    """Prune Config.DATASET_PATH and print a report"""
+    print("=" * 70)
+    print("🧹 SMART ATTENDANCE - DATASET PRUNING")
+    print("=" * 70)
+
+    if not os.path.exists(Config.DATASET_PATH):
+        print(f"❌ Dataset folder not found: {Config.DATASET_PATH}")
+        return None
+
+    max_distance = Config.DEDUP_MAX_DISTANCE if max_distance is None else max_distance
+    print(f"🔍 Near-duplicate = dHash within {max_distance} bits of a kept image")
+    print(f"🛡️  Keeping at least {Config.PRUNE_MIN_IMAGES} images per student")
+
+    start = time.perf_counter()
+    results = analyze_dataset(Config.DATASET_PATH, max_distance=max_distance, workers=workers)
+    elapsed = time.perf_counter() - start
+
+    if not results:
+        print("📭 No student folders found.")
+        return results
+
+    print(f"\n{'Student':<25} {'Before':>8} {'After':>8} {'Removed':>8}")
+    print("-" * 70)
+    for result in results:
+        removed = len(result['duplicates'])
+        print(f"{result['name']:<25} {result['before']:>8} {len(result['kept']):>8} {removed:>8}")
+        for path in result['unreadable']:
+            print(f"   ⚠️ Could not load: {os.path.basename(path)}")
+    print("-" * 70)
+
+    before = sum(r['before'] for r in results)
+    removed = sum(len(r['duplicates']) for r in results)
+    print(f"📸 {removed} of {before} images are near-duplicates ({removed / max(before, 1) * 100:.1f}%)")
+    print(f"⏱️  Analyzed {len(results)} students in {elapsed:.1f}s")
+
+    if dry_run:
+        print("\n🔎 Dry run - nothing was moved")
+    elif removed:
+        backup_root = os.path.join(Config.PRUNED_IMAGES_PATH, datetime.now().strftime("%Y%m%d_%H%M%S"))
+        bytes_moved = move_to_backup(results, backup_root)
+        updated = update_images_count(results)
+        print(f"\n📦 Moved {removed} images ({bytes_moved / (1024 * 1024):.1f} MB) to: {backup_root}")
+        print(f"💾 Updated image counts for {updated} students")
+        print("\n📝 NEXT STEP: retrain the model: python train_model.py")
+
+    print("=" * 70)
+    return results
+
+
+def parse_args(args):
+    """--dry-run, --max-distance N, --workers N"""
+    options = {'dry_run': False, 'max_distance': None, 'workers': None}
+    i = 0
+    while i < len(args):
+        if args[i] == "--dry-run":
+            options['dry_run'] = True
+        elif args[i] in ("--max-distance", "--workers") and i + 1 < len(args):
+            options[args[i][2:].replace("-", "_")] = int(args[i + 1])
+            i += 1
+        else:
+            raise ValueError(f"Unknown option: {args[i]}")
+        i += 1
+    return options
+
+
+if __name__ == "__main__":
+    try:
+        options = parse_args(sys.argv[1:])
+    except ValueError as e:
+        print(f"❌ {e}")
+        print(__doc__)
+        sys.exit(1)
+
+    prune_dataset(**options)
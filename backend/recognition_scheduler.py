@@ -0,0 +1,112 @@
+"""
+Smart Attendance System - Recognition Scheduler
+Spends a fixed per-frame predict budget on the faces that need it most
+"""
+
+import time
+from config import Config
+
+
+class RecognitionScheduler:
+    """
+    Prioritized recognition queue
+
+    Faces are ranked by:
+    - whether they are still unidentified / unmarked
+    - face size (large faces recognize more reliably)
+    - time since their last prediction
+    - how unsure the previous prediction was
+
+    Only as many faces as fit in the frame budget are recognized;
+    the rest keep their previous result and are retried on later frames.
+    """
+
+    def __init__(self, budget_ms=None, threshold=None, weights=None, clock=time.perf_counter):
+        self.budget_ms = budget_ms if budget_ms is not None else Config.RECOGNITION_FRAME_BUDGET_MS
+        self.threshold = threshold if threshold is not None else Config.RECOGNITION_CONFIDENCE_THRESHOLD
+        self.weights = dict(Config.RECOGNITION_PRIORITY_WEIGHTS)
+        if weights:
+            self.weights.update(weights)
+        self.clock = clock
+
+        # Running estimate of one predict call (exponential moving average)
+        self.predict_cost_ms = Config.RECOGNITION_INITIAL_COST_MS
+
+        # Per-frame accounting
+        self._frame_spent_ms = 0.0
+        self._frame_predictions = 0
+
+        # Session statistics
+        self.frames = 0
+        self.predictions = 0
+        self.deferred = 0
+
+    def priority(self, track, now, frame_area):
+        """Priority score for a track (higher = recognize sooner)"""
+        unmarked = 0.0 if track.settled else 1.0
+
+        # A face covering ~10% of the frame gets full size credit
+        size = min(1.0, track.area / (frame_area * 0.1)) if frame_area else 0.0
+
+        if track.last_predicted is None:
+            staleness = 1.0
+            uncertainty = 1.0
+        else:
+            age = now - track.last_predicted
+            staleness = min(1.0, age / Config.RECOGNITION_STALENESS_CAP_SECONDS)
+            # LBPH confidence is a distance: larger = less sure
+            uncertainty = min(1.0, track.confidence / (2.0 * self.threshold))
+
+        w = self.weights
+        return (w['unmarked'] * unmarked +
+                w['size'] * size +
+                w['staleness'] * staleness +
+                w['confidence'] * uncertainty)
+
+    def rank(self, tracks, now, frame_area):
+        """Return tracks ordered by recognition priority"""
+        return sorted(
+            tracks,
+            key=lambda track: self.priority(track, now, frame_area),
+            reverse=True
+        )
+
+    def start_frame(self):
+        """Reset the per-frame budget"""
+        self.frames += 1
+        self._frame_spent_ms = 0.0
+        self._frame_predictions = 0
+
+    def can_afford(self):
+        """Whether another predict fits in this frame's budget"""
+        # Always allow one prediction so no frame makes zero progress
+        if self._frame_predictions == 0:
+            return True
+        return self._frame_spent_ms + self.predict_cost_ms <= self.budget_ms
+
+    def record_prediction(self, track, label, confidence, elapsed_ms, now, cached=False):
+        """Store a prediction result on the track and charge the budget"""
+        track.label = label
+        track.confidence = confidence
+        track.last_predicted = now
+
+        self._frame_spent_ms += elapsed_ms
+        self._frame_predictions += 1
+        self.predictions += 1
+
+        # Cache hits say nothing about the real predict cost
+        if not cached:
+            self.predict_cost_ms = 0.8 * self.predict_cost_ms + 0.2 * elapsed_ms
+
+    def defer(self, count):
+        """Record faces pushed to a later frame"""
+        self.deferred += count
+
+    def summary(self):
+        """Session statistics"""
+        return {
+            'frames': self.frames,
+            'predictions': self.predictions,
+            'deferred': self.deferred,
+            'predict_cost_ms': round(self.predict_cost_ms, 2)
+        }
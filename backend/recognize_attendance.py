@@ -4,39 +4,46 @@ Fixed camera with accurate attendance tracking
 """
 
 import cv2
-import csv
-import os
 import sys
-import json
 import time
 from datetime import datetime
 from collections import deque
 from config import Config
-
-
-def load_student_database():
-    """Load student database"""
-    if os.path.exists(Config.STUDENT_DB):
-        try:
-            with open(Config.STUDENT_DB, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            return {}
-    return {}
-
-
-def batch_write_attendance(queue, filename):
+from face_detectors import create_face_detector, DetectorError
+from face_tracking import FaceTracker
+from recognition_scheduler import RecognitionScheduler
+from prediction_cache import PredictionCache
+from recognizer_backends import load_model, ModelError
+from model_reloader import ModelWatcher
+from student_registry import get_registry
+from attendance_store import get_attendance_store, AttendanceStoreError
+from attendance_columnar import ColumnarAttendanceStore, get_columnar_store
+from attendance_ipc import MarkPublisher
+
+
+def batch_write_attendance(queue, store, columnar=None):
     """Write attendance records in batch"""
     if not queue:
         return
     
     try:
-        with open(filename, "a", newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            while queue:
-                writer.writerow(queue.popleft())
+        rows = list(queue)
+        store.append(rows)
+        queue.clear()
     except Exception as e:
         print(f"❌ Error writing attendance: {e}")
+        return
+    
+    # Analytics copy; the attendance store above is the record of truth
+    if columnar is not None:
+        try:
+            columnar.append(rows)
+        except Exception as e:
+            print(f"⚠️ Analytics store not updated ({e}) - run: python attendance_columnar.py rebuild")
+            try:
+                columnar.mark_stale(f"a batch of marks was not stored: {e}")
+            except OSError:
+                pass
 
 
 print("=" * 70)
@@ -56,77 +63,70 @@ print(f"✅ Branch: {branch}")
 print(f"✅ Section: {section}")
 
 # Load student database
-student_db = load_student_database()
+student_db = get_registry().all()
 print(f"✅ Loaded database with {len(student_db)} students")
 
 # Load trained recognizer
-recognizer = cv2.face.LBPHFaceRecognizer_create()
-
-if not os.path.exists(Config.TRAINER_MODEL):
-    print(f"❌ Error: {Config.TRAINER_MODEL} not found. Please train the model first.")
-    sys.exit(1)
-
 try:
-    recognizer.read(Config.TRAINER_MODEL)
-    print("✅ Model loaded successfully")
-except Exception as e:
+    model = load_model()
+    print(f"✅ Model loaded successfully ({model.backend}, threshold {model.threshold})")
+except ModelError as e:
     print(f"❌ Error loading model: {e}")
     sys.exit(1)
 
-# Load face cascade
-face_cascade = cv2.CascadeClassifier(
-    cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-)
-
-if face_cascade.empty():
-    print("❌ Error: Could not load face cascade")
+# Load face detector
+try:
+    face_detector = create_face_detector()
+except DetectorError as e:
+    print(f"❌ Error: {e}")
     sys.exit(1)
 
-print("✅ Face cascade loaded")
-
-# Load label mapping and student info
-label_map = {}
-name_to_info = {}
-label_id = 0
-
-if not os.path.exists(Config.DATASET_PATH):
-    print(f"❌ Error: {Config.DATASET_PATH} folder not found")
-    sys.exit(1)
+print(f"✅ Face detector loaded ({face_detector.name})")
 
-for person_name in os.listdir(Config.DATASET_PATH):
-    person_folder = os.path.join(Config.DATASET_PATH, person_name)
-    if os.path.isdir(person_folder):
-        label_map[label_id] = person_name
-        
+def build_student_lookup(label_map):
+    """Map each model label's student folder to its database record"""
+    lookup = {}
+    
+    for person_name in label_map.values():
         # Find student info in database
         student_id = person_name.lower().replace(" ", "_")
         if student_id in student_db:
-            name_to_info[person_name] = student_db[student_id]
+            lookup[person_name] = student_db[student_id]
         else:
             # Search by name (case insensitive)
             found = False
             for sid, info in student_db.items():
                 if info.get('name', '').lower() == person_name.lower():
-                    name_to_info[person_name] = info
+                    lookup[person_name] = info
                     found = True
                     break
             
             if not found:
-                name_to_info[person_name] = {
+                lookup[person_name] = {
                     'rollNo': 'N/A',
                     'branch': 'UNKNOWN',
                     'section': 'UNKNOWN'
                 }
-        
-        label_id += 1
+    
+    return lookup
+
+
+def students_in_class(lookup):
+    """Students from the lookup that belong to the selected class"""
+    return {
+        name: info for name, info in lookup.items()
+        if info.get('branch') == branch and info.get('section') == section
+    }
+
+
+# Load label mapping and student info
+label_map = model.label_map
+name_to_info = build_student_lookup(label_map)
 
-print(f"✅ Loaded {len(label_map)} students from dataset")
+print(f"✅ Loaded {len(label_map)} students from model")
 
 # Filter students for this class
-class_students = {
-    name: info for name, info in name_to_info.items()
-    if info.get('branch') == branch and info.get('section') == section
-}
+class_students = students_in_class(name_to_info)
 
 if not class_students:
     print(f"⚠️ WARNING: No students found for {branch}-{section} in dataset!")
@@ -134,18 +134,119 @@ if not class_students:
 else:
     print(f"✅ {len(class_students)} students belong to {branch}-{section}")
 
-# Initialize attendance file
-if not os.path.exists(Config.ATTENDANCE_CSV):
-    with open(Config.ATTENDANCE_CSV, "w", newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(["Name", "RollNo", "Branch", "Section", "Date", "Time"])
-    print("✅ Created new attendance.csv file")
+# Attendance storage (partitions are created as marks arrive)
+try:
+    attendance_store = get_attendance_store()
+except AttendanceStoreError as e:
+    print(f"❌ Error: {e}")
+    sys.exit(1)
+
+print(f"✅ Attendance storage: {attendance_store.name} ({attendance_store.location})")
+
+# Columnar copy for analytics (built from the attendance history on first use)
+if Config.ATTENDANCE_COLUMNAR_ENABLED:
+    columnar_store = get_columnar_store()
+else:
+    columnar_store = None
+    # An existing store will miss this session's marks
+    ColumnarAttendanceStore(build=False).mark_stale("marks were recorded with ATTENDANCE_COLUMNAR_ENABLED off")
+
+# Marks and counters go straight to the API too (the files are the fallback)
+publisher = MarkPublisher(branch, section)
 
 # Tracking variables
 marked_names = set()
 recognition_cooldown = {}
 attendance_queue = deque()
 
+# Faces are tracked across frames so recognition work can be prioritized
+tracker = FaceTracker()
+scheduler = RecognitionScheduler(threshold=model.threshold)
+prediction_cache = PredictionCache() if Config.PREDICTION_CACHE_ENABLED else None
+
+# Pick up retrained models without restarting the session
+model_watcher = None
+if Config.MODEL_HOT_RELOAD_ENABLED:
+    model_watcher = ModelWatcher(model.backend, model.version)
+    model_watcher.start()
+
+# Seconds from session start to each mark (time-to-mark-everyone)
+session_start = None
+mark_offsets = []
+
+# Frame rate reported with the live session counters
+session_fps = 0.0
+
+
+def session_counters(running=True):
+    """Live counters for the dashboard"""
+    return {
+        'present': len(marked_names),
+        'classSize': len(class_students),
+        'recognitions': scheduler.predictions,
+        'fps': round(session_fps, 1),
+        'elapsed': round(time.time() - session_start, 1) if session_start else 0,
+        'running': running
+    }
+
+
+def process_prediction(track, label, confidence, current_time):
+    """Turn a prediction into a display result and mark attendance"""
+    result = {
+        'name': 'Unknown',
+        'roll_no': '',
+        'color': (0, 0, 255),  # Red
+        'status': 'unknown',
+        'confidence': confidence
+    }
+    track.name = None
+    track.settled = False
+    
+    if confidence < model.threshold:
+        name = label_map.get(label, "Unknown")
+        student_info = name_to_info.get(name, {})
+        roll_no = student_info.get('rollNo', 'N/A')
+        student_branch = student_info.get('branch', 'UNKNOWN')
+        student_section = student_info.get('section', 'UNKNOWN')
+        
+        result['name'] = name
+        result['roll_no'] = roll_no
+        track.name = name
+        
+        # Check if student belongs to this class
+        if student_branch == branch and student_section == section:
+            result['color'] = (0, 255, 0)  # Green
+            result['status'] = 'correct_class'
+            
+            # Mark attendance (once per session)
+            if name not in marked_names:
+                now = datetime.now()
+                date_str = now.strftime("%Y-%m-%d")
+                time_str = now.strftime("%H:%M:%S")
+                
+                # Add to queue; the API hears about it now, the files at the next batch write
+                row = [name, roll_no, branch, section, date_str, time_str]
+                attendance_queue.append(row)
+                publisher.publish_marks([row])
+                
+                marked_names.add(name)
+                recognition_cooldown[name] = current_time
+                mark_offsets.append(time.time() - session_start)
+                
+                print(f"✅ MARKED: {name} ({roll_no}) | {branch}-{section} | {time_str}")
+            
+            result['marked'] = (name in marked_names)
+        else:
+            result['color'] = (0, 165, 255)  # Orange
+            result['status'] = 'wrong_class'
+            result['correct_class'] = f"{student_branch}-{student_section}"
+        
+        # Identified - no need to spend budget on this face again soon
+        track.settled = True
+    
+    return result
+
+
 # Start camera
 print("🎥 Opening camera...")
 cam = cv2.VideoCapture(Config.CAMERA_INDEX)
@@ -168,6 +269,7 @@ print("  • Students should look at the camera")
 print("  • Green box = Recognized and marked")
 print("  • Orange box = Wrong class")
 print("  • Red box = Unknown face")
+print("  • Grey box = Waiting to be identified")
 print("  • Press 'Q' to stop")
 print("=" * 70)
 
@@ -183,6 +285,10 @@ frame_count = 0
 # Store last detection results
 last_detection_results = []
 
+session_start = time.time()
+last_session_update = session_start
+last_session_frames = 0
+
 try:
     while True:
         ret, frame = cam.read()
@@ -192,6 +298,23 @@ try:
 
         frame_count += 1
         
+        # Swap in a retrained model between frames (marks are kept by name)
+        new_model = model_watcher.poll() if model_watcher else None
+        if new_model is not None:
+            model = new_model
+            label_map = model.label_map
+            name_to_info = build_student_lookup(label_map)
+            class_students = students_in_class(name_to_info)
+            scheduler.threshold = model.threshold
+            
+            # Old labels/results are meaningless for the new model
+            if prediction_cache is not None:
+                prediction_cache.clear()
+            for track in tracker.tracks.values():
+                track.last_predicted = None
+            
+            print(f"🔄 Model reloaded: {len(label_map)} students (version {model.version})")
+        
         # Flip for mirror effect
         frame = cv2.flip(frame, 1)
         
@@ -202,74 +325,63 @@ try:
         
         if should_process:
             gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = face_cascade.detectMultiScale(
-                gray,
-                scaleFactor=Config.FACE_DETECTION_SCALE_FACTOR,
-                minNeighbors=Config.FACE_DETECTION_MIN_NEIGHBORS,
-                minSize=Config.FACE_DETECTION_MIN_SIZE
-            )
+            faces = face_detector.detect(gray, frame)
             
-            # Store results for next frames
-            last_detection_results = []
+            now = time.monotonic()
+            tracks = tracker.update(faces, now)
+            frame_area = gray.shape[0] * gray.shape[1]
+            
+            # Recognize the highest-priority faces that fit in this frame's budget
+            scheduler.start_frame()
+            ranked = scheduler.rank(tracks, now, frame_area)
             
-            for (x, y, w, h) in faces:
+            for position, track in enumerate(ranked):
+                if not scheduler.can_afford():
+                    # The rest wait for a later frame
+                    scheduler.defer(len(ranked) - position)
+                    break
+                
+                x, y, w, h = track.bbox
                 face_img = gray[y:y+h, x:x+w]
                 
-                try:
-                    label, confidence = recognizer.predict(face_img)
-                except:
-                    continue
-
-                result = {
-                    'bbox': (x, y, w, h),
-                    'name': 'Unknown',
-                    'roll_no': '',
-                    'color': (0, 0, 255),  # Red
-                    'status': 'unknown',
-                    'confidence': confidence
-                }
-
-                if confidence < Config.RECOGNITION_CONFIDENCE_THRESHOLD:
-                    name = label_map.get(label, "Unknown")
-                    student_info = name_to_info.get(name, {})
-                    roll_no = student_info.get('rollNo', 'N/A')
-                    student_branch = student_info.get('branch', 'UNKNOWN')
-                    student_section = student_info.get('section', 'UNKNOWN')
-                    
-                    result['name'] = name
-                    result['roll_no'] = roll_no
-                    
-                    # Check if student belongs to this class
-                    if student_branch == branch and student_section == section:
-                        result['color'] = (0, 255, 0)  # Green
-                        result['status'] = 'correct_class'
-                        
-                        # Check cooldown
-                        last_mark_time = recognition_cooldown.get(name)
-                        time_since_last_mark = 999
-                        if last_mark_time:
-                            time_since_last_mark = (current_time - last_mark_time).total_seconds()
-                        
-                        # Mark attendance (once per session or after cooldown)
-                        if name not in marked_names:
-                            now = datetime.now()
-                            date_str = now.strftime("%Y-%m-%d")
-                            time_str = now.strftime("%H:%M:%S")
-                            
-                            # Add to queue
-                            attendance_queue.append([name, roll_no, branch, section, date_str, time_str])
-                            
-                            marked_names.add(name)
-                            recognition_cooldown[name] = current_time
-                            
-                            print(f"✅ MARKED: {name} ({roll_no}) | {branch}-{section} | {time_str}")
-                        
-                        result['marked'] = (name in marked_names)
-                    else:
-                        result['color'] = (0, 165, 255)  # Orange
-                        result['status'] = 'wrong_class'
-                        result['correct_class'] = f"{student_branch}-{student_section}"
+                predict_start = time.perf_counter()
+                cached = None
+                if prediction_cache is not None:
+                    cache_key = prediction_cache.make_key(face_img, track.bbox)
+                    cached = prediction_cache.get(cache_key)
+                
+                if cached is not None:
+                    label, confidence = cached
+                else:
+                    try:
+                        label, confidence = model.predict(face_img)
+                    except:
+                        continue
+                elapsed_ms = (time.perf_counter() - predict_start) * 1000
                 
+                if cached is None and prediction_cache is not None:
+                    prediction_cache.put(cache_key, label, confidence, elapsed_ms)
+                
+                scheduler.record_prediction(track, label, confidence, elapsed_ms, now,
+                                            cached=cached is not None)
+                track.result = process_prediction(track, label, confidence, current_time)
+            
+            # Store results for next frames (deferred faces keep their last result)
+            last_detection_results = []
+            
+            for track in tracks:
+                if track.result is None:
+                    result = {
+                        'name': 'Identifying...',
+                        'roll_no': '',
+                        'color': (200, 200, 200),  # Grey
+                        'status': 'pending',
+                        'confidence': None
+                    }
+                else:
+                    result = dict(track.result)
+                
+                result['bbox'] = track.bbox
                 last_detection_results.append(result)
         
         # Draw ALL detections on EVERY frame
@@ -299,6 +411,10 @@ try:
                 cv2.putText(frame, f"Should be: {result.get('correct_class', '')}", (x, y+h+20),
                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
             
+            elif status == 'pending':
+                cv2.putText(frame, name, (x, y-10),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+            
             else:  # Unknown
                 cv2.putText(frame, "Unknown", (x, y-10),
                            cv2.FONT_HERSHEY_SIMPLEX, 0.9, color, 2)
@@ -325,7 +441,14 @@ try:
         
         # Batch write every N frames
         if frame_count % Config.BATCH_WRITE_INTERVAL == 0 and attendance_queue:
-            batch_write_attendance(attendance_queue, Config.ATTENDANCE_CSV)
+            batch_write_attendance(attendance_queue, attendance_store, columnar_store)
+        
+        # Live counters for the dashboard
+        if last_frame_time - last_session_update >= Config.IPC_SESSION_INTERVAL:
+            session_fps = (frame_count - last_session_frames) / (last_frame_time - last_session_update)
+            last_session_update = last_frame_time
+            last_session_frames = frame_count
+            publisher.publish_session(session_counters())
 
 except KeyboardInterrupt:
     print("\n⏹️ Stopped by user (Ctrl+C)")
@@ -336,9 +459,13 @@ except Exception as e:
 finally:
     # Final batch write
     if attendance_queue:
-        batch_write_attendance(attendance_queue, Config.ATTENDANCE_CSV)
+        batch_write_attendance(attendance_queue, attendance_store, columnar_store)
+    publisher.publish_session(session_counters(running=False))
+    publisher.close()
     
     # Release resources
+    if model_watcher:
+        model_watcher.stop()
     cam.release()
     cv2.destroyAllWindows()
 
@@ -348,6 +475,27 @@ print("=" * 70)
 print(f"📊 Class: {branch}-{section}")
 print(f"👥 Total Present: {len(marked_names)}")
 
+# Time-to-mark statistics
+if mark_offsets:
+    print(f"⏱️  First mark after: {mark_offsets[0]:.1f}s")
+    print(f"⏱️  Last mark after:  {mark_offsets[-1]:.1f}s")
+    if class_students and len(marked_names & set(class_students)) == len(class_students):
+        print(f"⏱️  Whole class marked in: {mark_offsets[-1]:.1f}s")
+
+stats = scheduler.summary()
+print(f"🧮 Recognitions: {stats['predictions']} | Deferred: {stats['deferred']} | "
+      f"Avg predict: {stats['predict_cost_ms']}ms")
+
+if publisher.enabled:
+    print(f"📡 Live updates sent to the API: {publisher.sent} "
+          f"({publisher.undelivered} left to the attendance files)")
+
+if prediction_cache is not None:
+    cache_stats = prediction_cache.summary()
+    print(f"🗃️  Prediction cache: {cache_stats['hit_rate']}% hit rate "
+          f"({cache_stats['hits']} hits / {cache_stats['misses']} misses) | "
+          f"Saved ~{cache_stats['saved_ms'] / 1000:.1f}s of predict time")
+
 if marked_names:
     print("\n📋 Students Present:")
     for i, name in enumerate(sorted(marked_names), 1):
@@ -358,5 +506,5 @@ else:
     print("\n⚠️ No students marked present")
 
 print("=" * 70)
-print(f"💾 Attendance saved to: {Config.ATTENDANCE_CSV}")
+print(f"💾 Attendance saved to: {attendance_store.location}")
 print("=" * 70)
\ No newline at end of file
@@ -0,0 +1,199 @@
+"""
+Smart Attendance System - Recognizer Backends
+LBPH, Eigenfaces and Fisherfaces behind one model/manifest interface
+"""
+
+import json
+import os
+from datetime import datetime
+import cv2
+from config import Config
+
+
+BACKENDS = {
+    "lbph": "Local Binary Pattern Histograms",
+    "eigen": "Eigenfaces (PCA)",
+    "fisher": "Fisherfaces (LDA)"
+}
+
+# Projection-based recognizers need every face at the same size
+FIXED_SIZE_BACKENDS = ("eigen", "fisher")
+
+
+class ModelError(Exception):
+    """Raised when a trained model cannot be created, saved or loaded"""
+    pass
+
+
+def validate_backend(backend):
+    """Return backend name or raise ModelError"""
+    if backend not in BACKENDS:
+        raise ModelError(f"Unknown recognizer '{backend}'. Allowed: {', '.join(BACKENDS)}")
+    return backend
+
+
+def create_recognizer(backend):
+    """Create an untrained OpenCV recognizer"""
+    validate_backend(backend)
+
+    if backend == "lbph":
+        return cv2.face.LBPHFaceRecognizer_create()
+    if backend == "eigen":
+        return cv2.face.EigenFaceRecognizer_create(Config.EIGEN_NUM_COMPONENTS)
+    return cv2.face.FisherFaceRecognizer_create(Config.FISHER_NUM_COMPONENTS)
+
+
+def prepare_face(gray_face, backend):
+    """Bring a grayscale crop into the form the backend was trained on"""
+    if backend in FIXED_SIZE_BACKENDS:
+        return cv2.resize(gray_face, Config.RECOGNIZER_FACE_SIZE, interpolation=cv2.INTER_AREA)
+    return gray_face
+
+
+def model_paths(backend):
+    """(model file, manifest file) for a backend"""
+    validate_backend(backend)
+
+    if backend == "lbph":
+        model_file = Config.TRAINER_MODEL
+    else:
+        model_file = os.path.join(Config.TRAINER_PATH, f"trainer_{backend}.yml")
+
+    manifest_file = os.path.splitext(model_file)[0] + ".json"
+    return model_file, manifest_file
+
+
+def temp_path_for(path):
+    """Temporary sibling of path (keeps the extension - OpenCV picks the format from it)"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.tmp-{os.getpid()}{ext}"
+
+
+def write_manifest(backend, label_map, total_images):
+    """
+    Publish the manifest for a freshly published model file
+
+    The manifest is always written last, so a new manifest version means
+    its model file is already complete. modelBytes lets readers detect a
+    model that was replaced again after the manifest was read.
+    """
+    model_file, manifest_file = model_paths(backend)
+
+    manifest = {
+        "backend": backend,
+        "version": datetime.now().strftime("%Y%m%d%H%M%S%f"),
+        "modelFile": os.path.basename(model_file),
+        "modelBytes": os.path.getsize(model_file),
+        "labels": {str(label): name for label, name in label_map.items()},
+        "faceSize": list(Config.RECOGNIZER_FACE_SIZE) if backend in FIXED_SIZE_BACKENDS else None,
+        "students": len(label_map),
+        "images": total_images,
+        "trainedDate": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+    temp_file = temp_path_for(manifest_file)
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, indent=4, fp=f)
+    os.replace(temp_file, manifest_file)
+
+    return manifest
+
+
+def save_model(recognizer, backend, label_map, total_images):
+    """
+    Save a trained recognizer and its manifest
+
+    The manifest records the backend, label -> student folder mapping and
+    preprocessing so the recognizer never has to guess them. Both files are
+    written to a temporary name and renamed into place, so a running
+    recognizer never sees a partial file.
+    """
+    model_file, manifest_file = model_paths(backend)
+    os.makedirs(os.path.dirname(model_file), exist_ok=True)
+
+    temp_file = temp_path_for(model_file)
+    try:
+        recognizer.save(temp_file)
+        os.replace(temp_file, model_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+    write_manifest(backend, label_map, total_images)
+    return model_file, manifest_file
+
+
+class TrainedModel:
+    """A loaded recognizer with its labels and threshold"""
+
+    def __init__(self, backend, recognizer, label_map, manifest=None):
+        self.backend = backend
+        self.recognizer = recognizer
+        self.label_map = label_map
+        self.manifest = manifest or {}
+        self.version = self.manifest.get("version")
+        self.threshold = Config.RECOGNIZER_THRESHOLDS[backend]
+
+    def predict(self, gray_face):
+        """Return (label, confidence) - confidence is a distance (lower = better)"""
+        return self.recognizer.predict(prepare_face(gray_face, self.backend))
+
+    def label_count(self):
+        """Distinct labels the recognizer was trained on (None if it cannot tell)"""
+        try:
+            labels = self.recognizer.getLabels()
+        except (AttributeError, cv2.error):
+            return None
+        return 0 if labels is None else len(set(labels.ravel().tolist()))
+
+
+def legacy_label_map():
+    """Label map for models trained before manifests existed"""
+    label_map = {}
+    if os.path.exists(Config.DATASET_PATH):
+        people = [
+            p for p in sorted(os.listdir(Config.DATASET_PATH))
+            if os.path.isdir(os.path.join(Config.DATASET_PATH, p))
+        ]
+        label_map = dict(enumerate(people))
+    return label_map
+
+
+def load_model(backend=None):
+    """
+    Load the trained model for a backend
+
+    Raises:
+        ModelError: Model missing or unreadable
+    """
+    backend = validate_backend(backend or Config.RECOGNIZER_BACKEND)
+    model_file, manifest_file = model_paths(backend)
+
+    if not os.path.exists(model_file):
+        raise ModelError(f"{model_file} not found. Please train the model first.")
+
+    manifest = None
+    if os.path.exists(manifest_file):
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except Exception as e:
+            raise ModelError(f"Could not read manifest {manifest_file}: {e}")
+
+    # A newer model was published after this manifest - try again later
+    expected_bytes = manifest.get("modelBytes") if manifest else None
+    if expected_bytes is not None and os.path.getsize(model_file) != expected_bytes:
+        raise ModelError(f"{model_file} does not match its manifest (publish in progress?)")
+
+    recognizer = create_recognizer(backend)
+    try:
+        recognizer.read(model_file)
+    except cv2.error as e:
+        raise ModelError(f"Could not load model {model_file}: {e}")
+
+    if manifest:
+        label_map = {int(label): name for label, name in manifest["labels"].items()}
+    else:
+        label_map = legacy_label_map()
+
+    return TrainedModel(backend, recognizer, label_map, manifest)
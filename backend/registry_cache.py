@@ -0,0 +1,127 @@
+"""
+Smart Attendance System - Registry Cache
+In-process snapshot of the student registry for the API
+"""
+
+import threading
+import time
+from config import Config
+from student_registry import get_registry
+from student_search import StudentSearchIndex
+
+
+class RegistrySnapshot:
+    """
+    Every student plus the per-class views the API serves
+
+    Built once per registry version and never modified, so request
+    threads can share it without locking.
+    """
+
+    def __init__(self, version, students):
+        self.version = version
+        self.loaded_at = time.time()
+        self.students = students
+        self.total = len(students)
+
+        # (branch, section) -> class stats rows, by roll number
+        rosters = {}
+        for student_id, info in students.items():
+            rosters.setdefault((info.get('branch', 'UNKNOWN'), info.get('section', 'UNKNOWN')), []).append({
+                'name': info['name'],
+                'rollNo': info['rollNo'],
+                'images': info.get('imagesCount', 0),
+                'registered': info.get('registeredDate', 'N/A')
+            })
+        for roster in rosters.values():
+            roster.sort(key=lambda x: x['rollNo'])
+        self.rosters = rosters
+
+        self.class_counts = {key: len(roster) for key, roster in rosters.items()}
+        self.classes = [
+            {
+                'branch': branch,
+                'section': section,
+                'class': f"{branch}-{section}",
+                'students': count
+            }
+            for (branch, section), count in sorted(self.class_counts.items())
+        ]
+
+    def roster(self, branch, section):
+        return self.rosters.get((branch, section), [])
+
+    def count_in_class(self, branch, section):
+        return self.class_counts.get((branch, section), 0)
+
+
+class RegistryCache:
+    """
+    Serves RegistrySnapshots, rebuilding only when the registry changed
+
+    Change detection uses the registry's version counter (bumped by
+    every write from any process), which costs one tiny query per
+    request instead of reading every student.
+    """
+
+    def __init__(self, registry=None, enabled=None):
+        self.registry = registry or get_registry()
+        self.enabled = Config.REGISTRY_CACHE_ENABLED if enabled is None else enabled
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+        # Search index, built on the first search and then updated with
+        # only the students that changed between snapshots
+        self._search_index = None
+        self._search_students = None
+        self._search_lock = threading.Lock()
+
+        # Statistics
+        self.hits = 0
+        self.reloads = 0
+
+    def snapshot(self):
+        """Current RegistrySnapshot"""
+        snapshot = self._snapshot
+        if self.enabled and snapshot is not None and snapshot.version == self.registry.version():
+            self.hits += 1
+            return snapshot
+
+        with self._lock:
+            # Another thread may have rebuilt it while we waited
+            snapshot = self._snapshot
+            if self.enabled and snapshot is not None and snapshot.version == self.registry.version():
+                self.hits += 1
+                return snapshot
+
+            snapshot = RegistrySnapshot(*self.registry.versioned_all())
+            self._snapshot = snapshot
+            self.reloads += 1
+            return snapshot
+
+    def search(self, query, offset=0, limit=None):
+        """
+        One page of StudentSearchIndex results
+
+        Returns:
+            (snapshot, results, has_more) - results as in StudentSearchIndex.search
+        """
+        snapshot = self.snapshot()
+        with self._search_lock:
+            if self._search_index is None:
+                self._search_index = StudentSearchIndex(snapshot.students)
+            elif self._search_students is not snapshot.students:
+                self._search_index.apply_changes(self._search_students, snapshot.students)
+            self._search_students = snapshot.students
+            results, has_more = self._search_index.search(query, offset, limit or Config.SEARCH_PAGE_SIZE)
+        return snapshot, results, has_more
+
+    def summary(self):
+        total = self.hits + self.reloads
+        rate = self.hits / total * 100 if total else 0.0
+        return {
+            'version': self._snapshot.version if self._snapshot else None,
+            'hits': self.hits,
+            'reloads': self.reloads,
+            'hit_rate': round(rate, 1)
+        }
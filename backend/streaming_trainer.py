@@ -0,0 +1,261 @@
+"""
+Smart Attendance System - Streaming Training
+Memory-bounded LBPH training for very large datasets
+
+Each image is turned into its LBPH spatial histogram as soon as it is
+decoded and the pixels are dropped. Histograms are appended to a scratch
+file on disk, then streamed into an OpenCV-readable model file, so peak
+memory does not grow with the number of images.
+"""
+
+import base64
+import os
+import sys
+import cv2
+import numpy as np
+from config import Config
+from recognizer_backends import create_recognizer, model_paths, temp_path_for
+
+# Rows read back from the scratch file per batch when writing the model
+WRITE_CHUNK_ROWS = 256
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB (None if unavailable)"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KB, macOS reports bytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize / (1024 * 1024)
+    except Exception:
+        pass
+
+    return None
+
+
+class LBPHParameters:
+    """LBPH settings, read from OpenCV so histograms match recognizer.train()"""
+
+    def __init__(self):
+        recognizer = create_recognizer("lbph")
+        self.radius = recognizer.getRadius()
+        self.neighbors = recognizer.getNeighbors()
+        self.grid_x = recognizer.getGridX()
+        self.grid_y = recognizer.getGridY()
+
+    @property
+    def num_patterns(self):
+        return 2 ** self.neighbors
+
+    @property
+    def histogram_size(self):
+        return self.grid_x * self.grid_y * self.num_patterns
+
+
+def lbp_image(gray, radius, neighbors):
+    """Extended (circular) LBP codes - same arithmetic as OpenCV's elbp()"""
+    src = gray.astype(np.float32)
+    rows, cols = src.shape
+    center = src[radius:rows - radius, radius:cols - radius]
+    codes = np.zeros(center.shape, np.int32)
+    eps = np.finfo(np.float32).eps
+
+    def shifted(dy, dx):
+        return src[radius + dy:rows - radius + dy, radius + dx:cols - radius + dx]
+
+    one = np.float32(1)
+    for n in range(neighbors):
+        # float32 throughout, like OpenCV, so threshold ties resolve identically
+        x = np.float32(radius * np.cos(2.0 * np.pi * n / float(np.float32(neighbors))))
+        y = np.float32(-radius * np.sin(2.0 * np.pi * n / float(np.float32(neighbors))))
+        fx, fy = int(np.floor(x)), int(np.floor(y))
+        cx, cy = int(np.ceil(x)), int(np.ceil(y))
+        ty, tx = y - np.float32(fy), x - np.float32(fx)
+
+        # Bilinear interpolation of the neighbour on the circle
+        t = ((one - tx) * (one - ty) * shifted(fy, fx) +
+             tx * (one - ty) * shifted(fy, cx) +
+             (one - tx) * ty * shifted(cy, fx) +
+             tx * ty * shifted(cy, cx))
+
+        codes |= (((t > center) | (np.abs(t - center) < eps)).astype(np.int32) << n)
+
+    return codes
+
+
+def spatial_histogram(codes, params):
+    """Normalized per-cell histograms, flattened to one float32 row"""
+    cell_h = codes.shape[0] // params.grid_y
+    cell_w = codes.shape[1] // params.grid_x
+    codes = codes[:cell_h * params.grid_y, :cell_w * params.grid_x]
+
+    rows = np.arange(codes.shape[0]) // cell_h
+    cols = np.arange(codes.shape[1]) // cell_w
+    cell_ids = rows[:, None] * params.grid_x + cols[None, :]
+
+    counts = np.bincount(
+        (cell_ids * params.num_patterns + codes).ravel(),
+        minlength=params.histogram_size
+    )
+    return (counts / float(cell_h * cell_w)).astype(np.float32)
+
+
+def face_histogram(gray, params):
+    """LBPH histogram of one face image"""
+    return spatial_histogram(lbp_image(gray, params.radius, params.neighbors), params)
+
+
+def _binary_block(dt, data, indent):
+    """OpenCV FileStorage base64 matrix payload (24-byte type header + raw data)"""
+    encoded = base64.b64encode(dt.encode().ljust(24, b' ') + data).decode()
+    return "\n".join(indent + encoded[i:i + 76] for i in range(0, len(encoded), 76))
+
+
+def write_lbph_model(model_file, histogram_file, labels, params, threshold=sys.float_info.max):
+    """
+    Stream histograms from the scratch file into an LBPH model file
+
+    Written in the same YAML layout as LBPHFaceRecognizer.save() (base64
+    matrices) to a temporary name, then renamed into place.
+    """
+    cols = params.histogram_size
+    temp_file = temp_path_for(model_file)
+
+    try:
+        with open(temp_file, 'w', encoding='utf-8') as out, open(histogram_file, 'rb') as rows:
+            out.write("%YAML:1.0\n---\nopencv_lbphfaces:\n")
+            out.write(f"   threshold: {threshold!r}\n")
+            out.write(f"   radius: {params.radius}\n")
+            out.write(f"   neighbors: {params.neighbors}\n")
+            out.write(f"   grid_x: {params.grid_x}\n")
+            out.write(f"   grid_y: {params.grid_y}\n")
+            out.write("   histograms:\n")
+
+            remaining = len(labels)
+            while remaining:
+                chunk = np.fromfile(rows, dtype=np.float32, count=min(remaining, WRITE_CHUNK_ROWS) * cols)
+                chunk = chunk.reshape(-1, cols)
+                for row in chunk:
+                    out.write("      - !!opencv-matrix\n")
+                    out.write(f"         rows: 1\n         cols: {cols}\n         dt: f\n")
+                    out.write("         data: !!binary |\n")
+                    out.write(_binary_block("1f", row.tobytes(), "            ") + "\n")
+                remaining -= len(chunk)
+
+            label_data = np.asarray(labels, dtype=np.int32).tobytes()
+            out.write("   labels: !!opencv-matrix\n")
+            out.write(f"      rows: {len(labels)}\n      cols: 1\n      dt: i\n")
+            out.write("      data: !!binary |\n")
+            out.write(_binary_block("1i", label_data, "         ") + "\n")
+            out.write("   labelsInfo:\n      []\n")
+
+        os.replace(temp_file, model_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+def train_lbph_streaming(students, progress=None, should_cancel=None):
+    """
+    Train and publish an LBPH model without holding the dataset in memory
+
+    Args:
+        students: List of (person_name, [image paths]) in label order
+        progress: Optional callback(dict) for progress updates
+        should_cancel: Optional callable; returning True aborts training
+
+    Returns:
+        (label_map, total_images, students_with_insufficient_images)
+
+    Raises:
+        TrainingCancelled: should_cancel() returned True
+    """
+    from train_model import TrainingCancelled, PROGRESS_EVERY_IMAGES
+
+    params = LBPHParameters()
+    model_file, _ = model_paths("lbph")
+    os.makedirs(os.path.dirname(model_file), exist_ok=True)
+    histogram_file = os.path.join(Config.TRAINER_PATH, f"histograms.tmp-{os.getpid()}.f32")
+
+    total = sum(len(paths) for _, paths in students)
+    labels = []
+    label_map = {}
+    students_with_insufficient_images = []
+    images_seen = 0
+
+    try:
+        with open(histogram_file, 'wb') as scratch:
+            for label_id, (person_name, image_paths) in enumerate(students):
+                label_map[label_id] = person_name
+
+                if len(image_paths) < Config.MIN_IMAGES_PER_STUDENT:
+                    students_with_insufficient_images.append((person_name, len(image_paths)))
+                    print(f"⚠️  {person_name}: {len(image_paths)} images (⚠️ Less than {Config.MIN_IMAGES_PER_STUDENT}!)")
+                else:
+                    print(f"✅ {person_name}: {len(image_paths)} images")
+
+                for image_path in image_paths:
+                    if should_cancel and should_cancel():
+                        raise TrainingCancelled()
+
+                    images_seen += 1
+                    gray_img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+                    if gray_img is None:
+                        print(f"   ⚠️ Could not load: {os.path.basename(image_path)}")
+                        continue
+
+                    # Pixels are discarded right after this line
+                    scratch.write(face_histogram(gray_img, params).tobytes())
+                    labels.append(label_id)
+
+                    if progress and images_seen % PROGRESS_EVERY_IMAGES == 0:
+                        progress({
+                            'phase': 'loading',
+                            'imagesLoaded': images_seen,
+                            'totalImages': total,
+                            'studentsDone': label_id,
+                            'totalStudents': len(students)
+                        })
+
+        if progress:
+            progress({
+                'phase': 'saving',
+                'imagesLoaded': images_seen,
+                'totalImages': total,
+                'studentsDone': len(students),
+                'totalStudents': len(students)
+            })
+
+        if labels:
+            write_lbph_model(model_file, histogram_file, labels, params)
+    finally:
+        if os.path.exists(histogram_file):
+            os.remove(histogram_file)
+
+    return label_map, len(labels), students_with_insufficient_images
@@ -0,0 +1,421 @@
+"""
+Smart Attendance System - Student Registry
+SQLite-backed student records shared by every module
+
+Records keep the shape of the old student_database.json entries
+({"name", "rollNo", "branch", "section", "imagesCount", ...}) keyed by
+student id. The database runs in WAL mode, so the API, capture tools and
+recognizer can read while another process writes. Roll numbers are
+unique (case-insensitive) and students are indexed by class.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from config import Config
+
+SCHEMA_VERSION = 1
+
+# record key -> column
+FIELDS = {
+    'name': 'name',
+    'rollNo': 'roll_no',
+    'branch': 'branch',
+    'section': 'section',
+    'imagesCount': 'images_count',
+    'registeredDate': 'registered_date',
+    'datasetPath': 'dataset_path',
+    'imported': 'imported'
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    student_id      TEXT PRIMARY KEY,
+    name            TEXT NOT NULL COLLATE NOCASE,
+    roll_no         TEXT NOT NULL COLLATE NOCASE,
+    branch          TEXT NOT NULL,
+    section         TEXT NOT NULL,
+    images_count    INTEGER NOT NULL DEFAULT 0,
+    registered_date TEXT,
+    dataset_path    TEXT DEFAULT '',
+    imported        INTEGER NOT NULL DEFAULT 0,
+    extra           TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_students_roll_no ON students (roll_no);
+CREATE INDEX IF NOT EXISTS idx_students_class ON students (branch, section, name);
+CREATE TABLE IF NOT EXISTS registry_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class RegistryError(Exception):
+    """Raised when a registry write violates a constraint (duplicate id or roll number)"""
+    pass
+
+
+# Column order of SELECT_SQL rows
+COLUMNS = "student_id, name, roll_no, branch, section, images_count, registered_date, dataset_path, imported, extra"
+SELECT_SQL = f"SELECT {COLUMNS} FROM students"
+
+
+def _row_to_record(row):
+    """(student_id, record) from a SELECT_SQL row"""
+    student_id, name, roll_no, branch, section, images_count, registered_date, dataset_path, imported, extra = row
+    record = {
+        'name': name,
+        'rollNo': roll_no,
+        'branch': branch,
+        'section': section,
+        'imagesCount': images_count,
+        'registeredDate': registered_date,
+        'datasetPath': dataset_path or ""
+    }
+    if imported:
+        record['imported'] = True
+    if extra:
+        record.update(json.loads(extra))
+    return student_id, record
+
+
+def _record_to_row(student_id, record):
+    extra = {k: v for k, v in record.items() if k not in FIELDS}
+    return (
+        student_id,
+        record['name'],
+        record['rollNo'],
+        record['branch'],
+        record['section'],
+        int(record.get('imagesCount', 0) or 0),
+        record.get('registeredDate') or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        record.get('datasetPath', "") or "",
+        1 if record.get('imported') else 0,
+        json.dumps(extra) if extra else None
+    )
+
+
+INSERT_SQL = f"INSERT INTO students ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+
+class StudentRegistry:
+    """
+    Student records in SQLite
+
+    One connection per thread (Flask serves requests on several threads).
+    Every write bumps PRAGMA user_version, so readers can tell cheaply
+    whether anything changed since they last looked.
+    """
+
+    def __init__(self, db_path=None, json_path=None):
+        self.db_path = db_path or Config.STUDENT_REGISTRY_DB
+        self.json_path = Config.STUDENT_DB if json_path is None else json_path
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    # ---------- connection ----------
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=Config.REGISTRY_BUSY_TIMEOUT_SECONDS,
+                               isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._local.conn = conn
+
+        with self._init_lock:
+            if not self._initialized:
+                self._initialize(conn)
+                self._initialized = True
+        return conn
+
+    def _initialize(self, conn):
+        self._begin(conn)
+        try:
+            # executescript() would commit first, so run the statements one by one
+            for statement in SCHEMA.split(';'):
+                if statement.strip():
+                    conn.execute(statement)
+            conn.execute("INSERT OR IGNORE INTO registry_meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+            migrated = conn.execute("SELECT value FROM registry_meta WHERE key = 'migrated_from'").fetchone()
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        if migrated is None and self.json_path and os.path.exists(self.json_path):
+            self.migrate_from_json(self.json_path)
+
+    def _begin(self, conn):
+        # IMMEDIATE: take the write lock up front so concurrent writers queue
+        # on busy_timeout instead of failing halfway through
+        conn.execute("BEGIN IMMEDIATE")
+
+    def _write(self, statements):
+        """Run statements(conn) in one transaction and bump the data version"""
+        conn = self._connect()
+        self._begin(conn)
+        try:
+            result = statements(conn)
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+            conn.execute("COMMIT")
+            return result
+        except sqlite3.IntegrityError as e:
+            conn.execute("ROLLBACK")
+            raise RegistryError(self._describe_conflict(e)) from e
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _describe_conflict(error):
+        message = str(error)
+        if "roll_no" in message:
+            return "Duplicate roll number"
+        if "student_id" in message:
+            return "Duplicate student ID"
+        return message
+
+    def close(self):
+        """Close this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ---------- reads ----------
+
+    def version(self):
+        """Data version - changes after every write from any process"""
+        return self._connect().execute("PRAGMA user_version").fetchone()[0]
+
+    def all(self):
+        """{student_id: record} for every student (the old JSON shape)"""
+        rows = self._connect().execute(f"{SELECT_SQL} ORDER BY rowid")
+        return dict(map(_row_to_record, rows))
+
+    def versioned_all(self):
+        """(version, all()) read in one transaction, so they always match"""
+        conn = self._connect()
+        conn.execute("BEGIN")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            rows = conn.execute(f"{SELECT_SQL} ORDER BY rowid").fetchall()
+        finally:
+            conn.execute("COMMIT")
+        return version, dict(map(_row_to_record, rows))
+
+    def get(self, student_id):
+        """Record for a student id, or None"""
+        row = self._connect().execute(
+            f"{SELECT_SQL} WHERE student_id = ?", (student_id,)
+        ).fetchone()
+        return _row_to_record(row)[1] if row else None
+
+    def exists(self, student_id):
+        return self._connect().execute(
+            "SELECT 1 FROM students WHERE student_id = ?", (student_id,)
+        ).fetchone() is not None
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM students").fetchone()[0]
+
+    def find_by_roll(self, roll_no):
+        """(student_id, record) for a roll number (case-insensitive), or None"""
+        row = self._connect().execute(
+            f"{SELECT_SQL} WHERE roll_no = ?", (roll_no.strip(),)
+        ).fetchone()
+        return _row_to_record(row) if row else None
+
+    def find_by_name(self, name, branch, section):
+        """[(student_id, record)] with this name (case-insensitive) in a class"""
+        rows = self._connect().execute(
+            f"{SELECT_SQL} WHERE branch = ? AND section = ? AND name = ?",
+            (branch.upper(), section.upper(), name.strip())
+        )
+        return [_row_to_record(row) for row in rows]
+
+    def by_class(self, branch, section):
+        """[(student_id, record)] for a class, by roll number"""
+        rows = self._connect().execute(
+            f"{SELECT_SQL} WHERE branch = ? AND section = ? ORDER BY roll_no",
+            (branch, section)
+        )
+        return [_row_to_record(row) for row in rows]
+
+    def count_in_class(self, branch, section):
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM students WHERE branch = ? AND section = ?", (branch, section)
+        ).fetchone()[0]
+
+    def class_counts(self):
+        """{(branch, section): number of students}"""
+        rows = self._connect().execute(
+            "SELECT branch, section, COUNT(*) FROM students GROUP BY branch, section"
+        )
+        return {(branch, section): count for branch, section, count in rows}
+
+    def count_without_images(self):
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM students WHERE images_count = 0"
+        ).fetchone()[0]
+
+    def search(self, text):
+        """[(student_id, record)] whose name or roll number contains text"""
+        pattern = "%" + text.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        rows = self._connect().execute(
+            f"{SELECT_SQL} WHERE name LIKE ? ESCAPE '\\' OR roll_no LIKE ? ESCAPE '\\' "
+            "ORDER BY roll_no", (pattern, pattern)
+        )
+        return [_row_to_record(row) for row in rows]
+
+    # ---------- writes ----------
+
+    def add(self, student_id, record):
+        """
+        Add one student
+
+        Raises:
+            RegistryError: Student id or roll number already exists
+        """
+        row = _record_to_row(student_id, record)
+        self._write(lambda conn: conn.execute(INSERT_SQL, row))
+
+    def add_many(self, students):
+        """
+        Add (student_id, record) pairs in one transaction - all or nothing
+
+        Returns:
+            int: Number of students added
+
+        Raises:
+            RegistryError: A student id or roll number already exists
+        """
+        added = 0
+
+        def rows():
+            # students may be a generator: rows are inserted as they arrive
+            nonlocal added
+            for student_id, record in students:
+                added += 1
+                yield _record_to_row(student_id, record)
+
+        self._write(lambda conn: conn.executemany(INSERT_SQL, rows()))
+        return added
+
+    def update(self, student_id, **fields):
+        """Update record fields (record key names, e.g. imagesCount=50)"""
+        unknown = set(fields) - set(FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown student fields: {', '.join(sorted(unknown))}")
+        if not fields:
+            return False
+
+        assignments = ", ".join(f"{FIELDS[key]} = ?" for key in fields)
+        values = [int(v) if key == 'imported' else v for key, v in fields.items()]
+        cursor = self._write(lambda conn: conn.execute(
+            f"UPDATE students SET {assignments} WHERE student_id = ?", (*values, student_id)
+        ))
+        return cursor.rowcount > 0
+
+    def update_images(self, updates):
+        """
+        Record captured images for several students in one transaction
+
+        Args:
+            updates: {student_id: (images_count, dataset_path)}
+
+        Returns:
+            int: Number of students updated
+        """
+        if not updates:
+            return 0
+        rows = [(count, path, student_id) for student_id, (count, path) in updates.items()]
+
+        def run(conn):
+            updated = 0
+            for row in rows:
+                updated += conn.execute(
+                    "UPDATE students SET images_count = ?, dataset_path = ? WHERE student_id = ?", row
+                ).rowcount
+            return updated
+
+        return self._write(run)
+
+    def delete(self, student_id):
+        """Remove a student; returns True if it existed"""
+        cursor = self._write(lambda conn: conn.execute(
+            "DELETE FROM students WHERE student_id = ?", (student_id,)
+        ))
+        return cursor.rowcount > 0
+
+    # ---------- maintenance ----------
+
+    def migrate_from_json(self, json_path):
+        """
+        One-time import of student_database.json
+
+        Conflicting roll numbers (possible in old files) are kept with a
+        suffix instead of being dropped, and reported.
+
+        Returns:
+            int: Number of students imported
+        """
+        with open(json_path, 'r', encoding='utf-8') as f:
+            db = json.load(f)
+
+        seen_rolls = set()
+        students = []
+        for student_id, record in db.items():
+            record = dict(record)
+            roll = record.get('rollNo', '') or student_id
+            if roll.upper() in seen_rolls:
+                renamed = f"{roll}_{student_id}"
+                print(f"⚠️  Duplicate roll number {roll} ({student_id}) migrated as {renamed}")
+                roll = renamed
+            seen_rolls.add(roll.upper())
+            record['rollNo'] = roll
+            record.setdefault('branch', 'UNKNOWN')
+            record.setdefault('section', 'UNKNOWN')
+            record.setdefault('name', student_id)
+            students.append(_record_to_row(student_id, record))
+
+        def run(conn):
+            conn.executemany(INSERT_SQL.replace("INSERT", "INSERT OR IGNORE", 1), students)
+            conn.execute(
+                "INSERT OR REPLACE INTO registry_meta VALUES ('migrated_from', ?)",
+                (f"{os.path.basename(json_path)} {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",)
+            )
+
+        self._write(run)
+        print(f"✅ Migrated {len(students)} students from {json_path} to {self.db_path}")
+        return len(students)
+
+    def backup(self, backup_file):
+        """Consistent copy of the database (safe while others write)"""
+        target = sqlite3.connect(backup_file)
+        try:
+            self._connect().backup(target)
+        finally:
+            target.close()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """The shared registry for Config.STUDENT_REGISTRY_DB"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = StudentRegistry()
+        return _registry
@@ -0,0 +1,274 @@
+"""
+Smart Attendance System - Student Search
+Prefix and typo-tolerant search over student names and roll numbers
+"""
+
+import heapq
+from config import Config
+
+
+def normalize(text):
+    """Lowercase with single spaces"""
+    return " ".join(str(text).lower().split())
+
+
+def search_keys(name, roll_no):
+    """
+    Keys a student is found under by prefix
+
+    Every word-suffix of the name ("rahul kumar", "kumar") so surnames
+    match too, plus the roll number.
+    """
+    words = normalize(name).split()
+    keys = {" ".join(words[i:]) for i in range(len(words))}
+    roll = normalize(roll_no)
+    if roll:
+        keys.add(roll)
+    return keys
+
+
+def trigrams(text):
+    """Character trigrams of a padded string ("  ab" style start/end markers)"""
+    padded = f"  {normalize(text)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(grams, other_grams):
+    """Dice coefficient of two trigram sets"""
+    return 2 * len(grams & other_grams) / (len(grams) + len(other_grams))
+
+
+class _Node:
+    """Trie node; count = number of keys stored in this subtree"""
+
+    __slots__ = ('children', 'count', 'ids')
+
+    def __init__(self):
+        self.children = {}
+        self.count = 0
+        self.ids = None  # Student ids whose key ends here
+
+
+class StudentSearchIndex:
+    """
+    Search index over names and roll numbers
+
+    - Prefix: a character trie over search_keys(); results come out in
+      key order and enumeration stops once the requested page is full.
+    - Fuzzy: a trigram index over the distinct name words. Each query word
+      is matched to similar words by Dice similarity, so "rahl kumr" still
+      finds "Rahul Kumar". Names repeat a lot, so this vocabulary stays
+      small however many students there are.
+
+    add() and remove() update both structures for a single student.
+    """
+
+    def __init__(self, students=None, min_similarity=None):
+        self.min_similarity = Config.SEARCH_FUZZY_MIN_SIMILARITY if min_similarity is None else min_similarity
+        self.root = _Node()
+        self.entries = {}     # student id -> (name, roll number)
+        self.words = {}       # name word -> set of student ids
+        self.word_grams = {}  # trigram -> set of name words
+        for student_id, info in (students or {}).items():
+            self.add(student_id, info)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, student_id):
+        return student_id in self.entries
+
+    # ---------- updates ----------
+
+    def add(self, student_id, info):
+        """Index one student (replaces an existing entry)"""
+        if student_id in self.entries:
+            self.remove(student_id)
+
+        name, roll_no = info.get('name', ''), info.get('rollNo', '')
+        self.entries[student_id] = (name, roll_no)
+
+        for key in search_keys(name, roll_no):
+            node = self.root
+            node.count += 1
+            for char in key:
+                child = node.children.get(char)
+                if child is None:
+                    child = node.children[char] = _Node()
+                node = child
+                node.count += 1
+            if node.ids is None:
+                node.ids = set()
+            node.ids.add(student_id)
+
+        for word in set(normalize(name).split()):
+            ids = self.words.get(word)
+            if ids is None:
+                ids = self.words[word] = set()
+                for gram in trigrams(word):
+                    self.word_grams.setdefault(gram, set()).add(word)
+            ids.add(student_id)
+
+    def remove(self, student_id):
+        """Drop one student; returns False if it was not indexed"""
+        entry = self.entries.pop(student_id, None)
+        if entry is None:
+            return False
+        name, roll_no = entry
+
+        for key in search_keys(name, roll_no):
+            path = [self.root]
+            for char in key:
+                path.append(path[-1].children[char])
+            path[-1].ids.discard(student_id)
+            if not path[-1].ids:
+                path[-1].ids = None
+            for depth, node in enumerate(path):
+                node.count -= 1
+                if node.count == 0 and depth > 0:
+                    # Nothing left below: unlink the whole branch
+                    del path[depth - 1].children[key[depth - 1]]
+                    break
+
+        for word in set(normalize(name).split()):
+            ids = self.words[word]
+            ids.discard(student_id)
+            if not ids:
+                # Last student with this word
+                del self.words[word]
+                for gram in trigrams(word):
+                    words = self.word_grams[gram]
+                    words.discard(word)
+                    if not words:
+                        del self.word_grams[gram]
+        return True
+
+    def apply_changes(self, old_students, new_students):
+        """
+        Update the index from one registry snapshot to the next
+
+        Only added, removed and renamed students are touched.
+
+        Returns:
+            int: Number of students re-indexed or removed
+        """
+        changed = 0
+        for student_id, info in old_students.items():
+            new_info = new_students.get(student_id)
+            if new_info is None or (new_info.get('name'), new_info.get('rollNo')) != (info.get('name'), info.get('rollNo')):
+                self.remove(student_id)
+                changed += 1
+        for student_id, info in new_students.items():
+            if student_id not in self.entries:
+                self.add(student_id, info)
+                changed += 1
+        return changed
+
+    # ---------- queries ----------
+
+    def _find_node(self, prefix):
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def prefix_count(self, prefix):
+        """Number of keys starting with prefix (a student can have several)"""
+        node = self._find_node(normalize(prefix))
+        return node.count if node else 0
+
+    def prefix_search(self, prefix, limit):
+        """Up to limit distinct student ids with a key starting with prefix, in key order"""
+        node = self._find_node(normalize(prefix))
+        if node is None or limit <= 0:
+            return []
+
+        found = []
+        seen = set()
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.ids:
+                # Enough smallest ids to fill the page even if some were already seen
+                wanted = limit - len(found) + len(seen)
+                ids = heapq.nsmallest(wanted, node.ids) if len(node.ids) > wanted else sorted(node.ids)
+                for student_id in ids:
+                    if student_id not in seen:
+                        seen.add(student_id)
+                        found.append(student_id)
+                        if len(found) >= limit:
+                            return found
+            # Reversed so the smallest child is visited first
+            for char in sorted(node.children, reverse=True):
+                stack.append(node.children[char])
+        return found
+
+    def similar_words(self, word):
+        """{name word: similarity} for indexed words close to word"""
+        grams = trigrams(word)
+        candidates = set()
+        for gram in grams:
+            candidates |= self.word_grams.get(gram, set())
+
+        similar = {}
+        for candidate in candidates:
+            score = similarity(grams, trigrams(candidate))
+            if score >= self.min_similarity:
+                similar[candidate] = score
+        return similar
+
+    def fuzzy_search(self, query, exclude=(), limit=None):
+        """
+        [(student_id, similarity)] best first, similarity >= min_similarity
+
+        Every query word has to match a word of the name; the score is the
+        mean similarity of those word matches.
+        """
+        query_words = normalize(query).split()
+        if not query_words:
+            return []
+
+        totals = None
+        for word in query_words:
+            # Best similarity per student for this query word
+            best = {}
+            for candidate, score in sorted(self.similar_words(word).items(), key=lambda item: item[1]):
+                best.update(dict.fromkeys(self.words[candidate], score))
+            if totals is None:
+                totals = best
+            else:
+                totals = {student_id: total + best[student_id]
+                          for student_id, total in totals.items() if student_id in best}
+            if not totals:
+                return []
+
+        count = len(query_words)
+        scored = [(student_id, total / count) for student_id, total in totals.items()
+                  if student_id not in exclude]
+        key = lambda item: (-item[1], item[0])
+        return heapq.nsmallest(limit, scored, key=key) if limit else sorted(scored, key=key)
+
+    def search(self, query, offset=0, limit=20, fuzzy=True):
+        """
+        One page of results: prefix matches first, then fuzzy matches
+
+        Returns:
+            (results, has_more): results is [(student_id, match, score)]
+            with match "prefix" (score 1.0) or "fuzzy"
+        """
+        query = normalize(query)
+        if not query:
+            return [], False
+
+        wanted = offset + limit + 1  # One extra tells whether there is a next page
+        prefix_ids = self.prefix_search(query, wanted)
+        matches = [(student_id, "prefix", 1.0) for student_id in prefix_ids]
+
+        if fuzzy and len(matches) < wanted and len(query) >= Config.SEARCH_FUZZY_MIN_LENGTH:
+            for student_id, score in self.fuzzy_search(query, exclude=set(prefix_ids),
+                                                       limit=wanted - len(matches)):
+                matches.append((student_id, "fuzzy", round(score, 3)))
+
+        return matches[offset:offset + limit], len(matches) > offset + limit
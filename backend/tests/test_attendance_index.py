@@ -0,0 +1,93 @@
+"""
+Smart Attendance System - Attendance Date Index tests
+
+Run from backend/:
+    python -m unittest discover tests
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from attendance_store import FIELDNAMES, CsvAttendanceStore
+
+
+def write_attendance(path, dates):
+    """attendance.csv with one CSE-A row per entry of dates, in that order"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDNAMES)
+        for number, date in enumerate(dates):
+            writer.writerow([f"Student {number}", f"CSEA{number:04d}", "CSE", "A", date, "10:00:00"])
+
+
+class InterleavedDatesTest(unittest.TestCase):
+    """Rows out of date order must not be served from the index"""
+
+    DATES = ["2026-01-05"] * 50 + ["2026-01-06"] * 3 + ["2026-01-05"] * 50 + ["2026-01-07"] * 50
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp.name, "attendance.csv")
+        write_attendance(self.csv_path, self.DATES)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assertSameAsScan(self, store):
+        scan = CsvAttendanceStore(self.csv_path, use_index=False)
+        for date in sorted(set(self.DATES)):
+            self.assertEqual(store.read_day(date, "CSE", "A"), scan.read_day(date, "CSE", "A"), date)
+
+    def test_first_build_notices_the_order(self):
+        store = CsvAttendanceStore(self.csv_path, use_index=True)
+        self.assertEqual(len(store.read_day("2026-01-06", "CSE", "A")), 3)
+        self.assertFalse(store.index.ordered)
+        self.assertIsNone(store.day_offset("2026-01-07"))
+        self.assertSameAsScan(store)
+
+    def test_stale_sidecar_is_rebuilt(self):
+        store = CsvAttendanceStore(self.csv_path, use_index=True)
+        store.read_day("2026-01-05", "CSE", "A")
+        store.index.save()
+
+        # Same file contents written again in order: the old sidecar no longer fits
+        write_attendance(self.csv_path, sorted(self.DATES))
+        store = CsvAttendanceStore(self.csv_path, use_index=True)
+        self.assertEqual(len(store.read_day("2026-01-05", "CSE", "A")), 100)
+        self.assertTrue(store.index.ordered)
+        self.assertSameAsScan(store)
+
+    def test_indexed_read_filters_on_date(self):
+        store = CsvAttendanceStore(self.csv_path, use_index=True)
+        store.read_day("2026-01-05", "CSE", "A")
+        # Even an index that claims to be ordered never returns another date's rows
+        store.index.ordered = True
+        for row in store.read_day("2026-01-05", "CSE", "A"):
+            self.assertEqual(row['Date'], "2026-01-05")
+
+    def test_appends_keep_the_index_in_step(self):
+        write_attendance(self.csv_path, sorted(self.DATES))
+        reader = CsvAttendanceStore(self.csv_path, use_index=True)
+        self.assertEqual(len(reader.read_day("2026-01-07", "CSE", "A")), 50)
+
+        # Another store (the recognizer's) appends and saves its sidecar
+        writer = CsvAttendanceStore(self.csv_path, use_index=True)
+        writer.append([["Late", "CSEA9999", "CSE", "A", "2026-01-07", "11:00:00"]])
+        writer.append([["Next", "CSEA9998", "CSE", "A", "2026-01-08", "09:00:00"]])
+        self.assertEqual(len(reader.read_day("2026-01-07", "CSE", "A")), 51)
+        self.assertEqual(len(reader.read_day("2026-01-08", "CSE", "A")), 1)
+
+        # A late row for an earlier date makes both give up on the index
+        writer.append([["Old", "CSEA9997", "CSE", "A", "2026-01-06", "12:00:00"]])
+        self.assertEqual(len(reader.read_day("2026-01-06", "CSE", "A")), 4)
+        self.assertFalse(reader.index.ordered)
+        self.assertSameAsScan(reader)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,130 +1,350 @@
 """
 Smart Attendance System - Model Training
 Train face recognition model from captured images
+
+Usage: python train_model.py [lbph|eigen|fisher] [--incremental] [--streaming]
 """
 
 import cv2
 import numpy as np
 import os
+import sys
 from config import Config
+from recognizer_backends import (
+    BACKENDS, ModelError, create_recognizer, load_model, model_paths,
+    prepare_face, save_model, write_manifest
+)
+from streaming_trainer import peak_rss_mb, train_lbph_streaming
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# Send a progress update every N images
+PROGRESS_EVERY_IMAGES = 25
+
+
+class TrainingCancelled(Exception):
+    """Raised inside a training run when cancellation was requested"""
+    pass
 
-print("=" * 70)
-print("🔄 SMART ATTENDANCE - MODEL TRAINING")
-print("=" * 70)
-
-# Check if dataset folder exists
-if not os.path.exists(Config.DATASET_PATH):
-    print(f"❌ Error: Dataset folder not found: {Config.DATASET_PATH}")
-    print("   Please capture student faces first using:")
-    print("   - python face_capture.py OR")
-    print("   - python bulk_capture.py")
-    exit(1)
-
-# Create recognizer
-recognizer = cv2.face.LBPHFaceRecognizer_create()
-
-faces = []
-labels = []
-label_map = {}
-label_id = 0
-
-print(f"\n📂 Loading images from: {Config.DATASET_PATH}")
-print("-" * 70)
-
-total_images = 0
-students_with_insufficient_images = []
-
-# Load all student images
-for person_name in sorted(os.listdir(Config.DATASET_PATH)):
-    person_folder = os.path.join(Config.DATASET_PATH, person_name)
-
-    if not os.path.isdir(person_folder):
-        continue
-
-    label_map[label_id] = person_name
-    
-    # Count images for this student
-    image_files = [f for f in os.listdir(person_folder) if f.lower().endswith(('.jpg', '.jpeg', '.png'))]
-    image_count = len(image_files)
-    
-    if image_count < 30:
-        students_with_insufficient_images.append((person_name, image_count))
-        print(f"⚠️  {person_name}: {image_count} images (⚠️ Less than 30!)")
-    else:
-        print(f"✅ {person_name}: {image_count} images")
-
-    # Load images
-    for image_name in image_files:
-        image_path = os.path.join(person_folder, image_name)
-
-        gray_img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-        if gray_img is None:
-            print(f"   ⚠️ Could not load: {image_name}")
+
+def list_student_images(dataset_path):
+    """Yield (person_name, [image paths]) for every student folder, sorted"""
+    for person_name in sorted(os.listdir(dataset_path)):
+        person_folder = os.path.join(dataset_path, person_name)
+
+        if not os.path.isdir(person_folder):
             continue
 
-        faces.append(gray_img)
-        labels.append(label_id)
-        total_images += 1
-
-    label_id += 1
-
-print("-" * 70)
-
-# Check if enough data
-if not faces:
-    print("\n❌ Error: No face images found!")
-    print("   Please capture student faces first.")
-    exit(1)
-
-if len(label_map) < 2:
-    print("\n⚠️ Warning: Only 1 student found. Need at least 2 for training.")
-    print("   The model will be trained but may not be very useful.")
-
-# Show warnings for insufficient images
-if students_with_insufficient_images:
-    print("\n⚠️ WARNING: Some students have fewer than 30 images:")
-    for name, count in students_with_insufficient_images:
-        print(f"   • {name}: {count} images")
-    print("   This may reduce recognition accuracy for these students.")
-    print("   Recommended: Recapture with 50+ images per student.")
-
-print(f"\n📊 Training Summary:")
-print(f"   Students: {len(label_map)}")
-print(f"   Total Images: {total_images}")
-print(f"   Average Images per Student: {total_images / len(label_map):.1f}")
-
-# Create trainer directory
-if not os.path.exists(Config.TRAINER_PATH):
-    os.makedirs(Config.TRAINER_PATH)
-
-# Train the model
-print(f"\n🔄 Training model...")
-print("   This may take 1-5 minutes depending on dataset size...")
-
-try:
-    recognizer.train(faces, np.array(labels))
-    recognizer.save(Config.TRAINER_MODEL)
-    
+        image_files = [f for f in os.listdir(person_folder) if f.lower().endswith(IMAGE_EXTENSIONS)]
+        yield person_name, [os.path.join(person_folder, f) for f in image_files]
+
+
+def load_training_data(dataset_path, backend, include=None, first_label=0,
+                       progress=None, should_cancel=None):
+    """
+    Load student images
+
+    Args:
+        dataset_path: Dataset folder
+        backend: Recognizer backend (decides preprocessing)
+        include: Only load these student folders (default: all)
+        first_label: Label assigned to the first loaded student
+        progress: Optional callback(dict) for progress updates
+        should_cancel: Optional callable; returning True aborts loading
+
+    Returns:
+        (faces, labels, label_map, students_with_insufficient_images)
+
+    Raises:
+        TrainingCancelled: should_cancel() returned True
+    """
+    students = [
+        (name, paths) for name, paths in list_student_images(dataset_path)
+        if include is None or name in include
+    ]
+    total_images = sum(len(paths) for _, paths in students)
+
+    faces = []
+    labels = []
+    label_map = {}
+    label_id = first_label
+    students_with_insufficient_images = []
+    images_seen = 0
+
+    for students_done, (person_name, image_paths) in enumerate(students):
+        label_map[label_id] = person_name
+
+        # Count images for this student
+        image_count = len(image_paths)
+
+        if image_count < Config.MIN_IMAGES_PER_STUDENT:
+            students_with_insufficient_images.append((person_name, image_count))
+            print(f"⚠️  {person_name}: {image_count} images (⚠️ Less than {Config.MIN_IMAGES_PER_STUDENT}!)")
+        else:
+            print(f"✅ {person_name}: {image_count} images")
+
+        # Load images
+        for image_path in image_paths:
+            if should_cancel and should_cancel():
+                raise TrainingCancelled()
+
+            images_seen += 1
+            gray_img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+            if gray_img is None:
+                print(f"   ⚠️ Could not load: {os.path.basename(image_path)}")
+                continue
+
+            faces.append(prepare_face(gray_img, backend))
+            labels.append(label_id)
+
+            if progress and images_seen % PROGRESS_EVERY_IMAGES == 0:
+                progress({
+                    'phase': 'loading',
+                    'imagesLoaded': images_seen,
+                    'totalImages': total_images,
+                    'studentsDone': students_done,
+                    'totalStudents': len(students)
+                })
+
+        label_id += 1
+
+    if progress:
+        progress({
+            'phase': 'loading',
+            'imagesLoaded': images_seen,
+            'totalImages': total_images,
+            'studentsDone': len(students),
+            'totalStudents': len(students)
+        })
+
+    return faces, labels, label_map, students_with_insufficient_images
+
+
+def print_insufficient_warning(students_with_insufficient_images):
+    """Warn about students with too few images"""
+    if students_with_insufficient_images:
+        print(f"\n⚠️ WARNING: Some students have fewer than {Config.MIN_IMAGES_PER_STUDENT} images:")
+        for name, count in students_with_insufficient_images:
+            print(f"   • {name}: {count} images")
+        print("   This may reduce recognition accuracy for these students.")
+        print("   Recommended: Recapture with 50+ images per student.")
+
+
+def print_training_result(model_file, manifest_file, label_map, total_images):
+    """Final success report"""
     print("\n" + "=" * 70)
     print("✅ MODEL TRAINED SUCCESSFULLY!")
     print("=" * 70)
-    print(f"💾 Model saved to: {Config.TRAINER_MODEL}")
+    print(f"💾 Model saved to: {model_file}")
+    print(f"📄 Manifest: {manifest_file}")
     print(f"👥 Trained on {len(label_map)} students")
     print(f"📸 Using {total_images} face images")
-    
+
+    peak = peak_rss_mb()
+    if peak is not None:
+        print(f"📈 Peak memory: {peak:.0f} MB")
+
     print("\n📋 Student Labels:")
     for lid, name in sorted(label_map.items()):
         print(f"   {lid}: {name}")
-    
+
     print("\n" + "=" * 70)
     print("📝 NEXT STEPS:")
     print("  1. Start backend: python app.py")
     print("  2. Open frontend: index.html")
     print("  3. Login and start attendance recognition")
     print("=" * 70)
-    
-except Exception as e:
-    print(f"\n❌ Error during training: {e}")
-    import traceback
-    traceback.print_exc()
-    exit(1)
\ No newline at end of file
+
+
+def train_model(backend, mode="full", progress=None, should_cancel=None, streaming=None):
+    """
+    Train and save the model for a backend
+
+    Args:
+        backend: Recognizer backend
+        mode: "full" retrains from every image; "incremental" adds only
+              students missing from the current model (LBPH only)
+        progress: Optional callback(dict) for progress updates
+        should_cancel: Optional callable; returning True aborts training
+        streaming: Memory-bounded LBPH training (None = automatic above
+                   Config.TRAINING_STREAMING_MIN_IMAGES)
+
+    Returns:
+        bool: True on success
+
+    Raises:
+        TrainingCancelled: Cancellation was requested
+    """
+    def fail(message):
+        print(f"\n❌ Error: {message}")
+        if progress:
+            progress({'error': message})
+        return False
+
+    print("=" * 70)
+    print("🔄 SMART ATTENDANCE - MODEL TRAINING")
+    print("=" * 70)
+    print(f"🧠 Recognizer: {backend} ({BACKENDS[backend]})")
+
+    # Check if dataset folder exists
+    if not os.path.exists(Config.DATASET_PATH):
+        print("   Please capture student faces first using:")
+        print("   - python face_capture.py OR")
+        print("   - python bulk_capture.py")
+        return fail(f"Dataset folder not found: {Config.DATASET_PATH}")
+
+    # Incremental training extends the current model with new students
+    existing = None
+    if mode == "incremental":
+        if backend != "lbph":
+            print(f"⚠️  {backend} cannot be updated incrementally - running full training")
+        else:
+            try:
+                existing = load_model(backend)
+            except ModelError as e:
+                print(f"⚠️  No model to update ({e}) - running full training")
+
+    if existing is not None:
+        # Without a manifest the labels are guessed from today's dataset folders,
+        # so students added since the model was trained would count as known
+        label_count = existing.label_count()
+        if not existing.manifest:
+            print(f"⚠️  Model has no manifest ({label_count} students in the model, "
+                  f"{len(existing.label_map)} dataset folders) - running full training")
+            existing = None
+        elif label_count is not None and label_count != len(existing.label_map):
+            print(f"⚠️  Model has {label_count} students but its manifest lists "
+                  f"{len(existing.label_map)} - running full training")
+            existing = None
+
+    include = None
+    first_label = 0
+    if existing is not None:
+        known = set(existing.label_map.values())
+        include = {
+            name for name, _ in list_student_images(Config.DATASET_PATH)
+            if name not in known
+        }
+        first_label = max(existing.label_map, default=-1) + 1
+        print(f"➕ Incremental: {len(include)} new students")
+
+        if not include:
+            print("✅ Model already includes every student - nothing to do")
+            return True
+
+    # Very large datasets: stream histograms to disk instead of holding every image
+    if backend == "lbph" and existing is None:
+        students = list(list_student_images(Config.DATASET_PATH))
+        if streaming is None:
+            streaming = sum(len(paths) for _, paths in students) >= Config.TRAINING_STREAMING_MIN_IMAGES
+        if streaming:
+            return train_streaming(students, progress, should_cancel, fail)
+
+    print(f"\n📂 Loading images from: {Config.DATASET_PATH}")
+    print("-" * 70)
+
+    faces, labels, label_map, students_with_insufficient_images = load_training_data(
+        Config.DATASET_PATH, backend,
+        include=include, first_label=first_label,
+        progress=progress, should_cancel=should_cancel
+    )
+    total_images = len(faces)
+
+    print("-" * 70)
+
+    # Check if enough data
+    if not faces:
+        print("   Please capture student faces first.")
+        return fail("No face images found!")
+
+    if existing is None and len(label_map) < 2:
+        if backend == "fisher":
+            return fail("Fisherfaces needs at least 2 students.")
+        print("\n⚠️ Warning: Only 1 student found. Need at least 2 for training.")
+        print("   The model will be trained but may not be very useful.")
+
+    # Show warnings for insufficient images
+    print_insufficient_warning(students_with_insufficient_images)
+
+    print(f"\n📊 Training Summary:")
+    print(f"   Students: {len(label_map)}")
+    print(f"   Total Images: {total_images}")
+    print(f"   Average Images per Student: {total_images / len(label_map):.1f}")
+
+    if should_cancel and should_cancel():
+        raise TrainingCancelled()
+
+    # Train the model
+    print(f"\n🔄 Training model...")
+    print("   This may take 1-5 minutes depending on dataset size...")
+    if progress:
+        progress({'phase': 'training'})
+
+    try:
+        if existing is not None:
+            recognizer = existing.recognizer
+            recognizer.update(faces, np.array(labels))
+            label_map = {**existing.label_map, **label_map}
+            total_images += existing.manifest.get('images', 0)
+        else:
+            recognizer = create_recognizer(backend)
+            recognizer.train(faces, np.array(labels))
+
+        if progress:
+            progress({'phase': 'saving'})
+        model_file, manifest_file = save_model(recognizer, backend, label_map, total_images)
+
+        print_training_result(model_file, manifest_file, label_map, total_images)
+        return True
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return fail(f"Error during training: {e}")
+
+
+def train_streaming(students, progress, should_cancel, fail):
+    """Memory-bounded LBPH training (see streaming_trainer.py)"""
+    print(f"\n💧 Streaming training: histograms are computed per image and written to disk")
+    print(f"📂 Loading images from: {Config.DATASET_PATH}")
+    print("-" * 70)
+
+    try:
+        label_map, total_images, students_with_insufficient_images = train_lbph_streaming(
+            students, progress=progress, should_cancel=should_cancel
+        )
+    except TrainingCancelled:
+        raise
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return fail(f"Error during training: {e}")
+
+    print("-" * 70)
+
+    if not total_images:
+        print("   Please capture student faces first.")
+        return fail("No face images found!")
+
+    print_insufficient_warning(students_with_insufficient_images)
+
+    write_manifest("lbph", label_map, total_images)
+    model_file, manifest_file = model_paths("lbph")
+
+    print_training_result(model_file, manifest_file, label_map, total_images)
+    return True
+
+
+if __name__ == "__main__":
+    args = [a.lower() for a in sys.argv[1:]]
+    mode = "incremental" if "--incremental" in args else "full"
+    streaming = True if "--streaming" in args else None
+    positional = [a for a in args if not a.startswith("--")]
+    backend = positional[0] if positional else Config.RECOGNIZER_BACKEND
+
+    if backend not in BACKENDS:
+        print(f"❌ Unknown recognizer '{backend}'. Allowed: {', '.join(BACKENDS)}")
+        sys.exit(1)
+
+    if not train_model(backend, mode, streaming=streaming):
+        sys.exit(1)
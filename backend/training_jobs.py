@@ -0,0 +1,255 @@
+"""
+Smart Attendance System - Background Training Jobs
+Runs model training in a worker process with progress, cancellation and history
+"""
+
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from config import Config
+from recognizer_backends import BACKENDS
+
+TRAINING_MODES = ("full", "incremental")
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class TrainingJobError(Exception):
+    """Raised for invalid or conflicting training job requests"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def run_training_job(job_id, backend, mode, streaming, events, cancel_event):
+    """Worker process entry point - reports everything through the events queue"""
+    from train_model import train_model, TrainingCancelled
+
+    def progress(update):
+        events.put((job_id, update))
+
+    events.put((job_id, {'status': 'running', 'pid': os.getpid()}))
+    try:
+        success = train_model(backend, mode, progress=progress,
+                              should_cancel=cancel_event.is_set, streaming=streaming)
+        events.put((job_id, {'status': 'completed' if success else 'failed'}))
+    except TrainingCancelled:
+        events.put((job_id, {'status': 'cancelled'}))
+    except Exception as e:
+        events.put((job_id, {'status': 'failed', 'error': str(e)}))
+
+
+class TrainingJobManager:
+    """
+    Starts training jobs and tracks their progress
+
+    Each job runs train_model() in its own process so the API stays
+    responsive. Only one job per model target (recognizer backend) may
+    be active at a time. Job history is kept in Config.TRAINING_JOBS_FILE.
+    """
+
+    def __init__(self, jobs_file=None):
+        self.jobs_file = jobs_file or Config.TRAINING_JOBS_FILE
+        self._lock = threading.Lock()
+        # spawn: never fork a multi-threaded Flask process
+        self._context = multiprocessing.get_context("spawn")
+        self._events = None
+        self._collector = None
+        self._workers = {}  # job_id -> (process, cancel_event)
+        self._jobs = self._load_history()
+
+    # ---------- persistence ----------
+
+    def _load_history(self):
+        jobs = {}
+        if os.path.exists(self.jobs_file):
+            try:
+                with open(self.jobs_file, 'r', encoding='utf-8') as f:
+                    for job in json.load(f):
+                        # Jobs from a previous server run cannot still be running
+                        if job.get('status') in ACTIVE_STATUSES:
+                            job['status'] = 'interrupted'
+                        jobs[job['id']] = job
+            except Exception as e:
+                print(f"⚠️  Could not load training job history: {e}")
+        return jobs
+
+    def _save_history(self):
+        jobs = sorted(self._jobs.values(), key=lambda j: j['createdDate'])
+        jobs = jobs[-Config.TRAINING_JOBS_HISTORY_LIMIT:]
+        self._jobs = {job['id']: job for job in jobs}
+
+        temp_file = f"{self.jobs_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(jobs, indent=4, fp=f)
+        os.replace(temp_file, self.jobs_file)
+
+    # ---------- public API ----------
+
+    def start_job(self, backend=None, mode="full", streaming=None):
+        """
+        Start a training job
+
+        streaming: force memory-bounded LBPH training on/off (None = automatic)
+
+        Raises:
+            TrainingJobError: Invalid arguments (400) or a job for the
+                              same target is already active (409)
+        """
+        backend = (backend or Config.RECOGNIZER_BACKEND).lower()
+        mode = (mode or "full").lower()
+
+        if backend not in BACKENDS:
+            raise TrainingJobError(f"Unknown recognizer '{backend}'. Allowed: {', '.join(BACKENDS)}")
+        if mode not in TRAINING_MODES:
+            raise TrainingJobError(f"Invalid mode '{mode}'. Allowed: {', '.join(TRAINING_MODES)}")
+        if streaming is not None and not isinstance(streaming, bool):
+            raise TrainingJobError("streaming must be true, false or omitted")
+
+        with self._lock:
+            self._ensure_collector()
+
+            for job in self._jobs.values():
+                if job['target'] == backend and job['status'] in ACTIVE_STATUSES:
+                    raise TrainingJobError(
+                        f"Training already running for '{backend}' (job {job['id']})",
+                        status_code=409
+                    )
+
+            job_id = uuid.uuid4().hex[:12]
+            job = {
+                'id': job_id,
+                'target': backend,
+                'backend': backend,
+                'mode': mode,
+                'streaming': streaming,
+                'status': 'queued',
+                'createdDate': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'startedAt': time.time(),
+                'finishedAt': None,
+                'error': None,
+                'progress': {
+                    'phase': 'starting',
+                    'imagesLoaded': 0,
+                    'totalImages': None,
+                    'studentsDone': 0,
+                    'totalStudents': None,
+                    'etaSeconds': None
+                }
+            }
+
+            cancel_event = self._context.Event()
+            process = self._context.Process(
+                target=run_training_job,
+                args=(job_id, backend, mode, streaming, self._events, cancel_event),
+                name=f"training-{job_id}",
+                daemon=True
+            )
+            process.start()
+
+            self._jobs[job_id] = job
+            self._workers[job_id] = (process, cancel_event)
+            self._save_history()
+            return dict(job)
+
+    def cancel_job(self, job_id):
+        """Request cancellation of an active job"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise TrainingJobError(f"Training job '{job_id}' not found", status_code=404)
+            if job['status'] not in ACTIVE_STATUSES:
+                raise TrainingJobError(f"Training job '{job_id}' is already {job['status']}", status_code=409)
+
+            _, cancel_event = self._workers[job_id]
+            cancel_event.set()
+            job['progress']['phase'] = 'cancelling'
+            return dict(job)
+
+    def get_job(self, job_id):
+        """Return a job by id"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise TrainingJobError(f"Training job '{job_id}' not found", status_code=404)
+            return json.loads(json.dumps(job))
+
+    def list_jobs(self):
+        """All known jobs, newest first"""
+        with self._lock:
+            jobs = sorted(self._jobs.values(), key=lambda j: j['createdDate'], reverse=True)
+            return json.loads(json.dumps(jobs))
+
+    # ---------- progress collection ----------
+
+    def _ensure_collector(self):
+        if self._collector is None or not self._collector.is_alive():
+            if self._events is None:
+                self._events = self._context.Queue()
+            self._collector = threading.Thread(
+                target=self._collect, name="training-job-collector", daemon=True
+            )
+            self._collector.start()
+
+    def _collect(self):
+        while True:
+            try:
+                job_id, update = self._events.get(timeout=1.0)
+            except queue.Empty:
+                self._reap_dead_workers()
+                continue
+
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is not None:
+                    self._apply_update(job, update)
+
+    def _apply_update(self, job, update):
+        status = update.get('status')
+        if status:
+            job['status'] = status
+            if status not in ACTIVE_STATUSES:
+                self._finish(job)
+
+        if update.get('error'):
+            job['error'] = update['error']
+
+        progress = job['progress']
+        for key in ('phase', 'imagesLoaded', 'totalImages', 'studentsDone', 'totalStudents'):
+            if key in update:
+                progress[key] = update[key]
+
+        # ETA from the image loading rate (training time itself is not predictable)
+        loaded, total = progress['imagesLoaded'], progress['totalImages']
+        if progress['phase'] == 'loading' and loaded and total:
+            elapsed = time.time() - job['startedAt']
+            progress['etaSeconds'] = round(elapsed / loaded * (total - loaded), 1)
+        elif progress['phase'] != 'loading':
+            progress['etaSeconds'] = None
+
+        if status and status not in ACTIVE_STATUSES:
+            self._save_history()
+
+    def _finish(self, job):
+        job['finishedAt'] = time.time()
+        job['progress']['phase'] = job['status']
+        worker = self._workers.pop(job['id'], None)
+        if worker is not None:
+            worker[0].join(timeout=5)
+
+    def _reap_dead_workers(self):
+        """Mark jobs whose process died without reporting (crash, kill)"""
+        with self._lock:
+            for job_id, (process, _) in list(self._workers.items()):
+                if not process.is_alive():
+                    job = self._jobs[job_id]
+                    if job['status'] in ACTIVE_STATUSES:
+                        job['status'] = 'failed'
+                        job['error'] = job['error'] or f"Worker exited with code {process.exitcode}"
+                        self._finish(job)
+                        self._save_history()
@@ -4,9 +4,8 @@ Comprehensive validation and duplicate prevention
 """
 
 import re
-import json
-import os
 from config import Config
+from student_registry import get_registry, RegistryError
 
 
 class ValidationError(Exception):
@@ -14,19 +13,40 @@ class ValidationError(Exception):
     pass
 
 
+def duplicate_roll_message(roll_no, info):
+    """Error for a roll number that belongs to another student"""
+    existing_name = info.get('name', 'Unknown')
+    existing_class = f"{info.get('branch', 'N/A')}-{info.get('section', 'N/A')}"
+    return (
+        f"❌ DUPLICATE ROLL NUMBER!\n"
+        f"   Roll number '{roll_no}' already exists.\n"
+        f"   Belongs to: {existing_name} ({existing_class})"
+    )
+
+
+def duplicate_name_message(name, branch, section, info):
+    """Warning for a name already registered in the class"""
+    existing_roll = info.get('rollNo', 'N/A')
+    return (
+        f"⚠️  WARNING: Similar name exists!\n"
+        f"   '{name}' already registered in {branch}-{section}\n"
+        f"   Roll number: {existing_roll}"
+    )
+
+
+def base_student_id(name):
+    """Student ID for a name, before duplicate numbering"""
+    base_id = name.lower().strip().replace(" ", "_")
+    return re.sub(r'[^a-z0-9_]', '', base_id)
+
+
 class StudentValidator:
     """Validates student data and prevents duplicates"""
     
     @staticmethod
     def load_database():
-        """Load student database"""
-        if os.path.exists(Config.STUDENT_DB):
-            try:
-                with open(Config.STUDENT_DB, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
+        """Load every student record ({student_id: record})"""
+        return get_registry().all()
     
     @staticmethod
     def validate_name(name):
@@ -109,23 +129,11 @@ class StudentValidator:
         Returns:
             (bool, str): (is_duplicate, error_message)
         """
-        db = StudentValidator.load_database()
+        match = get_registry().find_by_roll(roll_no)
         
-        for student_id, info in db.items():
-            # Skip if this is the student being updated
-            if exclude_student_id and student_id == exclude_student_id:
-                continue
-            
-            if info.get('rollNo', '').upper() == roll_no.upper():
-                existing_name = info.get('name', 'Unknown')
-                existing_class = f"{info.get('branch', 'N/A')}-{info.get('section', 'N/A')}"
-                
-                error_msg = (
-                    f"❌ DUPLICATE ROLL NUMBER!\n"
-                    f"   Roll number '{roll_no}' already exists.\n"
-                    f"   Belongs to: {existing_name} ({existing_class})"
-                )
-                return True, error_msg
+        # Skip if this is the student being updated
+        if match and match[0] != exclude_student_id:
+            return True, duplicate_roll_message(roll_no, match[1])
         
         return False, ""
     
@@ -143,54 +151,39 @@ class StudentValidator:
         Returns:
             (bool, str): (is_duplicate, warning_message)
         """
-        db = StudentValidator.load_database()
-        
-        name_lower = name.lower().strip()
-        
-        for student_id, info in db.items():
+        for student_id, info in get_registry().find_by_name(name, branch, section):
             # Skip if this is the student being updated
             if exclude_student_id and student_id == exclude_student_id:
                 continue
             
-            # Check same name in same class
-            if (info.get('name', '').lower().strip() == name_lower and
-                info.get('branch', '').upper() == branch.upper() and
-                info.get('section', '').upper() == section.upper()):
-                
-                existing_roll = info.get('rollNo', 'N/A')
-                
-                warning_msg = (
-                    f"⚠️  WARNING: Similar name exists!\n"
-                    f"   '{name}' already registered in {branch}-{section}\n"
-                    f"   Roll number: {existing_roll}"
-                )
-                return True, warning_msg
+            return True, duplicate_name_message(name, branch, section, info)
         
         return False, ""
     
     @staticmethod
-    def generate_unique_student_id(name):
+    def generate_unique_student_id(name, context=None):
         """
         Generate unique student ID from name
         Handles duplicates by adding numbers
         """
-        base_id = name.lower().strip().replace(" ", "_")
-        base_id = re.sub(r'[^a-z0-9_]', '', base_id)
+        if context is not None:
+            return context.generate_unique_student_id(name)
         
-        db = StudentValidator.load_database()
+        base_id = base_student_id(name)
+        registry = get_registry()
         
-        if base_id not in db:
+        if not registry.exists(base_id):
             return base_id
         
         # If duplicate, add number
         counter = 1
-        while f"{base_id}_{counter}" in db:
+        while registry.exists(f"{base_id}_{counter}"):
             counter += 1
         
         return f"{base_id}_{counter}"
     
     @staticmethod
-    def validate_student_data(name, roll_no, branch, section, check_duplicates=True):
+    def validate_student_data(name, roll_no, branch, section, check_duplicates=True, context=None):
         """
         Comprehensive validation of all student data
         
@@ -200,6 +193,7 @@ class StudentValidator:
             branch: Branch
             section: Section
             check_duplicates: Whether to check for duplicates
+            context: ValidationContext to check against (default: query the registry)
         
         Returns:
             dict: Validated and formatted data
@@ -214,13 +208,15 @@ class StudentValidator:
         
         # Check duplicates if requested
         if check_duplicates:
+            checks = context or StudentValidator
+            
             # Check roll number (critical - must be unique)
-            is_dup, error = StudentValidator.check_duplicate_roll_number(roll_no)
+            is_dup, error = checks.check_duplicate_roll_number(roll_no)
             if is_dup:
                 raise ValidationError(error)
             
             # Check name (warning only, don't block)
-            is_dup, warning = StudentValidator.check_duplicate_name(name, branch, section)
+            is_dup, warning = checks.check_duplicate_name(name, branch, section)
             if is_dup:
                 print(warning)
                 response = input("\n   Continue anyway? (yes/no): ").strip().lower()
@@ -235,6 +231,121 @@ class StudentValidator:
         }
 
 
+class ValidationContext:
+    """
+    The registry loaded once, with hash indexes for duplicate checks
+
+    Indexes: upper-cased roll number, (name, branch, section) and student
+    id, so every check is O(1). Students added to the context (add() or
+    validate_batch()) are checked against too, which catches duplicates
+    within a batch before anything is written. Same messages as
+    StudentValidator.
+    """
+    
+    def __init__(self, students=None):
+        """
+        Args:
+            students: {student_id: record} (default: every registered student)
+        """
+        if students is None:
+            students = get_registry().all()
+        
+        self.ids = set()
+        self.rolls = {}  # ROLL -> (student_id, record)
+        self.names = {}  # (name, BRANCH, SECTION) -> [(student_id, record)]
+        for student_id, info in students.items():
+            self.add(student_id, info)
+    
+    @staticmethod
+    def name_key(name, branch, section):
+        return name.lower().strip(), branch.upper(), section.upper()
+    
+    def add(self, student_id, info):
+        """Index a student (registered, or accepted in this batch)"""
+        self.ids.add(student_id)
+        self.rolls[info.get('rollNo', '').upper()] = (student_id, info)
+        key = self.name_key(info.get('name', ''), info.get('branch', ''), info.get('section', ''))
+        self.names.setdefault(key, []).append((student_id, info))
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def check_duplicate_roll_number(self, roll_no, exclude_student_id=None):
+        """Same as StudentValidator.check_duplicate_roll_number, in O(1)"""
+        match = self.rolls.get(roll_no.upper())
+        if match and match[0] != exclude_student_id:
+            return True, duplicate_roll_message(roll_no, match[1])
+        return False, ""
+    
+    def check_duplicate_name(self, name, branch, section, exclude_student_id=None):
+        """Same as StudentValidator.check_duplicate_name, in O(1)"""
+        for student_id, info in self.names.get(self.name_key(name, branch, section), ()):
+            if exclude_student_id and student_id == exclude_student_id:
+                continue
+            return True, duplicate_name_message(name, branch, section, info)
+        return False, ""
+    
+    def unique_id(self, base_id):
+        """base_id, or base_id_N for the first free N"""
+        if base_id not in self.ids:
+            return base_id
+        counter = 1
+        while f"{base_id}_{counter}" in self.ids:
+            counter += 1
+        return f"{base_id}_{counter}"
+    
+    def generate_unique_student_id(self, name):
+        return self.unique_id(base_student_id(name))
+    
+    def validate_batch(self, rows):
+        """
+        Validate many students without prompting
+        
+        Args:
+            rows: Iterable of {'name', 'rollNo', 'branch', 'section'}
+        
+        Returns:
+            (accepted, rejected, warnings):
+                accepted - [(student_id, validated)] in input order, indexed
+                           in this context but not written to the registry
+                rejected - [(row_index, error_message)]
+                warnings - [(row_index, warning_message)] (accepted anyway)
+        """
+        accepted, rejected, warnings = [], [], []
+        
+        for index, row in enumerate(rows):
+            try:
+                name = StudentValidator.validate_name(row.get('name', ''))
+                branch, section = StudentValidator.validate_branch_section(
+                    (row.get('branch') or '').strip().upper(), (row.get('section') or '').strip().upper()
+                )
+                # Pattern check here rather than printing a warning per row
+                roll_no = StudentValidator.validate_roll_number(row.get('rollNo', ''))
+            except ValidationError as e:
+                rejected.append((index, str(e)))
+                continue
+            
+            is_dup, error = self.check_duplicate_roll_number(roll_no)
+            if is_dup:
+                rejected.append((index, error))
+                continue
+            
+            expected_prefix = Config.get_roll_number_prefix(branch, section)
+            if not roll_no.startswith(expected_prefix):
+                warnings.append((index, f"⚠️  Warning: Roll number doesn't match pattern {expected_prefix}XXX"))
+            
+            is_dup, warning = self.check_duplicate_name(name, branch, section)
+            if is_dup:
+                warnings.append((index, warning))
+            
+            validated = {'name': name, 'rollNo': roll_no, 'branch': branch, 'section': section}
+            student_id = self.generate_unique_student_id(name)
+            self.add(student_id, validated)
+            accepted.append((student_id, validated))
+        
+        return accepted, rejected, warnings
+
+
 class AttendanceValidator:
     """Validates attendance data"""
     
@@ -253,12 +364,7 @@ class AttendanceValidator:
     @staticmethod
     def check_students_registered(branch, section):
         """Check if any students are registered in the class"""
-        db = StudentValidator.load_database()
-        
-        count = sum(
-            1 for info in db.values()
-            if info.get('branch') == branch and info.get('section') == section
-        )
+        count = get_registry().count_in_class(branch, section)
         
         if count == 0:
             raise ValidationError(
@@ -270,27 +376,28 @@ class AttendanceValidator:
 
 
 # Utility functions
-def validate_and_add_student(name, roll_no, branch, section, images_count=0, dataset_path=""):
+def validate_and_add_student(name, roll_no, branch, section, images_count=0, dataset_path="",
+                             context=None):
     """
     Validate and add student to database
     Used by face_capture.py and bulk_capture.py
+    
+    Pass a ValidationContext when registering several students in a row:
+    checks then use its indexes and the new student is added to it.
     """
     from datetime import datetime
     
     try:
         # Validate all data
         validated = StudentValidator.validate_student_data(
-            name, roll_no, branch, section, check_duplicates=True
+            name, roll_no, branch, section, check_duplicates=True, context=context
         )
         
         # Generate unique ID
-        student_id = StudentValidator.generate_unique_student_id(validated['name'])
+        student_id = StudentValidator.generate_unique_student_id(validated['name'], context)
         
-        # Load database
-        db = StudentValidator.load_database()
-        
-        # Add student
-        db[student_id] = {
+        # Add student (the registry rejects a roll number registered meanwhile)
+        record = {
             "name": validated['name'],
             "rollNo": validated['rollNo'],
             "branch": validated['branch'],
@@ -299,17 +406,43 @@ def validate_and_add_student(name, roll_no, branch, section, images_count=0, dat
             "registeredDate": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "datasetPath": dataset_path
         }
-        
-        # Save database
-        with open(Config.STUDENT_DB, 'w', encoding='utf-8') as f:
-            json.dump(db, indent=4, fp=f)
+        get_registry().add(student_id, record)
+        if context is not None:
+            context.add(student_id, record)
         
         print(f"✅ Student added successfully: {validated['name']} ({validated['rollNo']})")
         return True, student_id
         
-    except ValidationError as e:
+    except (ValidationError, RegistryError) as e:
         print(f"\n❌ Validation Error: {e}")
         return False, None
     except Exception as e:
         print(f"\n❌ Error: {e}")
-        return False, None
\ No newline at end of file
+        return False, None
+
+
+def dataset_folder_name(student_id, name):
+    """
+    Dataset folder for a student
+
+    The recognizer maps folder names back to students with
+    folder.lower().replace(" ", "_"), so a suffixed id ("john_doe_1")
+    gets the same suffix on the folder ("John Doe_1").
+    """
+    base_id = name.lower().replace(" ", "_")
+    if student_id.startswith(base_id):
+        return name + student_id[len(base_id):]
+    return name
+
+
+def update_student_images(updates):
+    """
+    Record captured images for existing students
+
+    Args:
+        updates: {student_id: (images_count, dataset_path)}
+
+    Returns:
+        int: Number of students updated
+    """
+    return get_registry().update_images(updates)